@@ -81,6 +81,8 @@ setup(
     main = travelcrm:main
     [console_scripts]
     initialize_travelcrm_db = travelcrm.scripts.initializedb:main
+    benchmark_travelcrm = travelcrm.scripts.benchmark:main
+    rebuild_travelcrm = travelcrm.scripts.rebuild:main
     [pyramid.scaffold]
     travelcrm = scaffold:TravelcrmProjectTemplate
     """,
@@ -12,6 +12,8 @@ from .models import (
 )
 
 from .resources import Root
+from .lib.utils.security_utils import AuthIdentity
+from .lib.utils.sql_utils import configure_tenant_engines
 from .lib.renderers.sse import SSERendererFactory
 from .lib.renderers.str import STRRendererFactory
 
@@ -25,6 +27,7 @@ def main(global_config, **settings):
     """
     engine = engine_from_config(settings, 'sqlalchemy.')
     DBSession.configure(bind=engine)
+    configure_tenant_engines(engine, settings)
     Base.metadata.bind = engine
     session_factory = session_factory_from_settings(settings)
     authentication = AuthTktAuthenticationPolicy(
@@ -39,6 +42,7 @@ def main(global_config, **settings):
         authorization_policy=authorization,
         session_factory=session_factory,
     )
+    config.add_request_method(AuthIdentity, 'auth_identity', reify=True)
     config.add_translation_dirs(
         'colander:locale/',
         'travelcrm:locale/',
@@ -59,6 +63,10 @@ def main(global_config, **settings):
         '.lib.subscribers.scheduler',
         'pyramid.events.ApplicationCreated'
     )
+    config.add_subscriber(
+        '.lib.subscribers.interfaces_index',
+        'pyramid.events.ApplicationCreated'
+    )
 
     config.add_renderer('sse', SSERendererFactory)
     config.add_renderer('str', STRRendererFactory)
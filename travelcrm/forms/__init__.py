@@ -258,6 +258,10 @@ class ResourceSearchSchema(colander.Schema):
         colander.Integer(),
         missing=None,
     )
+    cursor = colander.SchemaNode(
+        colander.String(),
+        missing=None,
+    )
 
 
 class ResourceAssignSchema(colander.Schema):
@@ -323,11 +327,22 @@ class BaseSearchForm(BaseForm):
                 self._controls.get('page')
             )
 
+    def _seek(self):
+        self.qb.seek_query(
+            self._controls.get('sort'),
+            self._controls.get('order', 'asc'),
+            self._controls.get('rows'),
+            self._controls.get('cursor')
+        )
+
     def submit(self):
         assert self._controls is not None, u'Need to call validate first'
         self._search()
-        self._sort()
-        self._page()
+        if self._controls.get('cursor') and self._controls.get('rows'):
+            self._seek()
+        else:
+            self._sort()
+            self._page()
         return self.qb
 
 
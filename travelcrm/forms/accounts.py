@@ -5,6 +5,7 @@ import colander
 from . import(
     SelectInteger,
     ResourceSchema, 
+    ResourceSearchSchema,
     BaseForm,
     BaseSearchForm,
     BaseAssignForm,
@@ -90,8 +91,16 @@ class AccountForm(BaseForm):
         return account
 
 
+class _AccountSearchSchema(ResourceSearchSchema):
+    with_balance = colander.SchemaNode(
+        colander.Boolean(),
+        missing=False,
+    )
+
+
 class AccountSearchForm(BaseSearchForm):
     _qb = AccountsQueryBuilder
+    _schema = _AccountSearchSchema
 
 
 class AccountAssignForm(BaseAssignForm):
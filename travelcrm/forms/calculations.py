@@ -12,11 +12,7 @@ from ..models.calculation import Calculation
 from ..models.order import Order
 from ..models.note import Note
 from ..models.task import Task
-from ..lib.bl.contracts import get_contract
-from ..lib.bl.commissions import (
-    get_commission, 
-    get_commission_sum
-)
+from ..lib.bl.calculations import autoload_calculations
 from ..lib.qb.calculations import CalculationsQueryBuilder
 from ..lib.utils.security_utils import get_auth_employee
 
@@ -32,42 +28,7 @@ class CalculationAutoloadForm(BaseForm):
 
     def submit(self):
         order = Order.get(self._controls.get('id'))
-        calculations = []
-        for order_item in order.orders_items:
-            # make autoload for success items only
-            if not order_item.is_success():
-                continue
-            contract = get_contract(
-                order_item.supplier_id,
-                order_item.service_id,
-                order.deal_date
-            )
-            commission = order_item.price
-            if contract:
-                _commission = get_commission(
-                    contract.id, 
-                    order_item.service_id,
-                    order_item.currency_id,
-                )
-                if _commission:
-                    commission = get_commission_sum(
-                        _commission.id, 
-                        order_item.price, 
-                        order_item.currency_id,
-                        order.deal_date
-                    )
-            calculation = Calculation(
-                price=(order_item.price - commission),
-                order_item=order_item,
-                contract=contract,
-                resource=CalculationsResource.create_resource(
-                    get_auth_employee(self.request)
-                )
-            )
-            calculation.resource.notes = []
-            calculation.resource.tasks = []
-            calculations.append(calculation)
-        return calculations
+        return autoload_calculations(order, get_auth_employee(self.request))
 
 
 class _CalculationSchema(ResourceSchema):
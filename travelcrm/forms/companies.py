@@ -13,6 +13,7 @@ from ..models.currency import Currency
 from ..lib.scheduler.companies import schedule_company_creation
 from ..lib.bl.tarifs import get_tarif_by_code
 from ..lib.utils.common_utils import get_tarifs
+from ..lib.utils.companies_utils import invalidate_company_context
 
 
 @colander.deferred
@@ -82,6 +83,7 @@ class CompanyForm(BaseForm):
             'timezone': self._controls.get('timezone'),
             'locale': self._controls.get('locale'),
         }
+        invalidate_company_context()
         return company
 
 
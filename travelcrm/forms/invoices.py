@@ -22,9 +22,9 @@ from ..models.account import Account
 from ..models.invoice_item import InvoiceItem
 from ..models.order import Order
 from ..lib.qb.invoices import InvoicesQueryBuilder
-from ..lib.bl.orders import get_order_price
+from ..lib.bl.orders import get_order_price, get_orders_prices
 from ..lib.bl.orders_items import (
-    get_discount, get_price, get_calculation_price
+    get_calculation_price
 )
 from ..lib.bl.vats import get_vat, calc_vat
 from ..lib.utils.common_utils import parse_date
@@ -160,26 +160,31 @@ class InvoiceForm(BaseForm):
     def _generate_invoices_items(self, invoice):
         order = Order.get(self._controls.get('order_id'))
         account = Account.get(self._controls.get('account_id'))
-        items = []
-        for order_item in order.orders_items:
-            if not order_item.is_success():
-                continue 
-            invoice_item = (
+        order_price = get_orders_prices(
+            [order.id], account.currency_id, self._controls.get('date'),
+            success_only=True
+        )[order.id]
+        orders_items = dict(
+            (order_item.id, order_item) for order_item in order.orders_items
+        )
+        invoices_items = dict(
+            (invoice_item.order_item_id, invoice_item)
+            for invoice_item in (
                 DBSession.query(InvoiceItem)
-                .filter(InvoiceItem.order_item_id == order_item.id)
-                .first()
+                .filter(InvoiceItem.order_item_id.in_(orders_items.keys()))
             )
+        )
+        items = []
+        for item_price in order_price.items:
+            order_item = orders_items[item_price.order_item_id]
+            invoice_item = invoices_items.get(order_item.id)
             if not invoice_item:
                 invoice_item = InvoiceItem(
                     order_item=order_item,
                 )
             invoice_item.invoice = invoice                
-            invoice_item.price = get_price(
-                order_item, self._controls.get('date'), account.currency_id
-            )
-            invoice_item.discount = get_discount(
-                order_item, self._controls.get('date'), account.currency_id
-            )
+            invoice_item.price = item_price.price
+            invoice_item.discount = item_price.discount
             vat = get_vat(
                 invoice.account_id, order_item.service_id, invoice.date
             )
@@ -18,8 +18,10 @@ from ..models.bank_detail import BankDetail
 from ..models.note import Note
 from ..models.task import Task
 from ..lib.qb.structures import StructuresQueryBuilder
-from ..lib.bl.employees import get_employee_structure
-from ..lib.utils.security_utils import get_auth_employee
+from ..lib.utils.security_utils import (
+    get_auth_employee,
+    get_auth_identity,
+)
 from ..lib.utils.common_utils import translate as _
 
 
@@ -92,8 +94,7 @@ class StructureForm(BaseForm):
 
     def submit(self, structure=None):
         if not structure:
-            employee = get_auth_employee(self.request)
-            employee_structure = get_employee_structure(employee)
+            employee_structure = get_auth_identity(self.request).structure
             structure = Structure(
                 company_id=employee_structure.company_id,
                 resource=StructuresResource.create_resource(
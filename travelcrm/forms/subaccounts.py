@@ -104,6 +104,10 @@ class _SubaccountSearchSchema(ResourceSearchSchema):
         colander.Integer(),
         missing=None
     )
+    with_balance = colander.SchemaNode(
+        colander.Boolean(),
+        missing=False,
+    )
 
 
 class SubaccountForm(BaseForm):
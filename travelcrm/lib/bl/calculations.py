@@ -0,0 +1,128 @@
+# -*coding: utf-8-*-
+
+from sqlalchemy import func, text
+
+from ...models import DBSession
+from ...models.resource import Resource
+from ...models.calculation import Calculation
+from ...models.order_item import OrderItem
+from ...models.commission import Commission
+from ...resources.calculations import CalculationsResource
+from ...lib.bl.currencies_rates import currency_exchange
+from ...lib.bl.rules import get_rules_index
+from ...lib.utils.resources_utils import get_resource_type_by_resource_cls
+
+
+def _next_ids(table_name, count):
+    return [
+        row[0] for row in DBSession.execute(
+            text(
+                "select nextval('%s_id_seq') from generate_series(1, :count)"
+                % table_name
+            ),
+            {'count': count}
+        )
+    ]
+
+
+def get_contracts_commissions(keys, date):
+    """get active on date contracts with commissions for
+    (supplier_id, service_id) keys from rules index, commissions
+    are loaded in one query, returns
+    {(supplier_id, service_id): (contract_id, Commission)}
+    """
+    rules_index = get_rules_index()
+    terms = {}
+    for supplier_id, service_id in keys:
+        contract_id = rules_index.get_contract_id(
+            supplier_id, service_id, date
+        )
+        if contract_id:
+            terms[(supplier_id, service_id)] = (
+                contract_id,
+                rules_index.get_commission_id(contract_id, service_id)
+            )
+    commissions_ids = [commission_id for _, commission_id in terms.values()]
+    if not commissions_ids:
+        return {}
+    commissions = dict(
+        (commission.id, commission)
+        for commission in (
+            DBSession.query(Commission)
+            .filter(Commission.id.in_(commissions_ids))
+        )
+    )
+    return dict(
+        (key, (contract_id, commissions[commission_id]))
+        for key, (contract_id, commission_id) in terms.items()
+    )
+
+
+def autoload_calculations(order, employee):
+    """create calculations of order success items by contracts
+    commissions, calculations and their resources are inserted in bulk,
+    returns count of created calculations
+    """
+    items = (
+        DBSession.query(
+            OrderItem.id,
+            OrderItem.supplier_id,
+            OrderItem.service_id,
+            OrderItem.currency_id,
+            OrderItem.price,
+        )
+        .filter(
+            OrderItem.order_id == order.id,
+            OrderItem.status == 'success',
+        )
+        .order_by(OrderItem.id)
+        .all()
+    )
+    if not items:
+        return 0
+    terms = get_contracts_commissions(
+        set((item.supplier_id, item.service_id) for item in items),
+        order.deal_date
+    )
+    items_terms = [
+        terms.get((item.supplier_id, item.service_id), (None, None))
+        for item in items
+    ]
+    resources_ids = _next_ids(Resource.__tablename__, len(items))
+    resource_type = get_resource_type_by_resource_cls(CalculationsResource)
+    DBSession.execute(
+        Resource.__table__.insert().values(modifydt=func.now()),
+        [
+            {
+                'id': resource_id,
+                'resource_type_id': resource_type.id,
+                'maintainer_id': employee.id,
+                'protected': False,
+            }
+            for resource_id in resources_ids
+        ]
+    )
+    calculations = []
+    for item, (contract_id, commission), resource_id in zip(
+        items, items_terms, resources_ids
+    ):
+        # without commission the whole price is commission as before
+        commission_sum = item.price
+        if commission:
+            commission_sum = item.price * commission.percentage / 100
+            if commission.price:
+                commission_sum += currency_exchange(
+                    commission.price,
+                    commission.currency_id,
+                    item.currency_id,
+                    item.supplier_id,
+                    order.deal_date
+                )
+        calculations.append({
+            'resource_id': resource_id,
+            'order_item_id': item.id,
+            'contract_id': contract_id,
+            'price': item.price - commission_sum,
+        })
+    DBSession.execute(Calculation.__table__.insert(), calculations)
+    return len(calculations)
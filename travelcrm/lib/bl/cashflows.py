@@ -1,6 +1,8 @@
 # -*coding: utf-8-*-
 
-from sqlalchemy import func
+from datetime import timedelta
+
+from sqlalchemy import func, select, union_all
 from sqlalchemy.orm import aliased
 
 from ...models import DBSession
@@ -9,26 +11,23 @@ from ...models.subaccount import Subaccount
 from ...models.account import Account
 from ...models.account_item import AccountItem
 from ...models.cashflow import Cashflow
-
-
-def _get_balance(
-    from_cashflows_query, to_cashflows_query, date_from, date_to
-):
+from ...models.balance import (
+    SubaccountBalance,
+    AccountBalance,
+    subaccounts_ledger,
+    accounts_ledger,
+)
+from ...models.cashflow_rollup import rebuild_rollup, check_rollup
+
+
+def _get_balance(ledger, owner_id, date_from, date_to):
+    connection = DBSession.connection()
+    balance = ledger.balance(connection, owner_id, date_to)
     if date_from:
-        from_cashflows_query = from_cashflows_query.filter(
-            Cashflow.date >= date_from
-        )
-        to_cashflows_query = to_cashflows_query.filter(
-            Cashflow.date >= date_from
-        )
-    if date_to:
-        from_cashflows_query = from_cashflows_query.filter(
-            Cashflow.date <= date_to
-        )
-        to_cashflows_query = to_cashflows_query.filter(
-            Cashflow.date <= date_to
+        balance -= ledger.balance(
+            connection, owner_id, date_from - timedelta(days=1)
         )
-    return to_cashflows_query.scalar() - from_cashflows_query.scalar()
+    return balance
 
 
 def query_account_to_cashflows(account_id):
@@ -53,21 +52,7 @@ def get_account_balance(account_id, date_from=None, date_to=None):
     """ get account balance between dates or on particular date
     """
     assert isinstance(account_id, int)
-    sum_expr = func.coalesce(func.sum(Cashflow.sum), 0)
-    from_cashflows_query = (
-        query_account_from_cashflows(account_id)
-        .with_entities(sum_expr)
-    )
-    to_cashflows_query = (
-        query_account_to_cashflows(account_id)
-        .with_entities(sum_expr)
-    )
-    return _get_balance(
-        from_cashflows_query,
-        to_cashflows_query,
-        date_from,
-        date_to
-    )
+    return _get_balance(accounts_ledger, account_id, date_from, date_to)
 
 
 def query_subaccount_to_cashflows(subaccount_id):
@@ -90,23 +75,143 @@ def get_subaccount_balance(subaccount_id, date_from=None, date_to=None):
     """ get subaccount balance between dates or on particular date
     """
     assert isinstance(subaccount_id, int)
-    sum_expr = func.coalesce(func.sum(Cashflow.sum), 0)
-    from_cashflows_query = (
-        query_subaccount_from_cashflows(subaccount_id)
-        .with_entities(sum_expr)
+    return _get_balance(subaccounts_ledger, subaccount_id, date_from, date_to)
+
+
+def _subaccounts_flows():
+    return union_all(
+        select([
+            Cashflow.subaccount_to_id.label('owner_id'),
+            Cashflow.date,
+            Cashflow.sum,
+        ])
+        .where(Cashflow.subaccount_to_id != None),
+        select([
+            Cashflow.subaccount_from_id.label('owner_id'),
+            Cashflow.date,
+            (-Cashflow.sum).label('sum'),
+        ])
+        .where(Cashflow.subaccount_from_id != None),
+    ).alias('flows')
+
+
+def _accounts_flows():
+    return union_all(
+        select([
+            Subaccount.account_id.label('owner_id'),
+            Cashflow.date,
+            Cashflow.sum,
+        ])
+        .where(Subaccount.id == Cashflow.subaccount_to_id),
+        select([
+            Subaccount.account_id.label('owner_id'),
+            Cashflow.date,
+            (-Cashflow.sum).label('sum'),
+        ])
+        .where(Subaccount.id == Cashflow.subaccount_from_id),
+    ).alias('flows')
+
+
+def _query_balances(owner_id, balance, flows, date_from, date_to):
+    if not date_from and not date_to:
+        return DBSession.query(
+            owner_id.label('owner_id'),
+            balance.label('balance'),
+        )
+    query = DBSession.query(
+        flows.c.owner_id.label('owner_id'),
+        func.sum(flows.c.sum).label('balance'),
     )
-    to_cashflows_query = (
-        query_subaccount_to_cashflows(subaccount_id)
-        .with_entities(sum_expr)
+    if date_from:
+        query = query.filter(flows.c.date >= date_from)
+    if date_to:
+        query = query.filter(flows.c.date <= date_to)
+    return query.group_by(flows.c.owner_id)
+
+
+def query_subaccounts_balances(date_from=None, date_to=None):
+    """query of (owner_id, balance) of subaccounts between dates
+    or current balances if no dates given, owners without cashflows
+    are absent
+    """
+    return _query_balances(
+        SubaccountBalance.subaccount_id, SubaccountBalance.balance,
+        _subaccounts_flows(), date_from, date_to
     )
-    return _get_balance(
-        from_cashflows_query,
-        to_cashflows_query,
-        date_from,
-        date_to
+
+
+def query_accounts_balances(date_from=None, date_to=None):
+    """query of (owner_id, balance) of accounts between dates
+    or current balances if no dates given, owners without cashflows
+    are absent
+    """
+    return _query_balances(
+        AccountBalance.account_id, AccountBalance.balance,
+        _accounts_flows(), date_from, date_to
     )
 
 
+def get_subaccounts_balances(subaccounts_ids, date_from=None, date_to=None):
+    """get balances of many subaccounts with one query
+    as {subaccount_id: balance}
+    """
+    query = query_subaccounts_balances(date_from, date_to).subquery()
+    balances = dict.fromkeys(subaccounts_ids, 0)
+    if subaccounts_ids:
+        balances.update(
+            DBSession.query(query)
+            .filter(query.c.owner_id.in_(subaccounts_ids))
+        )
+    return balances
+
+
+def get_accounts_balances(accounts_ids, date_from=None, date_to=None):
+    """get balances of many accounts with one query
+    as {account_id: balance}
+    """
+    query = query_accounts_balances(date_from, date_to).subquery()
+    balances = dict.fromkeys(accounts_ids, 0)
+    if accounts_ids:
+        balances.update(
+            DBSession.query(query)
+            .filter(query.c.owner_id.in_(accounts_ids))
+        )
+    return balances
+
+
+def rebuild_balances():
+    """rebuild accounts and subaccounts balances and snapshots
+    """
+    connection = DBSession.connection()
+    subaccounts_ledger.rebuild(connection)
+    accounts_ledger.rebuild(connection)
+
+
+def check_balances():
+    """compare stored balances with sums of cashflows,
+    return list of (ledger name, owner_id, date, stored, calculated)
+    """
+    connection = DBSession.connection()
+    return [
+        (ledger.name,) + mismatch
+        for ledger in (subaccounts_ledger, accounts_ledger)
+        for mismatch in ledger.check(connection)
+    ]
+
+
+def rebuild_cashflows_rollup():
+    """rebuild daily revenue and expenses of accounts by account items
+    """
+    rebuild_rollup(DBSession.connection())
+
+
+def check_cashflows_rollup():
+    """compare stored daily rollup with sums of cashflows,
+    return list of (date, account_id, account_item_id, stored, calculated)
+    """
+    return check_rollup(DBSession.connection())
+
+
 def query_cashflows():
     """get common query for cashflows
     """
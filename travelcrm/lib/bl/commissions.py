@@ -1,10 +1,9 @@
 # -*coding: utf-8-*-
 
-from ...models import DBSession
-from ...models.contract import Contract
 from ...models.commission import Commission
 
 from ...lib.bl.currencies_rates import currency_exchange
+from ...lib.bl.rules import get_rules_index
 
 
 def get_commission(
@@ -16,14 +15,8 @@ def get_commission(
     assert isinstance(currency_id, int)
     assert isinstance(service_id, int)
 
-    return (
-        DBSession.query(Commission)
-        .join(Contract, Commission.contract)
-        .filter(
-            Contract.id == contract_id,
-            Commission.service_id == service_id,
-        )
-        .first()
+    return Commission.get(
+        get_rules_index().get_commission_id(contract_id, service_id)
     )
 
 
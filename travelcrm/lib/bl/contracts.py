@@ -1,12 +1,10 @@
 # -*coding: utf-8-*-
 
-from datetime import datetime
-
 from ...models import DBSession
 from ...models.contract import Contract
-from ...models.supplier import Supplier
 from ...models.commission import Commission
 from ...resources.commissions import CommissionsResource
+from ...lib.bl.rules import get_rules_index, as_of_date
 from ...lib.utils.security_utils import get_auth_employee
 
 
@@ -15,20 +13,10 @@ def get_contract(supplier_id, service_id, date=None):
     """
     assert isinstance(supplier_id, int)
     assert isinstance(service_id, int)
-    if not date:
-        date = datetime.now()
-    return (
-        DBSession.query(Contract)
-        .join(Supplier, Contract.supplier)
-        .join(Commission, Contract.commissions)
-        .filter(
-            Contract.condition_active(),
-            Contract.date <= date,
-            Supplier.id == supplier_id,
-            Commission.service_id == service_id,
+    return Contract.get(
+        get_rules_index().get_contract_id(
+            supplier_id, service_id, as_of_date(date)
         )
-        .order_by(Contract.date.desc())
-        .first()
     )
 
 
@@ -1,23 +1,52 @@
 # -*coding: utf-8-*-
 
-from sqlalchemy import desc
+from sqlalchemy import event
 
 from ...models import DBSession
 from ...models.currency_rate import CurrencyRate
+from ..utils.cache_utils import SchemaCache, EffectiveDatedIndex
 
 
-def get_currency_rate(currency_id, supplier_id, date):
-    currency_rate = (
-        DBSession.query(CurrencyRate)
-        .filter(
-            CurrencyRate.currency_id == currency_id,
-            CurrencyRate.supplier_id == supplier_id,
-            CurrencyRate.date <= date
+CURRENCIES_RATES_TTL = 300
+
+
+def _load_currencies_rates_index():
+    """rates of tenant by (currency_id, supplier_id)
+    """
+    return EffectiveDatedIndex(
+        ((currency_id, supplier_id), date, rate)
+        for currency_id, supplier_id, date, rate in (
+            DBSession.query(
+                CurrencyRate.currency_id,
+                CurrencyRate.supplier_id,
+                CurrencyRate.date,
+                CurrencyRate.rate,
+            )
+            .order_by(CurrencyRate.date)
         )
-        .order_by(CurrencyRate.currency_id, desc(CurrencyRate.date))
-        .first()
     )
-    return currency_rate.rate if currency_rate else 1
+
+
+currencies_rates_indexes = SchemaCache(
+    _load_currencies_rates_index,
+    ttl=CURRENCIES_RATES_TTL,
+    name='currencies_rates',
+)
+
+
+def currency_rate_changed_event(mapper, connection, target):
+    currencies_rates_indexes.changed(connection)
+
+
+event.listen(CurrencyRate, 'after_insert', currency_rate_changed_event)
+event.listen(CurrencyRate, 'after_update', currency_rate_changed_event)
+event.listen(CurrencyRate, 'after_delete', currency_rate_changed_event)
+
+
+def get_currency_rate(currency_id, supplier_id, date):
+    return currencies_rates_indexes.get().get(
+        (currency_id, supplier_id), date, default=1
+    )
 
 
 def currency_exchange(
@@ -29,6 +58,30 @@ def currency_exchange(
     return base_amount / rate_to
 
 
+def currency_exchange_many(
+    amounts, from_currencies_ids, to_currency_id, suppliers_ids, dates
+):
+    """exchange list of amounts to currency in one pass,
+    amounts already in the currency are returned as is,
+    to_currency_id None means base currency
+    """
+    index = currencies_rates_indexes.get()
+    result = []
+    for amount, from_currency_id, supplier_id, date in zip(
+        amounts, from_currencies_ids, suppliers_ids, dates
+    ):
+        if from_currency_id == to_currency_id:
+            result.append(amount)
+            continue
+        rate_from = index.get((from_currency_id, supplier_id), date, 1)
+        if to_currency_id is None:
+            result.append(amount * rate_from)
+            continue
+        rate_to = index.get((to_currency_id, supplier_id), date, 1)
+        result.append(amount * rate_from / rate_to)
+    return result
+
+
 def currency_base_exchange(amount, currency_id, supplier_id, date):
     base_rate = get_currency_rate(currency_id, supplier_id, date)
     return base_rate * amount
@@ -0,0 +1,264 @@
+# -*coding: utf-8-*-
+
+import transaction
+from sqlalchemy import event, func, literal, select
+from sqlalchemy.orm.attributes import get_history
+
+from ...models import DBSession
+from ...models.resource import Resource
+from ...models.employee_current_state import EmployeeCurrentState
+from ...models.appointment import Appointment
+from ...models.position import Position
+from ...models.order import Order
+from ...models.order_item import OrderItem
+from ...models.lead import Lead
+from ...models.country import Country
+from ...models.tour import Tour
+from ...models.hotel import Hotel
+from ...models.location import Location
+from ...models.region import Region
+from ...models.dashboard_stat import DashboardStat
+
+
+def _query_orders_stats():
+    return (
+        DBSession.query(
+            Order.deal_date,
+            EmployeeCurrentState.structure_id,
+            literal(u''),
+            func.count(Order.id),
+        )
+        .join(Resource, Order.resource)
+        .join(
+            EmployeeCurrentState,
+            EmployeeCurrentState.employee_id == Resource.maintainer_id
+        )
+        .group_by(Order.deal_date, EmployeeCurrentState.structure_id)
+    ), Order.deal_date
+
+
+def _query_leads_stats():
+    return (
+        DBSession.query(
+            Lead.lead_date,
+            EmployeeCurrentState.structure_id,
+            literal(u''),
+            func.count(Lead.id),
+        )
+        .join(Resource, Lead.resource)
+        .join(
+            EmployeeCurrentState,
+            EmployeeCurrentState.employee_id == Resource.maintainer_id
+        )
+        .group_by(Lead.lead_date, EmployeeCurrentState.structure_id)
+    ), Lead.lead_date
+
+
+def _query_countries_stats():
+    return (
+        DBSession.query(
+            Order.deal_date,
+            EmployeeCurrentState.structure_id,
+            Country.iso_code,
+            func.count(Country.id),
+        )
+        .join(Resource, Order.resource)
+        .join(
+            EmployeeCurrentState,
+            EmployeeCurrentState.employee_id == Resource.maintainer_id
+        )
+        .join(OrderItem, Order.orders_items)
+        .join(Tour, OrderItem.tour)
+        .join(Hotel, Tour.hotel)
+        .join(Location, Hotel.location)
+        .join(Region, Location.region)
+        .join(Country, Region.country)
+        .filter(Order.condition_status_success())
+        .group_by(
+            Order.deal_date,
+            EmployeeCurrentState.structure_id,
+            Country.iso_code
+        )
+    ), Order.deal_date
+
+
+# kinds of stats with queries of (date, structure_id, key, quan)
+# and their date column
+STATS = {
+    'orders': _query_orders_stats,
+    'leads': _query_leads_stats,
+    'countries': _query_countries_stats,
+}
+# kinds of stats depending on resource
+RESOURCES_STATS = (
+    (Order, ('orders', 'countries'), 'deal_date'),
+    (Lead, ('leads',), 'lead_date'),
+)
+
+
+def refresh_dashboard_stats(kind, dates=None):
+    """recalculate stats of kind for dates, all stats if dates is None
+    """
+    query, date_column = STATS[kind]()
+    delete = DBSession.query(DashboardStat).filter(
+        DashboardStat.kind == kind
+    )
+    if dates is not None:
+        dates = list(dates)
+        if not dates:
+            return
+        query = query.filter(date_column.in_(dates))
+        delete = delete.filter(DashboardStat.date.in_(dates))
+    delete.delete(synchronize_session=False)
+    query = query.filter(date_column != None).add_columns(literal(kind))
+    DBSession.execute(
+        DashboardStat.__table__.insert().from_select(
+            ['date', 'structure_id', 'key', 'quan', 'kind'],
+            query.statement
+        )
+    )
+
+
+def rebuild_dashboard_stats():
+    """recalculate all dashboard stats
+    """
+    for kind in STATS:
+        refresh_dashboard_stats(kind)
+
+
+def _refresh_scheduled_stats(scheduled):
+    DBSession.flush()
+    for kind, dates in scheduled.items():
+        refresh_dashboard_stats(kind, dates)
+
+
+def schedule_dashboard_stats_refresh(kind, dates):
+    """refresh stats of kind for dates before the current
+    transaction commit, so all changes of request are counted once
+    """
+    txn = transaction.get()
+    session = DBSession()
+    txn_scheduled = session.info.get('dashboard_stats')
+    if txn_scheduled is None or txn_scheduled[0] is not txn:
+        txn_scheduled = (txn, {})
+        session.info['dashboard_stats'] = txn_scheduled
+        txn.addBeforeCommitHook(
+            _refresh_scheduled_stats, (txn_scheduled[1],)
+        )
+    txn_scheduled[1].setdefault(kind, set()).update(
+        date for date in dates if date is not None
+    )
+
+
+def _history_dates(target, name):
+    history = get_history(target, name)
+    return (
+        list(history.deleted or ())
+        + list(history.unchanged or ())
+        + list(history.added or ())
+    )
+
+
+def _schedule_dates(connection, cls, kinds, date_attr, condition):
+    """schedule refresh of dates of cls objects matching condition
+    """
+    date_column = getattr(cls, date_attr)
+    dates = [
+        row[0] for row in connection.execute(
+            select([date_column])
+            .select_from(
+                cls.__table__.join(
+                    Resource.__table__, cls.resource_id == Resource.id
+                )
+            )
+            .where(condition)
+            .distinct()
+        )
+    ]
+    for kind in kinds:
+        schedule_dashboard_stats_refresh(kind, dates)
+
+
+def stats_object_event(mapper, connection, target):
+    """refresh old and new dates of changed order or lead,
+    dates are taken in flush while attributes history is kept
+    """
+    for cls, kinds, date_attr in RESOURCES_STATS:
+        if isinstance(target, cls):
+            dates = _history_dates(target, date_attr)
+            for kind in kinds:
+                schedule_dashboard_stats_refresh(kind, dates)
+
+
+def stats_order_item_event(mapper, connection, target):
+    orders_ids = [
+        order_id for order_id in _history_dates(target, 'order_id')
+        if order_id
+    ]
+    if orders_ids:
+        _schedule_dates(
+            connection, Order, ('countries',), 'deal_date',
+            Order.id.in_(orders_ids)
+        )
+
+
+def stats_maintainer_event(mapper, connection, target):
+    """follow order or lead assigned to other maintainer
+    """
+    if not get_history(target, 'maintainer_id').has_changes():
+        return
+    for cls, kinds, date_attr in RESOURCES_STATS:
+        _schedule_dates(
+            connection, cls, kinds, date_attr, Resource.id == target.id
+        )
+
+
+def _schedule_maintainers_dates(connection, maintainers):
+    for cls, kinds, date_attr in RESOURCES_STATS:
+        _schedule_dates(
+            connection, cls, kinds, date_attr,
+            Resource.maintainer_id.in_(maintainers)
+        )
+
+
+def schedule_employees_stats_refresh(employees_ids):
+    """refresh stats of orders and leads maintained by employees
+    whose structure was changed without appointment flush, as when
+    future dated appointment comes into force
+    """
+    _schedule_maintainers_dates(DBSession.connection(), employees_ids)
+
+
+def stats_appointment_event(mapper, connection, target):
+    """follow employee moving to other structure
+    """
+    employees_ids = [
+        employee_id for employee_id in _history_dates(target, 'employee_id')
+        if employee_id
+    ]
+    if employees_ids:
+        _schedule_maintainers_dates(connection, employees_ids)
+
+
+def stats_position_event(mapper, connection, target):
+    """follow position moving to other structure
+    """
+    if get_history(target, 'structure_id').has_changes():
+        _schedule_maintainers_dates(
+            connection,
+            select([EmployeeCurrentState.employee_id])
+            .where(EmployeeCurrentState.position_id == target.id)
+        )
+
+
+for _cls, _event in (
+    (Order, stats_object_event),
+    (Lead, stats_object_event),
+    (OrderItem, stats_order_item_event),
+    (Appointment, stats_appointment_event),
+):
+    event.listen(_cls, 'after_insert', _event)
+    event.listen(_cls, 'after_update', _event)
+    event.listen(_cls, 'after_delete', _event)
+event.listen(Resource, 'after_update', stats_maintainer_event)
+event.listen(Position, 'after_update', stats_position_event)
@@ -1,21 +1,24 @@
 # -*coding: utf-8-*-
 
 from types import ClassType
-from datetime import datetime
 
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, bindparam
 
 from ...models import DBSession
 from ...models.employee import Employee
 from ...models.appointment import Appointment
-from ...models.permision import Permision
-from ...models.structure import Structure
+from ...models.structure import Structure, structure_closure
 from ...models.position import Position
 from ...models.dismissal import Dismissal
+from ...models.employee_current_state import (
+    EmployeeCurrentState,
+    refresh_employees_current_state,
+)
 from ..utils.resources_utils import (
     get_resource_type_by_resource,
     get_resource_type_by_resource_cls
 )
+from .permisions import get_position_permisions_matrix
 
 
 def query_employees_dismissed():
@@ -42,14 +45,8 @@ def query_employees_dismissed():
 def is_employee_currently_dismissed(employee):
     """check if employee is dismissed now
     """
-    query = (
-        query_employees_dismissed()
-        .filter(
-            Dismissal.employee_id == employee.id,
-            Dismissal.date < datetime.now()
-        )
-    )
-    return DBSession.query(query.exists()).scalar()
+    state = EmployeeCurrentState.get(employee.id)
+    return bool(state and state.is_dismissed())
 
 
 def query_employees_position(date=None):
@@ -74,8 +71,11 @@ def get_employee_position(employee, date=None):
     if date is None return current employee position
     """
     assert isinstance(employee, Employee), type(employee)
-    if is_employee_currently_dismissed(employee):
+    state = EmployeeCurrentState.get(employee.id)
+    if not state or state.is_dismissed():
         return None
+    if date is None:
+        return Position.get(state.position_id)
     query = (
         query_employees_position(date)
         .filter(Appointment.condition_employee_id(employee.id))
@@ -83,6 +83,12 @@ def get_employee_position(employee, date=None):
     return query.first()
 
 
+def rebuild_employees_current_state(employee_id=None):
+    """rebuild materialized current state of employees
+    """
+    refresh_employees_current_state(DBSession.connection(), employee_id)
+
+
 def get_employee_structure(employee, date=None):
     """get employee structure by date
     if date is None return current employee structure
@@ -92,8 +98,8 @@ def get_employee_structure(employee, date=None):
         return position.structure
 
 
-def get_employee_permisions(employee, resource):
-    """retrieve permissions for resource
+def get_position_permisions(position, resource):
+    """retrieve position permissions for resource from compiled matrix
     resource can be instance of context or context class
     """
     if isinstance(resource, (type, ClassType)):
@@ -104,41 +110,49 @@ def get_employee_permisions(employee, resource):
     if not rt.is_active():
         return
 
-    employee_position = get_employee_position(employee)
-    permisions = (
-        employee_position.permisions.filter(
-            Permision.condition_resource_type_id(rt.id)
-        )
-        .first()
-    )
-    return permisions
+    return get_position_permisions_matrix(position.id).get(rt.id)
 
 
-def query_employee_scope(employee, resource):
-    """get employee scope for resource
+def get_employee_permisions(employee, resource):
+    """retrieve permissions for resource
     resource can be instance of context or context class
     """
-    permisions = get_employee_permisions(employee, resource)
-    if permisions.scope_type == 'all':
+    employee_position = get_employee_position(employee)
+    return get_position_permisions(employee_position, resource)
+
+
+def query_permisions_scope(permisions):
+    """get structures scope for permissions
+    """
+    if permisions and permisions.scope_type == 'all':
         return DBSession.query(Structure.id)
     elif(
-        permisions.scope_type == 'structure'
+        permisions
+        and permisions.scope_type == 'structure'
         and permisions.structure_id
     ):
-        structure = permisions.structure
-        children_structures_ids = [
-            item.id for item in structure.get_all_descendants()
-        ]
-        children_structures_ids.append(permisions.structure_id)
         return (
-            DBSession.query(Structure.id)
-            .filter(Structure.id.in_(children_structures_ids))
+            DBSession.query(
+                structure_closure.c.descendant_id.label('id')
+            )
+            .filter(
+                structure_closure.c.ancestor_id
+                == bindparam('scope_structure_id', permisions.structure_id)
+            )
         )
     else:
         # has any permissions
         return DBSession.query(Structure.id).filter(Structure.id == None)
 
 
+def query_employee_scope(employee, resource):
+    """get employee scope for resource
+    resource can be instance of context or context class
+    """
+    permisions = get_employee_permisions(employee, resource)
+    return query_permisions_scope(permisions)
+
+
 def get_employee_last_appointment(employee_id):
     employee = Employee.get(employee_id)
     if employee:
@@ -1,5 +1,7 @@
 # -*coding: utf-8-*-
 
+from sqlalchemy.orm.attributes import get_history
+
 from ...resources.subaccounts import SubaccountsResource
 from ...models.income import Income
 from ...models.invoice import Invoice
@@ -11,11 +13,19 @@ from ...lib.bl.subaccounts import (
     get_company_subaccount,
     generate_subaccount_name
 )
-from ...lib.bl.invoices import get_invoice_payments_sum
 from ...lib.utils.resources_utils import get_resource_class
 from ...lib.utils.security_utils import get_auth_employee
 
 
+def _counted_sum(income):
+    """sum of edited income already counted in stored invoice debt
+    """
+    if not income.id or get_history(income, 'invoice_id').deleted:
+        return 0
+    history = get_history(income, 'sum')
+    return (history.deleted or history.unchanged or [0])[0]
+
+
 def make_payment(request, income):
     assert isinstance(income, Income), u'Income obj expected got' % type(income)
     invoice = Invoice.get(income.invoice_id)
@@ -51,10 +61,7 @@ def make_payment(request, income):
             vat=invoice.vat,
         )
     )
-    payments_sum = get_invoice_payments_sum(invoice.id)
-    if income.id:
-        payments_sum -= income.sum
-    debt = invoice.final_price - payments_sum
+    debt = invoice.debt + _counted_sum(income)
     if debt > 0:
         cashflows.append(
             Cashflow(
@@ -1,8 +1,15 @@
 # -*coding: utf-8-*-
 
-from ...models.invoice import Invoice
+from ...models import DBSession
+from ...models.invoice import Invoice, refresh_invoices_totals
 
 
 def get_invoice_payments_sum(invoice_id):
     invoice = Invoice.get(invoice_id)
-    return reduce(lambda s, item: s + item.sum, invoice.incomes, 0)
+    return invoice.payments
+
+
+def rebuild_invoices_totals(invoices_ids=None):
+    """recalculate stored invoices totals to reconcile drift
+    """
+    refresh_invoices_totals(DBSession.connection(), invoices_ids)
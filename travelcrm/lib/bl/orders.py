@@ -1,20 +1,85 @@
 # -*coding: utf-8-*-
 
+from collections import namedtuple, OrderedDict
+
+from ...models import DBSession
 from ...models.order import Order
-from ...lib.bl.orders_items import get_price, get_discount
+from ...models.order_item import OrderItem
+from ...lib.bl.currencies_rates import currency_exchange_many
 
 
-def get_order_price(order_id, date, currency_id):
-    order = Order.get(order_id)
-    return reduce(
-        lambda x, item: x + get_price(item, date, currency_id),
-        order.orders_items, 0
+OrderItemPrice = namedtuple(
+    'OrderItemPrice',
+    ['order_item_id', 'price', 'discount', 'final_price']
+)
+OrderPrice = namedtuple(
+    'OrderPrice',
+    ['order_id', 'price', 'discount', 'final_price', 'items']
+)
+
+
+def get_orders_prices(
+    orders_ids, currency_id=None, date=None, success_only=False
+):
+    """get prices of orders and their items converted to currency
+    as of date, base currency and deal date of the order are used
+    when not given. Items of all orders are loaded in one query,
+    returns {order_id: OrderPrice}, items are ordered by id
+    """
+    orders_ids = list(orders_ids)
+    if not orders_ids:
+        return {}
+    query = (
+        DBSession.query(
+            OrderItem.id,
+            OrderItem.order_id,
+            OrderItem.currency_id,
+            OrderItem.supplier_id,
+            OrderItem.price,
+            OrderItem.discount,
+            Order.deal_date,
+        )
+        .join(Order, OrderItem.order)
+        .filter(OrderItem.order_id.in_(orders_ids))
+        .order_by(OrderItem.id)
+    )
+    if success_only:
+        query = query.filter(OrderItem.status == 'success')
+    rows = query.all()
+    currencies_ids = [row.currency_id for row in rows]
+    suppliers_ids = [row.supplier_id for row in rows]
+    dates = [date or row.deal_date for row in rows]
+    prices = currency_exchange_many(
+        [row.price for row in rows],
+        currencies_ids, currency_id, suppliers_ids, dates
+    )
+    discounts = currency_exchange_many(
+        [row.discount for row in rows],
+        currencies_ids, currency_id, suppliers_ids, dates
     )
+    items = OrderedDict((order_id, []) for order_id in orders_ids)
+    for row, price, discount in zip(rows, prices, discounts):
+        items[row.order_id].append(
+            OrderItemPrice(row.id, price, discount, price - discount)
+        )
+    return dict(
+        (
+            order_id,
+            OrderPrice(
+                order_id,
+                sum((item.price for item in order_items), 0),
+                sum((item.discount for item in order_items), 0),
+                sum((item.final_price for item in order_items), 0),
+                order_items,
+            )
+        )
+        for order_id, order_items in items.items()
+    )
+
+
+def get_order_price(order_id, date, currency_id):
+    return get_orders_prices([order_id], currency_id, date)[order_id].price
 
 
 def get_order_discount(order_id, date, currency_id):
-    order = Order.get(order_id)
-    return reduce(
-        lambda x, item: x + get_discount(item, date, currency_id),
-        order.orders_items, 0
-    )
+    return get_orders_prices([order_id], currency_id, date)[order_id].discount
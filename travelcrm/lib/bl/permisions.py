@@ -1,9 +1,79 @@
 # -*coding: utf-8-*-
 
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
 from sqlalchemy.orm.session import make_transient
 
 from ...models import DBSession
 from ...models.permision import Permision
+from ..utils.cache_utils import SchemaCache
+
+
+PERMISIONS_TTL = 300
+
+
+PermisionsEntry = namedtuple(
+    'PermisionsEntry', ['permisions', 'scope_type', 'structure_id']
+)
+
+
+class PermisionsMatrix(object):
+    """compiled permissions of positions
+    {position_id: {resource_type_id: PermisionsEntry}}
+
+    position permissions are loaded on first access
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions = {}
+
+    def get(self, position_id):
+        position = self._positions.get(position_id)
+        if position is None:
+            position = self._load(position_id)
+            with self._lock:
+                self._positions[position_id] = position
+        return position
+
+    def _load(self, position_id):
+        query = (
+            DBSession.query(
+                Permision.resource_type_id,
+                Permision.permisions,
+                Permision.scope_type,
+                Permision.structure_id,
+            )
+            .filter(Permision.condition_position_id(position_id))
+        )
+        return {
+            row.resource_type_id: PermisionsEntry(
+                tuple(row.permisions or ()), row.scope_type, row.structure_id
+            )
+            for row in query
+        }
+
+
+permisions_matrix = SchemaCache(
+    PermisionsMatrix, ttl=PERMISIONS_TTL, name='permisions'
+)
+
+
+def get_position_permisions_matrix(position_id):
+    """get compiled permissions of position by resource type id
+    """
+    return permisions_matrix.get().get(position_id)
+
+
+def _invalidate_permisions_matrix(mapper, connection, target):
+    permisions_matrix.changed(connection)
+
+
+event.listen(Permision, 'after_insert', _invalidate_permisions_matrix)
+event.listen(Permision, 'after_update', _invalidate_permisions_matrix)
+event.listen(Permision, 'after_delete', _invalidate_permisions_matrix)
 
 
 def copy_from_position(source_position_id, target_position_id):
@@ -19,6 +89,8 @@ def copy_from_position(source_position_id, target_position_id):
         )
         .delete()
     )
+    # bulk delete does not emit mapper events
+    permisions_matrix.changed(DBSession.connection())
     permisions_from = (
         DBSession.query(Permision)
         .filter(
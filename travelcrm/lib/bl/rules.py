@@ -0,0 +1,112 @@
+# -*coding: utf-8-*-
+
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from ...models import DBSession
+from ...models.contract import Contract
+from ...models.commission import Commission
+from ...models.supplier import Supplier, supplier_contract
+from ...models.vat import Vat
+from ..utils.cache_utils import SchemaCache, EffectiveDatedIndex
+
+
+RULES_TTL = 300
+
+
+class RulesIndex(object):
+    """effective-dated contracts and VAT rules and contracts commissions
+    of tenant, values are ids of rules
+    """
+
+    def __init__(self, contracts, commissions, vats):
+        # (supplier_id, service_id) -> active contracts by contract date
+        self.contracts = EffectiveDatedIndex(contracts)
+        # (contract_id, service_id) -> commission
+        self.commissions = {}
+        for key, commission_id in commissions:
+            self.commissions.setdefault(key, commission_id)
+        # (account_id, service_id) -> vats by date
+        self.vats = EffectiveDatedIndex(vats)
+
+    def get_contract_id(self, supplier_id, service_id, date):
+        return self.contracts.get((supplier_id, service_id), date)
+
+    def get_commission_id(self, contract_id, service_id):
+        return self.commissions.get((contract_id, service_id))
+
+    def get_vat_id(self, account_id, service_id, date):
+        return self.vats.get((account_id, service_id), date)
+
+
+def _load_rules_index():
+    contracts = (
+        DBSession.query(
+            supplier_contract.c.supplier_id,
+            Commission.service_id,
+            Contract.date,
+            Contract.id,
+        )
+        .join(Contract, supplier_contract.c.contract_id == Contract.id)
+        .join(Commission, Contract.commissions)
+        .filter(Contract.condition_active())
+        .distinct()
+        .order_by(Contract.date, Contract.id)
+    )
+    commissions = (
+        DBSession.query(
+            Contract.id,
+            Commission.service_id,
+            Commission.id,
+        )
+        .join(Commission, Contract.commissions)
+        .order_by(Commission.id)
+    )
+    vats = (
+        DBSession.query(Vat.account_id, Vat.service_id, Vat.date, Vat.id)
+        .order_by(Vat.date, Vat.id)
+    )
+    return RulesIndex(
+        (
+            ((supplier_id, service_id), contract_date, contract_id)
+            for supplier_id, service_id, contract_date, contract_id
+            in contracts
+        ),
+        (
+            ((contract_id, service_id), commission_id)
+            for contract_id, service_id, commission_id in commissions
+        ),
+        (
+            ((account_id, service_id), vat_date, vat_id)
+            for account_id, service_id, vat_date, vat_id in vats
+        ),
+    )
+
+
+rules_indexes = SchemaCache(_load_rules_index, ttl=RULES_TTL, name='rules')
+
+
+def rule_changed_event(mapper, connection, target):
+    rules_indexes.changed(connection)
+
+
+# suppliers contracts are linked on supplier save
+for _cls in (Contract, Commission, Vat, Supplier):
+    event.listen(_cls, 'after_insert', rule_changed_event)
+    event.listen(_cls, 'after_update', rule_changed_event)
+    event.listen(_cls, 'after_delete', rule_changed_event)
+
+
+def get_rules_index():
+    return rules_indexes.get()
+
+
+def as_of_date(value=None):
+    """rules are effective by dates, so datetime is truncated
+    """
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
@@ -1,49 +1,44 @@
 # -*coding: utf-8-*-
 
-from sqlalchemy import cast, Integer, Text, func
-from sqlalchemy.dialects.postgresql import array
-from sqlalchemy.orm import aliased
+from sqlalchemy import text
 
 from ...models import DBSession
 from ...models.structure import Structure
 
 
-def query_recursive_tree():
-    structure_tree = (
-        DBSession.query(
-            Structure.id,
-            Structure.name,
-            Structure.parent_id,
-            cast(1, Integer()).label('depth'),
-            array([cast(Structure.name, Text)]).label('name_path'),
-            array([Structure.id]).label('path'),
-        )
-        .filter(Structure.condition_root_level())
-        .cte(name='structure_tree', recursive=True)
+def query_structures_tree():
+    return DBSession.query(
+        Structure.id,
+        Structure.name,
+        Structure.parent_id,
+        Structure.name_path.label('name_path'),
     )
-    st = aliased(structure_tree, name='st')
-    s = aliased(Structure, name='s')
-    structure_tree = structure_tree.union_all(
-        DBSession.query(
-            s.id, s.name, s.parent_id,
-            (st.c.depth + 1).label('depth'),
-            func.array_append(
-                st.c.name_path, cast(s.name, Text)
-            ).label('name_path'),
-            func.array_append(st.c.path, s.id).label('path'),
-        )
-        .filter(s.parent_id == st.c.id)
-    )
-    return DBSession.query(structure_tree)
 
 
 def get_structure_name_path(structure):
     assert isinstance(structure, Structure), u'Must be Structure instance'
-    subq = query_recursive_tree().subquery()
-    path = (
-        DBSession.query(subq.c.name_path)
-        .filter(subq.c.id == structure.id)
-        .scalar()
-    )
-    if path:
-        return path
+    if structure.name_path:
+        return structure.name_path
+
+
+def rebuild_structures_tree():
+    """rebuild structures closure table and name paths from scratch
+    """
+    DBSession.execute('delete from structure_closure')
+    DBSession.execute(text(
+        'insert into structure_closure (ancestor_id, descendant_id, depth) '
+        'with recursive tree (ancestor_id, descendant_id, depth) as ('
+        '  select id, id, 0 from structure '
+        '  union all '
+        '  select tree.ancestor_id, s.id, tree.depth + 1 '
+        '  from tree join structure s on s.parent_id = tree.descendant_id'
+        ') select ancestor_id, descendant_id, depth from tree'
+    ))
+    DBSession.execute(text(
+        'update structure set name_path = ('
+        '  select array_agg(a.name order by c.depth desc) '
+        '  from structure_closure c '
+        '  join structure a on a.id = c.ancestor_id '
+        '  where c.descendant_id = structure.id'
+        ')'
+    ))
@@ -6,6 +6,7 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.account import Account
 from ...models.subaccount import Subaccount
+from ...models.subaccount_source import SubaccountSource
 
 from ...lib.utils.resources_utils import get_resources_types_by_interface
 from ...lib.bl.factories import get_subaccounts_factories_resources_types
@@ -19,18 +20,53 @@ def get_subaccounts_types():
 
 
 def query_resource_data():
+    """subaccounts with data of resources they are bound to
+    """
+    return (
+        DBSession.query(
+            SubaccountSource.resource_id.label('resource_id'),
+            SubaccountSource.source_id.label('id'),
+            SubaccountSource.title.label('title'),
+            Subaccount.name.label('name'),
+            SubaccountSource.subaccount_id.label('subaccount_id'),
+        )
+        .join(Subaccount, SubaccountSource.subaccount)
+    )
+
+
+def rebuild_subaccounts_sources():
+    """rebuild bound resources of subaccounts from subaccounts factories
+    """
     factories = get_subaccounts_factories_resources_types()
     queries = [factory.query_list() for factory in factories]
-    return build_union_query(queries)
+    DBSession.query(SubaccountSource).delete(synchronize_session=False)
+    if not queries:
+        return
+    subq = build_union_query(queries).subquery()
+    query = (
+        DBSession.query(
+            subq.c.subaccount_id,
+            subq.c.resource_id,
+            Resource.resource_type_id,
+            subq.c.id,
+            subq.c.title,
+        )
+        .join(Resource, Resource.id == subq.c.resource_id)
+    )
+    DBSession.execute(
+        SubaccountSource.__table__.insert().from_select(
+            [
+                'subaccount_id', 'resource_id', 'resource_type_id',
+                'source_id', 'title'
+            ],
+            query.statement
+        )
+    )
 
 
 def get_bound_resource_by_subaccount_id(subaccount_id):
-    bound_resource = (
-        query_resource_data()
-        .filter(Subaccount.id == subaccount_id)
-        .first()
-    )
-    return Resource.get(bound_resource.resource_id)
+    subaccount_source = SubaccountSource.get(subaccount_id)
+    return Resource.get(subaccount_source.resource_id)
 
 
 def get_factory_by_subaccount_id(subaccount_id):
@@ -41,30 +77,24 @@ def get_factory_by_subaccount_id(subaccount_id):
 
 
 def get_subaccount_by_source_id(id, resource_type_id, account_id):
-    subq = query_resource_data().subquery()
     return (
         DBSession.query(Subaccount)
-        .select_from(subq)
-        .join(Resource, Resource.id == subq.c.resource_id)
-        .join(Subaccount, Subaccount.id == subq.c.subaccount_id)
+        .join(SubaccountSource, Subaccount.source)
         .filter(
-            subq.c.id == id,
+            SubaccountSource.source_id == id,
+            SubaccountSource.resource_type_id == resource_type_id,
             Subaccount.account_id == account_id,
-            Resource.resource_type_id == resource_type_id
         )
         .first()
     )
 
 
 def get_subaccount_by_source_resource_id(resource_id, account_id):
-    subq = query_resource_data().subquery()
     return (
         DBSession.query(Subaccount)
-        .select_from(subq)
-        .join(Resource, Resource.id == subq.c.resource_id)
-        .join(Subaccount, Subaccount.id == subq.c.subaccount_id)
+        .join(SubaccountSource, Subaccount.source)
         .filter(
-            subq.c.resource_id == resource_id,
+            SubaccountSource.resource_id == resource_id,
             Subaccount.account_id == account_id,
         )
         .first()
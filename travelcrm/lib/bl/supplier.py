@@ -3,13 +3,10 @@
 from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import desc
-
-from ...models import DBSession
-from ...models.supplier import Supplier
 from ...models.commission import Commission
 
 from ...lib.bl.currencies_rates import currency_exchange
+from ...lib.bl.rules import get_rules_index, as_of_date
 
 
 def get_calculation(
@@ -22,16 +19,12 @@ def get_calculation(
     assert isinstance(price, Decimal), u'Must be Decimal instance'
     assert isinstance(service_id, int), u'Must be integer'
 
-    commission = (
-        DBSession.query(Commission)
-        .join(Supplier, Commission.supplier)
-        .filter(
-            Supplier.id == supplier_id,
-            Commission.service_id == service_id,
-            Commission.date_from <= calc_date,
-        )
-        .order_by(desc(Commission.date_from))
-        .first()
+    rules_index = get_rules_index()
+    contract_id = rules_index.get_contract_id(
+        supplier_id, service_id, as_of_date(calc_date)
+    )
+    commission = Commission.get(
+        rules_index.get_commission_id(contract_id, service_id)
     )
     if commission:
         if commission.percentage:
@@ -41,6 +34,7 @@ def get_calculation(
                 commission.price,
                 commission.currency_id,
                 currency_id,
+                supplier_id,
                 calc_date
             )
     return price
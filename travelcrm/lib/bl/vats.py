@@ -2,8 +2,8 @@
 
 from datetime import date
 
-from ...models import DBSession
 from ...models.vat import Vat
+from ...lib.bl.rules import get_rules_index, as_of_date
 
 
 def get_vat(
@@ -15,17 +15,11 @@ def get_vat(
     assert isinstance(calc_date, date), u'Must be date instance'
     assert isinstance(service_id, int), u'Must be integer'
 
-    vat = (
-        DBSession.query(Vat)
-        .filter(
-            Vat.account_id == account_id, 
-            Vat.service_id == service_id,
-            Vat.date <= calc_date
+    return Vat.get(
+        get_rules_index().get_vat_id(
+            account_id, service_id, as_of_date(calc_date)
         )
-        .order_by(Vat.date.desc())
-        .first()
     )
-    return vat
 
 
 def calc_vat(vat_id, amount):
@@ -4,6 +4,7 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.company import Company
 from ...models.subaccount import Subaccount
+from ...models.subaccount_source import SubaccountSource, register_source
 
 from ...lib.factories import SubaccountFactory
 
@@ -40,4 +41,8 @@ class CompanySubaccountFactory(SubaccountFactory):
             .first()
         )
         company.subaccounts.append(subaccount)
+        SubaccountSource.bind(subaccount, company)
         return company
+
+
+register_source(Company)
@@ -4,6 +4,7 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.employee import Employee
 from ...models.subaccount import Subaccount
+from ...models.subaccount_source import SubaccountSource, register_source
 from ...lib.factories import SubaccountFactory
 
 
@@ -38,4 +39,8 @@ class EmployeeSubaccountFactory(SubaccountFactory):
             .first()
         )
         employee.subaccounts.append(subaccount)
+        SubaccountSource.bind(subaccount, employee)
         return employee
+
+
+register_source(Employee)
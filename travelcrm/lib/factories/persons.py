@@ -4,6 +4,7 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.person import Person
 from ...models.subaccount import Subaccount
+from ...models.subaccount_source import SubaccountSource, register_source
 from ...lib.factories import SubaccountFactory
 
 
@@ -38,4 +39,8 @@ class PersonSubaccountFactory(SubaccountFactory):
             .first()
         )
         person.subaccounts.append(subaccount)
+        SubaccountSource.bind(subaccount, person)
         return person
+
+
+register_source(Person)
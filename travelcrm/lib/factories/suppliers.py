@@ -4,6 +4,7 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.supplier import Supplier
 from ...models.subaccount import Subaccount
+from ...models.subaccount_source import SubaccountSource, register_source
 
 from ...lib.factories import SubaccountFactory
 
@@ -40,4 +41,8 @@ class SupplierSubaccountFactory(SubaccountFactory):
             .first()
         )
         supplier.subaccounts.append(subaccount)
+        SubaccountSource.bind(subaccount, supplier)
         return supplier
+
+
+register_source(Supplier)
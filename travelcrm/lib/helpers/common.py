@@ -22,13 +22,15 @@ from ..utils.common_utils import (
     get_tarifs as u_get_tarifs,
     jsonify as _jsonify,
 )
-from ..utils.security_utils import get_auth_employee as u_get_auth_employee
+from ..utils.security_utils import (
+    get_auth_employee as u_get_auth_employee,
+    get_auth_identity as u_get_auth_identity,
+)
 from ..utils.companies_utils import (
     get_company_url as u_get_company_url,
     can_create_company as u_can_create_company,
     get_public_domain as u_get_public_domain,
 )
-from ..bl.employees import get_employee_structure
 from ..bl.tarifs import get_tarifs_list as u_get_tarifs_list
 
 
@@ -114,7 +116,7 @@ def get_locale_name():
 
 
 def get_current_employee_structure(request):
-    return get_employee_structure(u_get_auth_employee(request))
+    return u_get_auth_identity(request).structure
 
 
 def get_base_currency():
@@ -1,9 +1,16 @@
 # -*-coding: utf-8-*-
 
-from datetime import datetime
-
-from sqlalchemy import desc, asc, or_, and_, text, cast, Boolean
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from datetime import datetime, date
+from decimal import Decimal
+
+from sqlalchemy import (
+    desc, asc, or_, and_, text, cast, Boolean, func, tuple_, literal,
+    bindparam, types
+)
 from sqlalchemy.orm import aliased
+from sqlalchemy.util import KeyedTuple
 from zope.interface.verify import verifyObject
 
 from ...interfaces import IResourceType
@@ -11,16 +18,13 @@ from ...models import DBSession
 from ...models.resource import Resource
 from ...models.structure import Structure
 from ...models.employee import Employee
-from ...models.position import Position
-from ...models.appointment import Appointment
+from ...models.employee_current_state import EmployeeCurrentState
 
-from ..utils.common_utils import serialize
-from ..utils.security_utils import get_auth_employee
+from ..utils.common_utils import serialize, get_formatter
+from ..utils.cache_utils import SchemaCache
+from ..utils.security_utils import get_auth_identity
 
-from ..bl.employees import (
-    query_employee_scope,
-    query_employees_position
-)
+from ..bl.employees import query_permisions_scope
 from sqlalchemy.orm.util import outerjoin
 
 
@@ -42,12 +46,169 @@ def query_serialize(query):
     return [query_row_serialize_format(row) for row in query]
 
 
+def _not_null(func):
+    def _serializer(value):
+        if value is None:
+            return None
+        return func(value)
+    return _serializer
+
+
+class RowSerializer(object):
+    """serializes query rows with serializers compiled once per column
+    from column types, same result as query_row_serialize_format
+
+    formatter of current locale and timezone is resolved once when
+    first column that needs it is compiled
+    """
+    _plain_types = (types.Integer, types.String, types.Boolean)
+
+    def __init__(self, columns, serializers=None):
+        self._types_serializers = None
+        serializers = serializers or {}
+        self._columns = [
+            (
+                index,
+                column['name'],
+                self._get_serializer(column['type']),
+                serializers.get(column['name']),
+            )
+            for index, column in enumerate(columns)
+        ]
+
+    def _get_types_serializers(self):
+        if self._types_serializers is None:
+            formatter = get_formatter()
+            self._types_serializers = (
+                (types.DateTime, _not_null(formatter.format_datetime)),
+                (types.Date, _not_null(formatter.format_date)),
+                (types.Time, _not_null(formatter.format_time)),
+                (types.Numeric, _not_null(formatter.format_decimal)),
+            )
+        return self._types_serializers
+
+    def _get_serializer(self, type_):
+        if isinstance(type_, self._plain_types):
+            return None
+        if isinstance(type_, types.Float) or (
+            isinstance(type_, types.Numeric) and not type_.asdecimal
+        ):
+            return serialize
+        if isinstance(
+            type_, (types.DateTime, types.Date, types.Time, types.Numeric)
+        ):
+            for column_type, serializer in self._get_types_serializers():
+                if isinstance(type_, column_type):
+                    return serializer
+        return serialize
+
+    def __call__(self, row):
+        res_row = {}
+        for index, key, serializer, custom in self._columns:
+            value = row[index]
+            if custom:
+                res_row[key] = custom(value, row)
+            elif serializer:
+                res_row[key] = serializer(value)
+            else:
+                res_row[key] = value
+        return res_row
+
+    def serialize(self, rows):
+        for row in rows:
+            yield self(row)
+
+
+def encode_cursor(value, id):
+    """encode keyset pagination cursor from sort value and row id
+    """
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    return urlsafe_b64encode(json.dumps([value, id]))
+
+
+def decode_cursor(cursor):
+    """decode keyset pagination cursor to sort value and row id pair
+    """
+    try:
+        value, id = json.loads(urlsafe_b64decode(str(cursor)))
+    except (TypeError, ValueError):
+        raise ValueError(u'Invalid cursor')
+    return value, id
+
+
+class FieldsPlan(dict):
+    """immutable fields map of query builder instance
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(u'Fields plan is immutable')
+
+    __setitem__ = __delitem__ = _immutable
+    update = pop = popitem = setdefault = clear = _immutable
+
+    def merge(self, fields):
+        plan = dict(self)
+        plan.update(fields)
+        return FieldsPlan(plan)
+
+
+# structural plans of query builders by builder class and variant
+query_builders_plans = SchemaCache(dict, ttl=3600)
+
+
+class QueryBuilderType(type):
+    """builds query builder once per class and plan variant,
+    other instances are created from the plan of the first one
+    """
+
+    def __call__(cls, *args, **kwargs):
+        if not cls._plan_cache:
+            return super(QueryBuilderType, cls).__call__(*args, **kwargs)
+        key = (cls, cls._get_plan_variant(*args, **kwargs))
+        plans = query_builders_plans.get()
+        plan = plans.get(key)
+        if plan is None:
+            qb = super(QueryBuilderType, cls).__call__(*args, **kwargs)
+            plans[key] = qb._get_plan()
+            return qb
+        qb = cls.__new__(cls)
+        qb._set_plan(plan, *args, **kwargs)
+        return qb
+
+
 class GeneralQueryBuilder(object):
+    """base query builder
+
+    _count_mode 'query' counts rows with separate count query,
+    'window' fetches page and total count in one query with count window
+    function. In 'window' mode _count_estimate_threshold enables planner
+    row estimate as total count for queries estimated larger than threshold
+
+    seek_query is keyset alternative of page_query, get_cursor returns
+    cursor of the next page for fetched rows
+
+    with _plan_cache builder is constructed once per class and variant,
+    its fields and structural query are reused by next instances, values
+    that differ between instances of the same variant should be bound
+    with named bind parameters returned by _get_plan_params
+    """
+    __metaclass__ = QueryBuilderType
 
-    _fields = {}
+    _plan_cache = False
+    _fields = FieldsPlan()
     _simple_search_fields = []
     _advanced_search_fields = []
     _serializers = {}
+    _count_mode = 'query'
+    _count_estimate_threshold = None
+    _window_count_label = '_window_count'
+    _fetched = None
+    _sort = None
+    _count_base = None
+    _last_row = None
 
     def build_base_query(self):
         raise NotImplementedError(
@@ -77,7 +238,31 @@ class GeneralQueryBuilder(object):
         return order(sort)
 
     def get_fields(self):
-        return self._fields
+        return FieldsPlan(self._fields)
+
+    def update_fields(self, fields):
+        self._fields = FieldsPlan(self._fields).merge(fields)
+
+    @classmethod
+    def _get_plan_variant(cls, *args, **kwargs):
+        return ()
+
+    def _get_plan(self):
+        plan = dict(self.__dict__)
+        plan['_fields'] = FieldsPlan(self._fields)
+        plan['query'] = self.query.with_session(None)
+        return plan
+
+    def _set_plan(self, plan, *args, **kwargs):
+        self.__dict__.update(plan)
+        self.query = (
+            plan['query']
+            .with_session(DBSession())
+            .params(**self._get_plan_params())
+        )
+
+    def _get_plan_params(self):
+        return {}
 
     def search_simple(self, term):
         if term and term.strip():
@@ -89,9 +274,49 @@ class GeneralQueryBuilder(object):
             self.query = self.query.filter(condition)
 
     def sort_query(self, sort, order):
+        self._sort = sort
         self.query = self.query.order_by(
             self.get_sort_order(sort, order)
         )
+        if sort != 'id' and 'id' in self.get_fields():
+            # stable order among equal sort values for keyset paging
+            self.query = self.query.order_by(
+                self.get_sort_order('id', order)
+            )
+
+    def seek_query(self, sort, order, limit, cursor=None):
+        """keyset pagination, page starts after the row cursor points to
+        rows are ordered by sort field and id, sort field should be
+        not nullable
+        """
+        assert isinstance(limit, int), type(limit)
+        fields = self.get_fields()
+        sort_field = fields.get(sort)
+        id_field = fields.get('id')
+        assert sort_field is not None, u"Sort can't be None"
+        assert id_field is not None, u"Keyset pagination needs id field"
+
+        self._count_base = self.query
+        self.sort_query(sort, order)
+        if cursor:
+            value, id = decode_cursor(cursor)
+            key = tuple_(sort_field, id_field)
+            bound = tuple_(
+                literal(value, sort_field.type), literal(id, id_field.type)
+            )
+            self.query = self.query.filter(
+                key > bound if order == 'asc' else key < bound
+            )
+        self.query = self.query.limit(limit)
+
+    def get_cursor(self):
+        """cursor pointing to the last row of serialized page
+        """
+        if self._sort is None or self._last_row is None:
+            return None
+        return encode_cursor(
+            getattr(self._last_row, self._sort), self._last_row.id
+        )
 
     def page_query(self, limit, page=1):
         assert isinstance(limit, int), type(limit)
@@ -105,22 +330,71 @@ class GeneralQueryBuilder(object):
             self.query = self.query.offset(offset)
 
     def get_count(self):
+        if self._count_mode == 'window':
+            return self._fetch()[0]
+        return self._query_count()
+
+    def get_serialized(self):
         query = self.get_query()
+        if self._count_mode == 'window':
+            rows = self._fetch()[1]
+        else:
+            rows = query.all()
+        if rows:
+            self._last_row = rows[-1]
+        row_serializer = RowSerializer(
+            query.column_descriptions, self._serializers
+        )
+        return list(row_serializer.serialize(rows))
+
+    def _query_count(self):
+        query = (
+            self._count_base if self._count_base is not None
+            else self.get_query()
+        )
         return query.limit(None).offset(0).count()
 
-    def get_serialized(self):
+    def _estimate_count(self, query):
+        statement = query.limit(None).offset(None).statement
+        compiled = statement.compile(dialect=DBSession.get_bind().dialect)
+        plan = DBSession.connection().execute(
+            'explain (format json) %s' % compiled, compiled.params
+        ).scalar()
+        return plan[0]['Plan']['Plan Rows']
+
+    def _fetch(self):
+        """fetch page rows and total count once for current query
+        """
         query = self.get_query()
-        result = []
-        for row in query:
-            result.append(query_row_serialize_format(row, self._serializers))
-        return result
+        if self._fetched is None or self._fetched[0] is not query:
+            self._fetched = (query,) + self._fetch_window(query)
+        return self._fetched[1:]
+
+    def _fetch_window(self, query):
+        if self._count_base is not None:
+            # window over keyset page counts only rest of rows
+            return self._query_count(), query.all()
+        if self._count_estimate_threshold is not None:
+            estimate = self._estimate_count(query)
+            if estimate > self._count_estimate_threshold:
+                return estimate, query.all()
+        label = self._window_count_label
+        rows = query.add_columns(func.count().over().label(label)).all()
+        if not rows:
+            # page is out of range or nothing found
+            return self._query_count(), rows
+        total = getattr(rows[0], label)
+        keys = [key for key in rows[0].keys() if key != label]
+        return total, [KeyedTuple(row[:-1], keys) for row in rows]
 
 
 class ResourcesQueryBuilder(GeneralQueryBuilder):
 
+    _plan_cache = True
     _aEmployee = aliased(Employee)
     _aSubscriber = aliased(Employee)
     _aStructure = aliased(Structure)
+    _aEmployeeState = aliased(EmployeeCurrentState)
     _base_fields = {
         'rid': Resource.id.label('rid'),
         'modifydt': Resource.modifydt.label('modifydt'),
@@ -133,41 +407,37 @@ class ResourcesQueryBuilder(GeneralQueryBuilder):
         self.context = context
 
     def build_base_query(self):
-        structure_subq = (
-            query_employees_position()
-            .with_entities(
-                Appointment.employee_id.label('employee_id'),
-                Position.structure_id.label('structure_id'),
-            )
-            .subquery()
-        )
         self.query = (
             DBSession.query(*self.get_base_fields().values())
             .join(self._aEmployee, Resource.maintainer)
             .join(
-                structure_subq,
-                self._aEmployee.id == structure_subq.c.employee_id
+                self._aEmployeeState,
+                self._aEmployee.id == self._aEmployeeState.employee_id
             )
             .join(
                 self._aStructure,
-                structure_subq.c.structure_id == self._aStructure.id
+                self._aEmployeeState.structure_id == self._aStructure.id
             )
         )
         if self.context:
-            employee = get_auth_employee(self.context.request)
-            query = query_employee_scope(employee, self.context)
+            identity = get_auth_identity(self.context.request)
+            query = query_permisions_scope(
+                identity.get_permisions(self.context)
+            )
             if query:
                 subq = query.subquery()
                 self.query = self.query.join(
                     subq, subq.c.id == self._aStructure.id
                 )
-            self._subscriptions(employee)
+            self._subscriptions(identity.employee)
 
     def _subscriptions(self, employee):
         subscription_subq = (
             DBSession.query(Resource.id)
             .join(self._aSubscriber, Resource.subscribers)
-            .filter(self._aSubscriber.id == employee.id)
+            .filter(
+                self._aSubscriber.id == bindparam('subscriber_id', employee.id)
+            )
             .subquery()
         )
         self.query = self.query.outerjoin(
@@ -177,16 +447,44 @@ class ResourcesQueryBuilder(GeneralQueryBuilder):
             'subscriber': subscription_subq.c.id
         })
 
-    def update_fields(self, fields):
-        self._fields.update(fields)
-
     def get_base_fields(self):
         return self._base_fields
 
     def get_fields(self):
         fields = super(ResourcesQueryBuilder, self).get_fields()
-        fields.update(self.get_base_fields())
-        return fields
+        return fields.merge(self.get_base_fields())
+
+    @classmethod
+    def _get_plan_variant(cls, context=None):
+        if not context:
+            return ()
+        permisions = (
+            get_auth_identity(context.request).get_permisions(context)
+        )
+        return (
+            context.__class__,
+            permisions and permisions.scope_type,
+            bool(permisions and permisions.structure_id),
+        )
+
+    def _get_plan(self):
+        plan = super(ResourcesQueryBuilder, self)._get_plan()
+        plan.pop('context', None)
+        return plan
+
+    def _set_plan(self, plan, context=None):
+        self.context = context
+        super(ResourcesQueryBuilder, self)._set_plan(plan)
+
+    def _get_plan_params(self):
+        if not self.context:
+            return {}
+        identity = get_auth_identity(self.context.request)
+        permisions = identity.get_permisions(self.context)
+        return {
+            'scope_structure_id': permisions and permisions.structure_id,
+            'subscriber_id': identity.employee.id,
+        }
 
     def advanced_search(self, **kwargs):
         self._filter_updated_date(
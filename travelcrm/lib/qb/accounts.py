@@ -1,10 +1,13 @@
 # -*coding: utf-8-*-
 from collections import Iterable
 
+from sqlalchemy import func
+
 from . import ResourcesQueryBuilder
 from ...models.resource import Resource
 from ...models.account import Account
 from ...models.currency import Currency
+from ...lib.bl.cashflows import query_accounts_balances
 
 
 class AccountsQueryBuilder(ResourcesQueryBuilder):
@@ -39,3 +42,18 @@ class AccountsQueryBuilder(ResourcesQueryBuilder):
         assert isinstance(id, Iterable), u"Must be iterable object"
         if id:
             self.query = self.query.filter(Account.id.in_(id))
+
+    def advanced_search(self, **kwargs):
+        super(AccountsQueryBuilder, self).advanced_search(**kwargs)
+        if kwargs.get('with_balance'):
+            self.with_balance()
+
+    def with_balance(self, date_from=None, date_to=None):
+        """add balance column for all rows with one grouped subquery
+        """
+        balances = query_accounts_balances(date_from, date_to).subquery()
+        self.query = self.query.outerjoin(
+            balances, balances.c.owner_id == Account.id
+        )
+        self.update_fields({'balance': func.coalesce(balances.c.balance, 0)})
+        self.query = self.query.with_entities(*self.get_fields_with_labels())
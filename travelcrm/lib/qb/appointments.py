@@ -8,27 +8,27 @@ from ...models.employee import Employee
 from ...models.position import Position
 from ...models.appointment import Appointment
 
-from ..bl.structures import query_recursive_tree
+from ..bl.structures import query_structures_tree
 
 
 class AppointmentsQueryBuilder(ResourcesQueryBuilder):
 
     def __init__(self, context):
         super(AppointmentsQueryBuilder, self).__init__(context)
-        self._subq_structures_recursive = query_recursive_tree().subquery()
+        self._subq_structures_tree = query_structures_tree().subquery()
         self._fields = {
             'id': Appointment.id,
             '_id': Appointment.id,
             'date': Appointment.date,
             'employee_name': Employee.name,
             'position_name': Position.name,
-            'structure_path': self._subq_structures_recursive.c.name_path
+            'structure_path': self._subq_structures_tree.c.name_path
         }
         self._simple_search_fields = [
             Employee.first_name,
             Employee.last_name,
             Position.name,
-            self._subq_structures_recursive.c.name,
+            self._subq_structures_tree.c.name,
         ]
 
         self.build_query()
@@ -41,8 +41,8 @@ class AppointmentsQueryBuilder(ResourcesQueryBuilder):
             .join(Position, Appointment.position)
             .join(Employee, Appointment.employee)
             .join(
-                  self._subq_structures_recursive,
-                  self._subq_structures_recursive.c.id == Position.structure_id
+                  self._subq_structures_tree,
+                  self._subq_structures_tree.c.id == Position.structure_id
             )
         )
         super(AppointmentsQueryBuilder, self).build_query()
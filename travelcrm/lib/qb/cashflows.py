@@ -10,6 +10,8 @@ from ...lib.bl.cashflows import query_cashflows
 
 class CashflowsQueryBuilder(GeneralQueryBuilder):
 
+    _plan_cache = True
+
     def __init__(self):
         self._subq  = query_cashflows().subquery()
         self._fields = {
@@ -13,6 +13,9 @@ from ...lib.utils.common_utils import get_base_currency
 
 class CurrenciesRatesQueryBuilder(ResourcesQueryBuilder):
 
+    # base currency is selected as literal
+    _plan_cache = False
+
     def __init__(self, context):
         super(CurrenciesRatesQueryBuilder, self).__init__(context)
         self._fields = {
@@ -0,0 +1,45 @@
+# -*coding: utf-8-*-
+
+from datetime import date, timedelta
+
+from ...models import DBSession
+from ...models.dashboard_stat import DashboardStat
+from ...lib.qb import ResourcesQueryBuilder
+from ...lib.bl.employees import query_permisions_scope
+from ...lib.utils.security_utils import get_auth_identity
+
+
+class DashboardStatsQueryBuilder(ResourcesQueryBuilder):
+    """reads precomputed daily counters of kind
+    in structures scope of the context permissions
+    """
+    _kind = None
+    _base_fields = {}
+
+    def build_base_query(self):
+        self.query = (
+            DBSession.query(DashboardStat.date)
+            .filter(DashboardStat.kind == self._kind)
+        )
+        if self.context:
+            identity = get_auth_identity(self.context.request)
+            query = query_permisions_scope(
+                identity.get_permisions(self.context)
+            )
+            if query:
+                subq = query.subquery()
+                self.query = self.query.join(
+                    subq, subq.c.id == DashboardStat.structure_id
+                )
+
+    def advanced_search(self, **kwargs):
+        if 'period' in kwargs:
+            self._filter_period(kwargs.get('period'))
+
+    def _filter_period(self, period):
+        if period:
+            today = date.today()
+            self.query = self.query.filter(
+                DashboardStat.date > today - timedelta(days=period),
+                DashboardStat.date <= today,
+            )
@@ -5,20 +5,19 @@ from . import ResourcesQueryBuilder
 
 from ...models.resource import Resource
 from ...models.employee import Employee
-from ...lib.bl.employees import query_employees_dismissed
+from ...models.employee_current_state import EmployeeCurrentState
 
 
 class EmployeesQueryBuilder(ResourcesQueryBuilder):
 
     def __init__(self, context):
         super(EmployeesQueryBuilder, self).__init__(context)
-        self._dismissal_subq = query_employees_dismissed().subquery()
         self._fields = {
             'id': Employee.id,
             '_id': Employee.id,
             'first_name': Employee.first_name,
             'last_name': Employee.last_name,
-            'dismissal_date': self._dismissal_subq.c.date,
+            'dismissal_date': EmployeeCurrentState.dismissed_at,
             'name': Employee.name,
         }
         self._simple_search_fields = [
@@ -34,8 +33,8 @@ class EmployeesQueryBuilder(ResourcesQueryBuilder):
             self.query
             .join(Employee, Resource.employee)
             .outerjoin(
-                self._dismissal_subq,
-                self._dismissal_subq.c.employee_id == Employee.id 
+                EmployeeCurrentState,
+                EmployeeCurrentState.employee_id == Employee.id
             )
         )
         super(EmployeesQueryBuilder, self).build_query()
@@ -1,40 +1,21 @@
 # -*coding: utf-8-*-
 from collections import Iterable
 
-from sqlalchemy import func
-
 from . import ResourcesQueryBuilder
-from ...models import DBSession
 from ...models.resource import Resource
 from ...models.invoice import Invoice
-from ...models.invoice_item import InvoiceItem
 from ...models.account import Account
 from ...models.currency import Currency
 from ...models.person import Person
 from ...models.order import Order
-from ...models.income import Income
 
 
 class InvoicesQueryBuilder(ResourcesQueryBuilder):
 
+    _count_mode = 'window'
+
     def __init__(self, context):
         super(InvoicesQueryBuilder, self).__init__(context)
-        self._sum_invoice = (
-            DBSession.query(
-                func.sum(InvoiceItem.final_price).label('final_price'), 
-                InvoiceItem.invoice_id.label('invoice_id')
-            )
-            .group_by(InvoiceItem.invoice_id)
-            .subquery()
-        )
-        self._sum_payments = (
-            DBSession.query(
-                func.sum(Income.sum).label('payments'),
-                Income.invoice_id.label('invoice_id')
-            )
-            .group_by(Income.invoice_id)
-            .subquery()
-        )
         self._fields = {
             'id': Invoice.id,
             '_id': Invoice.id,
@@ -42,18 +23,10 @@ class InvoicesQueryBuilder(ResourcesQueryBuilder):
             'active_until': Invoice.active_until,
             'account': Account.name,
             'account_type': Account.account_type,
-            'final_price': self._sum_invoice.c.final_price,
-            'payments': self._sum_payments.c.payments,
-            'debt': (
-                self._sum_invoice.c.final_price - self._sum_payments.c.payments
-            ),
-            'payments_percent': func.coalesce(
-                func.round(
-                    (self._sum_payments.c.payments * 100) 
-                    / self._sum_invoice.c.final_price, 2
-                ),
-                0
-            ),
+            'final_price': Invoice.final_price,
+            'payments': Invoice.payments,
+            'debt': Invoice.debt,
+            'payments_percent': Invoice.payments_percent,
             'customer': Person.name,
             'currency': Currency.iso_code,
         }
@@ -72,14 +45,6 @@ class InvoicesQueryBuilder(ResourcesQueryBuilder):
             .join(Account, Invoice.account)
             .join(Currency, Account.currency)
             .join(Person, Order.customer)
-            .join(
-                self._sum_invoice,
-                self._sum_invoice.c.invoice_id == Invoice.id
-            )
-            .outerjoin(
-                self._sum_payments,
-                self._sum_payments.c.invoice_id == Invoice.id
-            )
         )
         super(InvoicesQueryBuilder, self).build_query()
 
@@ -112,21 +77,21 @@ class InvoicesQueryBuilder(ResourcesQueryBuilder):
     def _filter_sum(self, sum_from, sum_to):
         if sum_from:
             self.query = self.query.filter(
-                self._subq_invoice_sum >= sum_from
+                Invoice.final_price >= sum_from
             )
         if sum_to:
             self.query = self.query.filter(
-                self._subq_invoice_sum <= sum_to
+                Invoice.final_price <= sum_to
             )
 
     def _filter_payment(self, payment_from, payment_to):
         if payment_from:
             self.query = self.query.filter(
-                func.coalesce(self._sum_payments.c.payments, 0) >= payment_from
+                Invoice.payments >= payment_from
             )
         if payment_to:
             self.query = self.query.filter(
-                func.coalesce(self._sum_payments.c.payments, 0) <= payment_to
+                Invoice.payments <= payment_to
             )
 
     def _filter_invoice_date(self, date_from, date_to):
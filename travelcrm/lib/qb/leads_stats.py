@@ -1,48 +1,29 @@
 # -*coding: utf-8-*-
 
-from datetime import datetime, timedelta
-
 from sqlalchemy import func
 
-from ...models.resource import Resource
-from ...models.lead import Lead 
-from ...lib.qb import ResourcesQueryBuilder
+from ...models.dashboard_stat import DashboardStat
+from ...lib.qb.dashboard_stats import DashboardStatsQueryBuilder
 
 
-class LeadsStatsQueryBuilder(ResourcesQueryBuilder):
+class LeadsStatsQueryBuilder(DashboardStatsQueryBuilder):
+    _kind = 'leads'
 
     def __init__(self, context):
         super(LeadsStatsQueryBuilder, self).__init__(context)
         
         self._fields = {
-            'date': Lead.lead_date,
-            'quan': func.count(Lead.id),
+            'date': DashboardStat.date,
+            'quan': func.sum(DashboardStat.quan),
         }
         self.build_query()
 
 
     def build_query(self):
         self.build_base_query()
-        self.query = (
-            self.query
-            .join(Lead, Resource.lead)
-            .group_by(Lead.lead_date)
-        )
-        super(LeadsStatsQueryBuilder, self).build_query()
+        self.query = self.query.group_by(DashboardStat.date)
+        super(DashboardStatsQueryBuilder, self).build_query()
         self.query = self.query.with_entities(
-            Lead.lead_date, func.count(Lead.id).label('quan')
+            DashboardStat.date.label('lead_date'),
+            func.sum(DashboardStat.quan).label('quan')
         )
-
-    def advanced_search(self, **kwargs):
-        super(LeadsStatsQueryBuilder, self).advanced_search(**kwargs)
-        if 'period' in kwargs:
-            self._filter_lead_period(
-                kwargs.get('period')
-            )
-    
-    def _filter_lead_period(self, period):
-        if period:
-            dt = datetime.today() - timedelta(days=period)
-            self.query = self.query.filter(
-                Lead.lead_date >= dt
-            )
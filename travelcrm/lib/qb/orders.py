@@ -11,6 +11,8 @@ from ...models.advsource import Advsource
 
 class OrdersQueryBuilder(ResourcesQueryBuilder):
 
+    _count_mode = 'window'
+
     def __init__(self, context):
         super(OrdersQueryBuilder, self).__init__(context)
         self._fields = {
@@ -1,9 +1,10 @@
 # -*coding: utf-8-*-
 from collections import Iterable
 
+from sqlalchemy.orm import aliased
+
 from . import ResourcesQueryBuilder
 
-from ...models import DBSession
 from ...models.resource import Resource
 from ...models.resource_type import ResourceType
 from ...models.outgoing import Outgoing
@@ -11,19 +12,14 @@ from ...models.account import Account
 from ...models.subaccount import Subaccount
 from ...models.account_item import AccountItem
 from ...models.currency import Currency
-from ...lib.bl.subaccounts import query_resource_data
+from ...models.subaccount_source import SubaccountSource
 
 
 class OutgoingsQueryBuilder(ResourcesQueryBuilder):
+    _aSourceType = aliased(ResourceType)
 
     def __init__(self, context):
         super(OutgoingsQueryBuilder, self).__init__(context)
-        self._subq_subaccount_type = (
-            DBSession.query(ResourceType.humanize, Resource.id)
-            .join(Resource, ResourceType.resources)
-            .subquery()
-        )
-        self._subq_subaccount_data = query_resource_data().subquery()
         self._fields = {
             'id': Outgoing.id,
             '_id': Outgoing.id,
@@ -32,13 +28,13 @@ class OutgoingsQueryBuilder(ResourcesQueryBuilder):
             'account': Account.name,
             'account_item': AccountItem.name,
             'currency': Currency.iso_code,
-            'resource': self._subq_subaccount_data.c.title,
-            'resource_type': self._subq_subaccount_type.c.humanize,
+            'resource': SubaccountSource.title,
+            'resource_type': self._aSourceType.humanize,
         }
         self._simple_search_fields = [
             Account.name,
-            self._subq_subaccount_data.c.name,
-            self._subq_subaccount_data.c.title,
+            Subaccount.name,
+            SubaccountSource.title,
         ]
         self.build_query()
 
@@ -51,15 +47,10 @@ class OutgoingsQueryBuilder(ResourcesQueryBuilder):
             .join(Account, Subaccount.account)
             .join(Currency, Account.currency)
             .join(AccountItem, Outgoing.account_item)
+            .join(SubaccountSource, Subaccount.source)
             .join(
-                self._subq_subaccount_data, 
-                Outgoing.subaccount_id 
-                == self._subq_subaccount_data.c.subaccount_id
-            )
-            .join(
-                self._subq_subaccount_type,
-                self._subq_subaccount_type.c.id
-                == self._subq_subaccount_data.c.resource_id
+                self._aSourceType,
+                self._aSourceType.id == SubaccountSource.resource_type_id
             )
         )
         super(OutgoingsQueryBuilder, self).build_query()
@@ -6,20 +6,23 @@ from ...models.resource import Resource
 from ...models.resource_type import ResourceType
 from ...models.permision import Permision
 
-from ..bl.structures import query_recursive_tree
+from ..bl.structures import query_structures_tree
 
 
 class PermisionsQueryBuilder(ResourcesQueryBuilder):
 
+    # position is bound as literal
+    _plan_cache = False
+
     def __init__(self, position_id):
         super(PermisionsQueryBuilder, self).__init__()
         self.position_id = position_id
-        self._subq_structures_recursive = query_recursive_tree().subquery()
+        self._subq_structures_tree = query_structures_tree().subquery()
         self._fields = {
             'id': ResourceType.id,
             '_id': ResourceType.id,
             'rt_humanize': ResourceType.humanize,
-            'structure_path': self._subq_structures_recursive.c.name_path
+            'structure_path': self._subq_structures_tree.c.name_path
         }
         self._simple_search_fields = [
             ResourceType.humanize,
@@ -47,8 +50,8 @@ class PermisionsQueryBuilder(ResourcesQueryBuilder):
             .join(ResourceType, Resource.resource_type_obj)
             .outerjoin(subq, ResourceType.id == subq.c.resource_type_id)
             .outerjoin(
-                self._subq_structures_recursive,
-                self._subq_structures_recursive.c.id == subq.c.structure_id
+                self._subq_structures_tree,
+                self._subq_structures_tree.c.id == subq.c.structure_id
             )
         )
         super(PermisionsQueryBuilder, self).build_query()
@@ -14,6 +14,9 @@ from ...lib.bl.persons import query_person_contacts, query_person_passports
 
 class PersonsQueryBuilder(ResourcesQueryBuilder):
 
+    _count_mode = 'window'
+    _count_estimate_threshold = 100000
+
     def __init__(self, context):
         super(PersonsQueryBuilder, self).__init__(context)
         self._subq_contacts = query_person_contacts().subquery()
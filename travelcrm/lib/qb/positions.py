@@ -7,20 +7,20 @@ from . import ResourcesQueryBuilder
 from ...models.resource import Resource
 from ...models.position import Position
 
-from ..bl.structures import query_recursive_tree
+from ..bl.structures import query_structures_tree
 
 
 class PositionsQueryBuilder(ResourcesQueryBuilder):
 
     def __init__(self, context):
         super(PositionsQueryBuilder, self).__init__(context)
-        self._subq_structures_recursive = query_recursive_tree().subquery()
+        self._subq_structures_tree = query_structures_tree().subquery()
         self._fields = {
             'id': Position.id,
             '_id': Position.id,
             'position_name': Position.name,
             'structure_id': Position.structure_id,
-            'structure_path': self._subq_structures_recursive.c.name_path
+            'structure_path': self._subq_structures_tree.c.name_path
         }
         self._simple_search_fields = [
             Position.name,
@@ -33,8 +33,8 @@ class PositionsQueryBuilder(ResourcesQueryBuilder):
             self.query
             .join(Position, Resource.position)
             .join(
-                self._subq_structures_recursive,
-                self._subq_structures_recursive.c.id == Position.structure_id
+                self._subq_structures_tree,
+                self._subq_structures_tree.c.id == Position.structure_id
             )
         )
         super(PositionsQueryBuilder, self).build_query()
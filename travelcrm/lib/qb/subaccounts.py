@@ -1,41 +1,39 @@
 # -*coding: utf-8-*-
 from collections import Iterable
 
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+
 from . import ResourcesQueryBuilder
 
-from ...models import DBSession
 from ...models.resource import Resource
 from ...models.resource_type import ResourceType
 from ...models.account import Account
 from ...models.subaccount import Subaccount
 from ...models.currency import Currency
+from ...models.subaccount_source import SubaccountSource
 
-from ...lib.bl.subaccounts import query_resource_data
+from ...lib.bl.cashflows import query_subaccounts_balances
 
 
 class SubaccountsQueryBuilder(ResourcesQueryBuilder):
+    _aSourceType = aliased(ResourceType)
 
     def __init__(self, context):
         super(SubaccountsQueryBuilder, self).__init__(context)
-        self._subq_resource_type = (
-            DBSession.query(ResourceType.humanize, Resource.id)
-            .join(Resource, ResourceType.resources)
-            .subquery()
-        )
-        self._subq_resource_data = query_resource_data().subquery()
         self._fields = {
             'id': Subaccount.id,
             '_id': Subaccount.id,
             'account': Account.name,
             'name': Subaccount.name,
             'status': Subaccount.status,
-            'title': self._subq_resource_data.c.title,
+            'title': SubaccountSource.title,
             'currency': Currency.iso_code,
-            'resource_type': self._subq_resource_type.c.humanize,
+            'resource_type': self._aSourceType.humanize,
         }
         self._simple_search_fields = [
-            self._subq_resource_data.c.name,
-            self._subq_resource_data.c.title,
+            Subaccount.name,
+            SubaccountSource.title,
         ]
         self.build_query()
 
@@ -46,15 +44,10 @@ class SubaccountsQueryBuilder(ResourcesQueryBuilder):
             .join(Subaccount, Resource.subaccount)
             .join(Account, Subaccount.account)
             .join(Currency, Account.currency)
+            .join(SubaccountSource, Subaccount.source)
             .join(
-                self._subq_resource_data,
-                self._subq_resource_data.c.subaccount_id
-                == Subaccount.id
-            )
-            .join(
-                self._subq_resource_type,
-                self._subq_resource_type.c.id
-                == self._subq_resource_data.c.resource_id
+                self._aSourceType,
+                self._aSourceType.id == SubaccountSource.resource_type_id
             )
         )
         super(SubaccountsQueryBuilder, self).build_query()
@@ -68,7 +61,19 @@ class SubaccountsQueryBuilder(ResourcesQueryBuilder):
         super(SubaccountsQueryBuilder, self).advanced_search(**kwargs)
         if 'account_id' in kwargs:
             self._filter_account(kwargs.get('account_id'))
+        if kwargs.get('with_balance'):
+            self.with_balance()
 
     def _filter_account(self, account_id):
         if account_id:
             self.query = self.query.filter(Account.id == account_id)
+
+    def with_balance(self, date_from=None, date_to=None):
+        """add balance column for all rows with one grouped subquery
+        """
+        balances = query_subaccounts_balances(date_from, date_to).subquery()
+        self.query = self.query.outerjoin(
+            balances, balances.c.owner_id == Subaccount.id
+        )
+        self.update_fields({'balance': func.coalesce(balances.c.balance, 0)})
+        self.query = self.query.with_entities(*self.get_fields_with_labels())
@@ -9,6 +9,7 @@ from ...models.resource import Resource
 from ...models.account_item import AccountItem
 from ...models.subaccount import Subaccount
 from ...models.cashflow import Cashflow
+from ...models.cashflow_rollup import CashflowRollup
 from ...lib.qb.accounts_items import AccountsItemsQueryBuilder
 
 
@@ -21,21 +22,33 @@ class TurnoversQueryBuilder(
 
     def __init__(self, context):
         ResourcesQueryBuilder.__init__(self, context)
-        self._cashflows_from_sub = (
+        # closed days come from the rollup maintained on cashflows
+        # changes, the current day is taken from cashflows directly
+        self._rollup = (
             DBSession.query(
-                func.sum(Cashflow.sum).label('expenses'),
-                Cashflow.account_item_id.label('account_item_id'),
+                CashflowRollup.account_item_id.label('account_item_id'),
+                CashflowRollup.revenue.label('revenue'),
+                CashflowRollup.expenses.label('expenses'),
             )
-            .join(Subaccount, Cashflow.subaccount_from)
-            .group_by(Cashflow.account_item_id)
+            .filter(CashflowRollup.date < func.current_date())
         )
-        self._cashflows_to_sub = (
+        self._cashflows_to = (
             DBSession.query(
-                func.sum(Cashflow.sum).label('revenue'),
                 Cashflow.account_item_id.label('account_item_id'),
+                Cashflow.sum.label('revenue'),
+                literal(0).label('expenses'),
             )
             .join(Subaccount, Cashflow.subaccount_to)
-            .group_by(Cashflow.account_item_id)
+            .filter(Cashflow.date >= func.current_date())
+        )
+        self._cashflows_from = (
+            DBSession.query(
+                Cashflow.account_item_id.label('account_item_id'),
+                literal(0).label('revenue'),
+                Cashflow.sum.label('expenses'),
+            )
+            .join(Subaccount, Cashflow.subaccount_from)
+            .filter(Cashflow.date >= func.current_date())
         )
         self._fields = {
             'id': AccountItem.id,
@@ -74,55 +87,72 @@ class TurnoversQueryBuilder(
             self._filter_date(
                 kwargs.get('date_from'), kwargs.get('date_to')
             )
-        self._cashflows_from_sub = self._cashflows_from_sub.subquery()
-        self._cashflows_to_sub = self._cashflows_to_sub.subquery()
+        flows = (
+            self._rollup
+            .union_all(self._cashflows_to, self._cashflows_from)
+            .subquery()
+        )
+        turnovers = (
+            DBSession.query(
+                flows.c.account_item_id.label('account_item_id'),
+                func.nullif(func.sum(flows.c.revenue), 0).label('revenue'),
+                func.nullif(func.sum(flows.c.expenses), 0).label('expenses'),
+            )
+            .group_by(flows.c.account_item_id)
+            .subquery()
+        )
         self.query = (
             self.query
             .outerjoin(
-                self._cashflows_from_sub,
-                self._cashflows_from_sub.c.account_item_id == AccountItem.id
-            )
-            .outerjoin(
-                self._cashflows_to_sub,
-                self._cashflows_to_sub.c.account_item_id == AccountItem.id
+                turnovers,
+                turnovers.c.account_item_id == AccountItem.id
             )
         )
         balance_condition = or_(
-            self._cashflows_to_sub.c.revenue != None, 
-            self._cashflows_from_sub.c.expenses != None
+            turnovers.c.revenue != None,
+            turnovers.c.expenses != None
         )
         balance_expression = (
-            func.coalesce(self._cashflows_to_sub.c.revenue, 0)
-            - func.coalesce(self._cashflows_from_sub.c.expenses, 0)
+            func.coalesce(turnovers.c.revenue, 0)
+            - func.coalesce(turnovers.c.expenses, 0)
         )
         balance_case = (balance_condition, balance_expression)
         self.update_fields({
-            'expenses': self._cashflows_from_sub.c.expenses,
-            'revenue': self._cashflows_to_sub.c.revenue,
-            'balance': case([balance_case,], else_=None),            
+            'expenses': turnovers.c.expenses,
+            'revenue': turnovers.c.revenue,
+            'balance': case([balance_case,], else_=None),
         })
         ResourcesQueryBuilder.build_query(self)
 
     def _filter_account(self, account_id):
-        self._cashflows_from_sub = self._cashflows_from_sub.filter(
+        self._rollup = self._rollup.filter(
+            CashflowRollup.account_id == account_id
+        )
+        self._cashflows_to = self._cashflows_to.filter(
             Subaccount.account_id == account_id
         )
-        self._cashflows_to_sub = self._cashflows_to_sub.filter(
+        self._cashflows_from = self._cashflows_from.filter(
             Subaccount.account_id == account_id
         )
 
     def _filter_date(self, date_from, date_to):
         if date_from:
-            self._cashflows_from_sub = self._cashflows_from_sub.filter(
+            self._rollup = self._rollup.filter(
+                CashflowRollup.date >= date_from
+            )
+            self._cashflows_to = self._cashflows_to.filter(
                 Cashflow.date >= date_from
             )
-            self._cashflows_to_sub = self._cashflows_to_sub.filter(
+            self._cashflows_from = self._cashflows_from.filter(
                 Cashflow.date >= date_from
             )
         if date_to:
-            self._cashflows_from_sub = self._cashflows_from_sub.filter(
+            self._rollup = self._rollup.filter(
+                CashflowRollup.date <= date_to
+            )
+            self._cashflows_to = self._cashflows_to.filter(
                 Cashflow.date <= date_to
             )
-            self._cashflows_to_sub = self._cashflows_to_sub.filter(
+            self._cashflows_from = self._cashflows_from.filter(
                 Cashflow.date <= date_to
             )
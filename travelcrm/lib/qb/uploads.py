@@ -24,6 +24,9 @@ class _NameSerializer(object):
     
 class UploadsQueryBuilder(ResourcesQueryBuilder):
 
+    # serializer keeps request of the instance
+    _plan_cache = False
+
     def __init__(self, context):
         super(UploadsQueryBuilder, self).__init__(context)
         self._fields = {
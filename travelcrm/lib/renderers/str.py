@@ -2,7 +2,7 @@
 
 from mako.template import Template
 
-from ..utils.resources_utils import get_resource_type_by_resource
+from ..utils.resources_utils import get_resource_settings
 
 
 class STRRendererFactory(object):
@@ -23,8 +23,8 @@ class STRRendererFactory(object):
         context = system.pop('context', None)
         assert context, 'No context exists'
         
-        rt = get_resource_type_by_resource(context)
-        tmpl = rt.settings.get(value.get('tmpl', 'html_template'))
+        settings = get_resource_settings(context)
+        tmpl = settings.get(value.get('tmpl', 'html_template'))
         system['_context'] = context
         system.update(value)
         template = Template(tmpl)
@@ -12,7 +12,7 @@ from ...models.person import Person
 from ...lib.scheduler import scheduler
 from ...lib.bl.campaigns import get_mailer
 from ...lib.utils.scheduler_utils import (
-    bucket, gen_task_id, scopped_task, transactional
+    keyset_bucket, gen_task_id, scopped_task, transactional
 )
 
 
@@ -44,7 +44,7 @@ def _send_message(campaign_id, contacts):
     campaign.set_status_ready()
 
 
-@bucket(BUCKET_SIZE)
+@keyset_bucket(BUCKET_SIZE, Contact.id)
 def schedule_campaign(campaign_id):
     """ for task we set suffix manualy for replace it
     """
@@ -57,7 +57,6 @@ def schedule_campaign(campaign_id):
             Contact.condition_status_active(),
             Person.condition_email_subscribtion()
         )
-        .order_by(Contact.id)
     )
 
     contacts = tuple(contact.contact for contact in contacts)
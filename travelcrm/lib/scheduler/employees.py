@@ -0,0 +1,45 @@
+# -*-coding:utf-8-*-
+
+import logging
+from datetime import datetime, time
+
+from pytz import timezone
+
+from ...lib.scheduler import scheduler
+from ...lib.bl.employees import rebuild_employees_current_state
+from ...lib.bl.dashboard_stats import schedule_employees_stats_refresh
+from ...lib.utils.common_utils import get_timezone
+from ...lib.utils.scheduler_utils import (
+    scopped_task,
+    transactional,
+    after_commit,
+    gen_task_id
+)
+
+
+log = logging.getLogger(__name__)
+
+
+@scopped_task
+@transactional
+def _refresh_employee_current_state(employee_id):
+    log.info(u'Refresh current state of employee #%s' % employee_id)
+    rebuild_employees_current_state(employee_id)
+    schedule_employees_stats_refresh([employee_id])
+
+
+@after_commit
+def schedule_employee_current_state_refresh(employee_id, date):
+    """refresh employee current state when future dated appointment
+    or dismissal comes into force
+    """
+    scheduler.add_job(
+        _refresh_employee_current_state,
+        id=gen_task_id(),
+        trigger='date',
+        replace_existing=True,
+        run_date=timezone(get_timezone()).localize(
+            datetime.combine(date, time.min)
+        ),
+        args=[employee_id],
+    )
@@ -2,26 +2,26 @@
 
 import logging
 import copy
-from datetime import datetime, timedelta
 
 from pyramid.security import forget
 from pyramid.httpexceptions import HTTPNotFound, HTTPFound
 
 from ...lib import helpers as h
+from ... import resources as resources_package
 from ...resources import Root
 from ..utils.common_utils import translate as _
 from ..utils.common_utils import (
     get_multicompanies,
     cast_int,
     get_tarifs,
-    get_tarifs_timeout
 )
-from ..bl.employees import get_employee_structure
 from ..scheduler import start_scheduler
-from ..utils.security_utils import get_auth_employee
+from ..utils.security_utils import get_auth_identity
+from ..utils.resources_utils import build_interfaces_index
+from ..utils.tarifs_utils import get_ip_activity_tracker
 from ..utils.companies_utils import (
     get_public_domain,
-    get_company,
+    get_company_context,
 )
 from ..utils.sql_utils import (
     get_default_schema,
@@ -37,73 +37,40 @@ def helpers(event):
     event.update({'h': h, '_': _})
 
 
-def _company_settings(request, company):
-    if company:
-        settings = {
-            'company.name': company.name,
-            'company.base_currency': company.currency.iso_code,
-            'company.locale_name': company.settings.get('locale'),
-            'company.timezone': company.settings.get('timezone'),
-            'company.tarif_code': company.settings.get('tarif_code'),
-            'company.tarif_limit': company.settings.get('tarif_limit'),
-            'company.tarif_expired': company.settings.get('tarif_expired'),
-        }
-        request.registry.settings.update(settings)
-
-
-def _check_tarif_control(request, company):
+def _check_tarif_control(request, identity):
     """check the possibility to make request from current IP
     """
     if not get_tarifs():
         return
 
-    ip_limit = cast_int(company.settings.get('tarif_limit'))
+    ip_limit = cast_int(request.company_context.tarif_limit)
     if not ip_limit:
         return
 
-    ips = company.settings.get('tarif_ips', [])
-    new_ips = []
-    timeout = get_tarifs_timeout()
-    ip_already_in = False
-    dt_format = '%Y-%m-%dT%H:%M:%S'
-    for ip, last_activity in ips:
-        last_activity = datetime.strptime(last_activity, dt_format)
-        if (
-            (last_activity + timedelta(seconds=timeout)) <= datetime.now()
-            and ip != request.client_addr
-        ):
-            continue
-        elif ip == request.client_addr:
-            new_ips.append((ip, datetime.now().strftime(dt_format)))
-            ip_already_in = True
-        else:
-            new_ips.append((ip, last_activity.strftime(dt_format)))
-
-    if len(new_ips) >= ip_limit and not ip_already_in:
+    tracker = get_ip_activity_tracker()
+    if not tracker.is_loaded():
+        tracker.load(identity.company.settings.get('tarif_ips', []))
+    if not tracker.touch(request.client_addr, ip_limit):
         log.error(_(u'IP limit exceeded'))
         redirect_url = request.resource_url(Root(request))
         raise HTTPFound(location=redirect_url, headers=forget(request))
-    if not ip_already_in:
-        new_ips.append(
-            (request.client_addr, datetime.now().strftime(dt_format))
-        )
-    settings = copy.copy(company.settings)
-    settings['tarif_ips'] = new_ips
-    company.settings = settings
+    ips = tracker.pop_changes()
+    if ips is not None:
+        settings = copy.copy(identity.company.settings)
+        settings['tarif_ips'] = ips
+        identity.company.settings = settings
 
 
 def company_settings(event):
     request = event.request
-    employee = get_auth_employee(request)
-    if not employee:
-        _company_settings(request, get_company())
+    request.company_context = get_company_context()
+    identity = get_auth_identity(request)
+    if not identity.employee:
         return
-    structure = get_employee_structure(employee)
-    if not structure:
+    if not identity.structure:
         redirect_url = request.resource_url(Root(request))
         raise HTTPFound(location=redirect_url, headers=forget(request))
-    _check_tarif_control(request, structure.company)
-    _company_settings(request, structure.company)
+    _check_tarif_control(request, identity)
 
 
 def company_schema(event):
@@ -129,3 +96,7 @@ def company_schema(event):
 def scheduler(event):
     settings = event.app.registry.settings
     start_scheduler(settings)
+
+
+def interfaces_index(event):
+    build_interfaces_index(resources_package)
@@ -0,0 +1,20 @@
+#-*-coding:utf-8-*-
+
+from datetime import date
+
+from pyramid.events import subscriber
+
+from ..events.resources import (
+    ResourceCreated,
+    ResourceChanged,
+)
+from ...models.appointment import Appointment
+from ..scheduler.employees import schedule_employee_current_state_refresh
+
+
+@subscriber(ResourceCreated)
+@subscriber(ResourceChanged)
+def appointment_changed(event):
+    obj = event.obj
+    if isinstance(obj, Appointment) and obj.date > date.today():
+        schedule_employee_current_state_refresh(obj.employee_id, obj.date)
@@ -0,0 +1,140 @@
+# -*coding: utf-8-*-
+
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+
+import transaction
+
+from ...models.cache_version import CacheVersion
+from ..utils.sql_utils import get_search_path_schema
+
+
+class SchemaCache(object):
+    """in-process cache of the value built by loader per tenant schema
+
+    value is loaded once for every schema and kept until invalidated
+    or ttl (in seconds) expired, loader is called without arguments
+    in context of the schema. Cache with name also reloads value when
+    version of the name in cache_version table was bumped by changed,
+    version is checked once per transaction. Transaction that changed
+    cached data gets value loaded without cache
+    """
+
+    def __init__(self, loader, ttl=None, name=None):
+        self._loader = loader
+        self._ttl = ttl
+        self._name = name
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._values = {}
+        self._generations = {}
+
+    def _transaction_state(self):
+        txn = transaction.get()
+        state = getattr(self._local, 'state', None)
+        if state is None or state[0] is not txn:
+            state = self._local.state = (txn, {})
+        return state[1]
+
+    def _version(self, schema):
+        if self._name is None:
+            return None
+        state = self._transaction_state()
+        if ('version', schema) not in state:
+            state[('version', schema)] = CacheVersion.get_version(self._name)
+        return state[('version', schema)]
+
+    def get(self, schema=None):
+        if schema is None:
+            schema = get_search_path_schema()
+        if ('changed', schema) in self._transaction_state():
+            # value with uncommitted changes is not cached
+            return self._loader()
+        version = self._version(schema)
+        with self._lock:
+            item = self._values.get(schema)
+            generation = self._generations.get(schema, 0)
+        if item is not None:
+            value, loaded, value_version = item
+            if value_version == version and (
+                not self._ttl or loaded + self._ttl > time.time()
+            ):
+                return value
+        value = self._loader()
+        with self._lock:
+            # do not store value if cache was invalidated while loading
+            if self._generations.get(schema, 0) == generation:
+                self._values[schema] = (value, time.time(), version)
+        return value
+
+    def changed(self, connection, schema=None):
+        """bump version of the cache name in current transaction
+        and invalidate cache after commit, called from mapper events
+        of cached data
+        """
+        if schema is None:
+            schema = get_search_path_schema()
+        state = self._transaction_state()
+        if ('changed', schema) in state:
+            return
+        state[('changed', schema)] = True
+        if self._name is not None:
+            CacheVersion.bump(connection, self._name)
+        self.invalidate_after_commit(schema)
+
+    def invalidate(self, schema=None):
+        if schema is None:
+            schema = get_search_path_schema()
+        with self._lock:
+            self._values.pop(schema, None)
+            self._generations[schema] = self._generations.get(schema, 0) + 1
+
+    def invalidate_after_commit(self, schema=None):
+        """invalidate cache for the schema when current transaction
+        is committed, so other threads can't load uncommitted data
+        """
+        if schema is None:
+            schema = get_search_path_schema()
+
+        def _hook(success):
+            if success:
+                self.invalidate(schema)
+
+        transaction.get().addAfterCommitHook(_hook)
+
+    def clear(self):
+        with self._lock:
+            for schema in self._values.keys():
+                self._generations[schema] = (
+                    self._generations.get(schema, 0) + 1
+                )
+            self._values.clear()
+
+
+class EffectiveDatedIndex(object):
+    """values sorted by effective date for every key,
+    value in effect as of date is found with bisect
+
+    rows are (key, date, value) ordered by date, the last of values
+    with the same date wins
+    """
+
+    def __init__(self, rows):
+        dates = defaultdict(list)
+        values = defaultdict(list)
+        for key, date, value in rows:
+            dates[key].append(date)
+            values[key].append(value)
+        self._dates = dict(dates)
+        self._values = dict(values)
+
+    def get(self, key, date, default=None):
+        dates = self._dates.get(key)
+        if not dates:
+            return default
+        pos = bisect_right(dates, date)
+        if not pos:
+            return default
+        return self._values[key][pos - 1]
@@ -8,6 +8,7 @@ from decimal import Decimal
 
 from pytz import timezone
 from dateutil.parser import parse as pdt
+from babel import Locale
 from babel.dates import (
     format_date as fd, 
     format_datetime as fdt, 
@@ -15,17 +16,18 @@ from babel.dates import (
     get_date_format as gdf,
     get_time_format as gtf,
     get_datetime_format as gdtf,
-    parse_date as pd
+    parse_date as pd,
+    parse_pattern as parse_date_pattern,
 )
 from babel.numbers import (
-    format_decimal as fdc,
-    format_currency as fc
+    format_currency as fc,
+    parse_pattern as parse_number_pattern,
 )
 
 from pyramid.settings import asbool, aslist
 from pyramid.threadlocal import get_current_registry
 from pyramid.threadlocal import get_current_request
-from pyramid.interfaces import ITranslationDirectories
+from pyramid.interfaces import ILocalizer, ITranslationDirectories
 
 from pyramid.i18n import (
     make_localizer,
@@ -46,9 +48,15 @@ def get_settings():
     return registry.settings
 
 
+def _get_company_context_value(name):
+    """value from the company context attached to the current request
+    """
+    context = getattr(get_current_request(), 'company_context', None)
+    return getattr(context, name, None)
+
+
 def get_locale_name():
-    settings = get_settings()
-    return settings.get('company.locale_name') 
+    return _get_company_context_value('locale_name')
 
 
 def get_default_locale_name():
@@ -62,14 +70,88 @@ def get_available_locales():
     
 
 def get_timezone():
-    settings = get_settings()
-    return settings.get('company.timezone') 
+    return _get_company_context_value('timezone')
 
 
 def _get_localizer_for_locale_name(locale_name):
+    """localizers are cached in registry the same way as pyramid
+    caches request localizer
+    """
     registry = get_current_registry()
-    tdirs = registry.queryUtility(ITranslationDirectories, default=[])
-    return make_localizer(locale_name, tdirs)
+    localizer = registry.queryUtility(ILocalizer, name=locale_name)
+    if localizer is None:
+        tdirs = registry.queryUtility(ITranslationDirectories, default=[])
+        localizer = make_localizer(locale_name, tdirs)
+        registry.registerUtility(localizer, ILocalizer, name=locale_name)
+    return localizer
+
+
+class Formatter(object):
+    """formatting and parsing of dates and numbers for locale and timezone
+    with Babel locale, patterns and timezone resolved once
+    """
+
+    def __init__(self, locale_name, timezone_name):
+        self.locale = Locale.parse(locale_name)
+        self.tzinfo = timezone(timezone_name) if timezone_name else None
+        self.date_format = gdf(format='short', locale=self.locale).pattern
+        self.time_format = gtf(format='short', locale=self.locale).pattern
+        self.datetime_format = (
+            gdtf(format='short', locale=self.locale)
+            .format(self.time_format, self.date_format)
+        )
+        self._date_pattern = parse_date_pattern(self.date_format)
+        self._decimal_pattern = parse_number_pattern(
+            self.locale.decimal_formats.get(None)
+        )
+        self._quantizers = {}
+
+    def format_date(self, value, format=None):
+        if not value:
+            return ''
+        if format:
+            return fd(value, format=format, locale=self.locale)
+        if isinstance(value, datetime):
+            value = value.date()
+        return self._date_pattern.apply(value, self.locale)
+
+    def format_datetime(self, value):
+        return fdt(
+            value, format=self.datetime_format,
+            locale=self.locale, tzinfo=self.tzinfo
+        )
+
+    def format_time(self, value):
+        return ft(value, format=self.time_format, locale=self.locale)
+
+    def format_decimal(self, value, quantize='.01'):
+        quantizer = self._quantizers.get(quantize)
+        if quantizer is None:
+            quantizer = self._quantizers[quantize] = Decimal(quantize)
+        value = Decimal(value).quantize(quantizer)
+        return self._decimal_pattern.apply(value, self.locale)
+
+    def format_currency(self, value, currency):
+        return fc(value, currency, locale=self.locale)
+
+    def parse_date(self, s):
+        return pd(s, locale=self.locale)
+
+    def parse_datetime(self, s):
+        return self.tzinfo.localize(pdt(s))
+
+
+_formatters = {}
+
+
+def get_formatter():
+    """formatter for current locale and timezone
+    """
+    key = (get_locale_name() or get_default_locale_name(), get_timezone())
+    formatter = _formatters.get(key)
+    if formatter is None:
+        formatter = _formatters[key] = Formatter(*key)
+    return formatter
 
 
 # class translate(object):
@@ -117,60 +199,47 @@ def cast_int(val):
     
 
 def get_company_name():
-    settings = get_settings()
-    return settings.get('company.name', '') 
+    return _get_company_context_value('name') or ''
 
 
 def get_base_currency():
-    settings = get_settings()
-    return settings.get('company.base_currency') 
+    return _get_company_context_value('base_currency')
 
 
 def get_date_format():
-    return gdf(format='short', locale=get_locale_name()).pattern
+    return get_formatter().date_format
 
 
 def get_time_format():
-    return gtf(format='short', locale=get_locale_name()).pattern
+    return get_formatter().time_format
 
 
 def get_datetime_format():
-    f = gdtf(format='short', locale=get_locale_name())
-    return f.format(get_time_format(), get_date_format())
+    return get_formatter().datetime_format
 
 
 def parse_datetime(s):
-    return timezone(get_timezone()).localize(pdt(s))
+    return get_formatter().parse_datetime(s)
 
 
 def parse_date(s):
-    return pd(s, locale=get_locale_name())
+    return get_formatter().parse_date(s)
 
 
 def format_date(value, format=None):
-    if not value:
-        return ''
-    return fd(
-        value, format=(format or get_date_format()), locale=get_locale_name()
-    )
+    return get_formatter().format_date(value, format)
 
 
 def format_datetime(value):
-    return fdt(
-        value, format=get_datetime_format(), 
-        locale=get_locale_name(), tzinfo=timezone(get_timezone())
-    )
+    return get_formatter().format_datetime(value)
 
 
 def format_time(value):
-    return ft(
-        value, format=get_time_format(), locale=get_locale_name()
-    )
+    return get_formatter().format_time(value)
 
 
 def format_decimal(value, quantize='.01'):
-    value = Decimal(value).quantize(Decimal(quantize))
-    return fdc(value, locale=get_locale_name())
+    return get_formatter().format_decimal(value, quantize)
 
 
 def serialize(value):
@@ -188,7 +257,7 @@ def serialize(value):
 
 
 def format_currency(value, currency):
-    return fc(value, currency, locale=get_locale_name())
+    return get_formatter().format_currency(value, currency)
 
 
 def get_storage_dir():
@@ -223,7 +292,7 @@ def get_tarifs():
 
 def get_tarifs_timeout():
     settings = get_settings()
-    return asbool(settings.get('tarifs.timeout'))
+    return cast_int(settings.get('tarifs.timeout')) or 0
 
 
 class _JSONEncoder(JSONEncoder):
@@ -1,6 +1,7 @@
 # -*coding: utf-8-*-
 
 import logging
+from collections import namedtuple
 
 from sqlalchemy import MetaData, Sequence
 from sqlalchemy.schema import CreateSchema
@@ -9,11 +10,15 @@ from ...models import DBSession, Base
 from ...models.company import Company
 from ...models.user import User
 from ...lib import EnumInt
+from ..utils.cache_utils import SchemaCache
 from ..utils.sql_utils import (
     set_search_path,
+    schemas_registry,
     get_current_schema,
     get_all_schema_sequences
 )
+from ..bl.structures import rebuild_structures_tree
+from ..bl.employees import rebuild_employees_current_state
 from ..utils.common_utils import (
     get_public_domain as u_get_public_domain, 
     get_public_subdomain,
@@ -24,6 +29,7 @@ from ..utils.common_utils import (
 
 log = logging.getLogger(__name__)
 
+COMPANY_CONTEXT_TTL = 300
 SOURCE_SCHEMA = 'company'
 SEQUENCE_NAME = 'companies_counter'
 TABLES = (
@@ -45,6 +51,7 @@ def create_company_schema(schema_name=None, locale=None):
         tables=[t.tometadata(metadata) for t in Base.metadata.sorted_tables]
     )
     transfer_data(schema_name, locale)
+    schemas_registry.invalidate()
     log.info(u'Company creation complete')
     return schema_name
 
@@ -89,6 +96,9 @@ def transfer_data(schema_name, locale=None):
             )
         DBSession.execute('alter table "%s" enable trigger all' % table.name)
 
+    rebuild_structures_tree()
+    rebuild_employees_current_state()
+
     # set new users passwords
     users = DBSession.query(User).all()
     for user in users:
@@ -119,3 +129,46 @@ def can_create_company(request):
 
 def get_company():
     return DBSession.query(Company).first()
+
+
+CompanyContext = namedtuple(
+    'CompanyContext',
+    [
+        'name', 'base_currency', 'locale_name', 'timezone',
+        'tarif_code', 'tarif_limit', 'tarif_expired',
+    ]
+)
+
+
+def _load_company_context():
+    company = get_company()
+    if not company:
+        return None
+    settings = company.settings or {}
+    return CompanyContext(
+        name=company.name,
+        base_currency=company.currency.iso_code,
+        locale_name=settings.get('locale'),
+        timezone=settings.get('timezone'),
+        tarif_code=settings.get('tarif_code'),
+        tarif_limit=settings.get('tarif_limit'),
+        tarif_expired=settings.get('tarif_expired'),
+    )
+
+
+companies_contexts = SchemaCache(
+    _load_company_context, ttl=COMPANY_CONTEXT_TTL, name='company_context'
+)
+
+
+def get_company_context():
+    """get cached context of the company of current schema
+    """
+    return companies_contexts.get()
+
+
+def invalidate_company_context():
+    """drop cached company context in all processes when company
+    settings are saved
+    """
+    companies_contexts.changed(DBSession.connection())
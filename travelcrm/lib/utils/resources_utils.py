@@ -1,13 +1,21 @@
 # -*coding: utf-8-*-
 import importlib
+import pkgutil
+import threading
 
-from zope.interface.verify import (
-    verifyClass,
-    DoesNotImplement
-)
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from zope.interface.interface import InterfaceClass
+from zope.interface.exceptions import Invalid
+from zope.interface.verify import verifyClass
 
+from ... import interfaces
 from ...models import DBSession
 from ...models.resource_type import ResourceType
+from ..utils.cache_utils import SchemaCache
+
+
+RESOURCES_TYPES_TTL = 300
 
 
 class ResourceClassNotFound(Exception):
@@ -18,6 +26,152 @@ class ResourceTypeNotFound(Exception):
     pass
 
 
+class ResourcesTypesRegistry(object):
+    """resources types of the schema indexed by name and by resource
+    module and class name
+
+    keeps detached ResourceType instances and imported resources classes
+    """
+
+    def __init__(self, resources_types):
+        self._resources_types = list(resources_types)
+        self._by_name = {}
+        self._by_resource_name = {}
+        self._by_interface = {}
+        self._classes = {}
+        for rt in self._resources_types:
+            self._by_name[rt.name] = rt
+            self._by_resource_name[(rt.module, rt.resource)] = rt
+
+    def __iter__(self):
+        return iter(self._resources_types)
+
+    def by_name(self, name):
+        return self._by_name.get(name)
+
+    def by_resource_name(self, module, resource_name):
+        return self._by_resource_name.get((module, resource_name))
+
+    def get_class(self, name):
+        if name not in self._classes:
+            rt = self.by_name(name)
+            rt_module = importlib.import_module(rt.module)
+            self._classes[name] = getattr(rt_module, rt.resource)
+        return self._classes[name]
+
+    def by_interface(self, interface):
+        if interface not in self._by_interface:
+            res = []
+            for rt in self._resources_types:
+                try:
+                    rt_cls = self.get_class(rt.name)
+                except:
+                    continue
+                if interface in get_resource_class_interfaces(rt_cls):
+                    res.append(rt)
+            self._by_interface[interface] = res
+        return self._by_interface[interface]
+
+
+def _load_resources_types_registry():
+    session = Session(bind=DBSession.connection())
+    try:
+        return ResourcesTypesRegistry(
+            session.query(ResourceType).order_by(ResourceType.id).all()
+        )
+    finally:
+        session.close()
+
+
+resources_types_registry = SchemaCache(
+    _load_resources_types_registry,
+    ttl=RESOURCES_TYPES_TTL,
+    name='resources_types',
+)
+
+
+def get_resources_types_registry():
+    return resources_types_registry.get()
+
+
+def _merge(rt):
+    """bind cached resource type to current session without querying DB
+    """
+    if rt is not None:
+        return DBSession.merge(rt, load=False)
+
+
+def _invalidate_resources_types_registry(mapper, connection, target):
+    resources_types_registry.changed(connection)
+    try:
+        rt_module = importlib.import_module(target.module)
+        index_resource_class(getattr(rt_module, target.resource))
+    except (ImportError, AttributeError):
+        pass
+
+
+event.listen(ResourceType, 'after_insert', _invalidate_resources_types_registry)
+event.listen(ResourceType, 'after_update', _invalidate_resources_types_registry)
+event.listen(ResourceType, 'after_delete', _invalidate_resources_types_registry)
+
+
+_interfaces_index = {}
+_interfaces_index_lock = threading.Lock()
+
+
+def get_indexed_interfaces():
+    """interfaces declared by application that resources are indexed by
+    """
+    return [
+        item for item in vars(interfaces).values()
+        if isinstance(item, InterfaceClass)
+        and item.__module__ == interfaces.__name__
+    ]
+
+
+def index_resource_class(cls):
+    """verify resource class against all application interfaces
+    and remember interfaces it implements
+    """
+    provided = set()
+    for interface in get_indexed_interfaces():
+        try:
+            verifyClass(interface, cls)
+            provided.add(interface)
+        except Invalid:
+            continue
+    with _interfaces_index_lock:
+        _interfaces_index[cls] = frozenset(provided)
+    return _interfaces_index[cls]
+
+
+def build_interfaces_index(package):
+    """index all resources classes from package modules
+    """
+    for _, name, _ in pkgutil.walk_packages(
+        package.__path__, package.__name__ + '.'
+    ):
+        module = importlib.import_module(name)
+        for item in vars(module).values():
+            if (
+                isinstance(item, type)
+                and item.__module__ == module.__name__
+                and interfaces.IResourceType.implementedBy(item)
+            ):
+                index_resource_class(item)
+
+
+def get_resource_class_interfaces(cls):
+    """interfaces that resource class implements
+    classes are indexed on application creation and on resource types
+    changes, so no verification is expected here
+    """
+    provided = _interfaces_index.get(cls)
+    if provided is None:
+        provided = index_resource_class(cls)
+    return provided
+
+
 def get_resource_class_module(cls):
     """ get module name by resource class
     """
@@ -35,59 +189,55 @@ def get_resource_class_name(cls):
 def get_resource_class(key):
     """ get class by resource name
 
-    retrieve class name and module name from DB and get glass from module
+    retrieve class name and module name from registry and get class
+    from module
     """
-    rt = ResourceType.by_name(key)
     try:
-        rt_module = importlib.import_module(rt.module)
-        resource = getattr(rt_module, rt.resource)
-        return resource
+        return get_resources_types_registry().get_class(key)
     except:
         raise ResourceClassNotFound(key)
 
 
+def get_resource_type_by_name(name):
+    """retrieve resource type from registry by name
+    """
+    return _merge(get_resources_types_registry().by_name(name))
+
+
 def get_resource_type_by_resource(resource):
-    """retrieve resource type from DB by module and class name
+    """retrieve resource type from registry by module and class name
     """
-    return ResourceType.by_resource_name(
-        resource.__class__.__module__,
-        resource.__class__.__name__
-    )
+    return get_resource_type_by_resource_cls(resource.__class__)
 
 
 def get_resource_type_by_resource_cls(cls):
-    """retrieve resource type from DB by module and class name
+    """retrieve resource type from registry by module and class name
     """
-    return ResourceType.by_resource_name(
-        cls.__module__,
-        cls.__name__
+    return _merge(
+        get_resources_types_registry().by_resource_name(
+            cls.__module__,
+            cls.__name__
+        )
     )
 
 
 def get_resources_types_by_interface(interface):
     """get all resources types that implements given interface
     """
-    rts = DBSession.query(ResourceType)
-    res = []
-    for rt in rts:
-        rt_cls = get_resource_class(rt.name)
-        try:
-            verifyClass(interface, rt_cls)
-            res.append(rt)
-        except DoesNotImplement:
-            continue
-    return res
+    return get_resources_types_registry().by_interface(interface)
 
 
 def get_resource_settings(resource):
     """get resource settings by resource object
     """
-    rt = get_resource_type_by_resource(resource)
-    return rt.settings
+    return get_resource_settings_by_resource_cls(resource.__class__)
 
 
 def get_resource_settings_by_resource_cls(cls):
     """get resource settings by resource class
     """
-    rt = get_resource_type_by_resource_cls(cls)
+    rt = get_resources_types_registry().by_resource_name(
+        cls.__module__,
+        cls.__name__
+    )
     return rt.settings
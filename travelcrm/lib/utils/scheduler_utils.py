@@ -55,6 +55,40 @@ def bucket(limit):
     return wrapper
 
 
+def keyset_bucket(limit, key):
+    """like bucket but pages query by unique key instead of offset,
+    generator receives list of rows with key value as last column
+    """
+    def wrapper(func):
+        @wraps(func)
+        def _wrapper(*args, **kwargs):
+            last = None
+            while True:
+                gen = func(*args, **kwargs)
+                try:
+                    query = gen.next()
+                except StopIteration:
+                    raise RuntimeError(_(u'Generator need'))
+
+                query = query.add_columns(key).order_by(None).order_by(key)
+                if last is not None:
+                    query = query.filter(key > last)
+                log.info('Bucket limit: %s, after: %s' % (limit, last))
+                rows = query.limit(limit).all()
+                if not rows:
+                    log.info(_(u'Generator exhausted'))
+                    gen.close()
+                    return
+                last = rows[-1][-1]
+                try:
+                    gen.send(rows)
+                except StopIteration:
+                    pass
+                gen.close()
+        return _wrapper
+    return wrapper
+
+
 def scopped_task(task):
     task.scopped = True
     @wraps(task)
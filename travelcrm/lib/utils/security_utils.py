@@ -1,9 +1,76 @@
 # -*coding: utf-8-*-
 
+from types import ClassType
+
+from pyramid.decorator import reify
+
 from ...models.user import User
+from ..bl.employees import (
+    get_employee_position,
+    get_position_permisions,
+)
+
+
+class AuthIdentity(object):
+    """authenticated employee context
+
+    built once per request and available as request.auth_identity,
+    so employee, position, structure and permissions are retrieved
+    from DB only on first access
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._permisions = {}
+
+    @reify
+    def user(self):
+        return User.get(self.request.authenticated_userid)
+
+    @reify
+    def employee(self):
+        if self.user:
+            return self.user.employee
+
+    @reify
+    def position(self):
+        if self.employee:
+            return get_employee_position(self.employee)
+
+    @reify
+    def structure(self):
+        if self.position:
+            return self.position.structure
+
+    @reify
+    def company(self):
+        if self.structure:
+            return self.structure.company
+
+    def get_permisions(self, resource):
+        """permissions of current employee position for resource
+        resource can be instance of context or context class
+        """
+        if not self.position:
+            return
+        if isinstance(resource, (type, ClassType)):
+            key = resource
+        else:
+            key = resource.__class__
+        if key not in self._permisions:
+            self._permisions[key] = get_position_permisions(
+                self.position, resource
+            )
+        return self._permisions[key]
+
+
+def get_auth_identity(request):
+    identity = getattr(request, 'auth_identity', None)
+    if identity is None:
+        identity = AuthIdentity(request)
+        request.auth_identity = identity
+    return identity
 
 
 def get_auth_employee(request):
-    user = User.get(request.authenticated_userid)
-    if user:
-        return user.employee
+    return get_auth_identity(request).employee
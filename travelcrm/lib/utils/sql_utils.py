@@ -1,9 +1,18 @@
 # -*coding: utf-8-*-
 
-from collections import Iterable
-from sqlalchemy import inspect
+import threading
+import time
+from collections import Iterable, OrderedDict
+from sqlalchemy import inspect, event, create_engine
+from sqlalchemy.engine import Engine
+from pyramid.settings import asbool
 
-from ...models import DBSession
+from ...models import DBSession, RoutingSession
+
+
+_local = threading.local()
+
+SCHEMAS_TTL = 60
 
 
 def build_union_query(queries):
@@ -17,26 +26,177 @@ def build_union_query(queries):
         return queries[0].union(*queries[1:])
 
 
+class SchemasRegistry(object):
+    """in-process cache of database schemas names and default schema
+    reloaded after ttl (in seconds) expired or on invalidation
+    """
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._item = None
+
+    def get(self):
+        item = self._item
+        if item is None or (self._ttl and item[-1] + self._ttl <= time.time()):
+            insp = inspect(DBSession.get_bind())
+            item = (
+                frozenset(insp.get_schema_names()),
+                insp.default_schema_name,
+                time.time(),
+            )
+            with self._lock:
+                self._item = item
+        return item
+
+    def invalidate(self):
+        with self._lock:
+            self._item = None
+
+
+schemas_registry = SchemasRegistry(ttl=SCHEMAS_TTL)
+
+
 def get_schemas():
-    engine = DBSession.get_bind()
-    insp = inspect(engine)
-    return insp.get_schema_names()
+    return schemas_registry.get()[0]
 
 
 def get_default_schema():
-    engine = DBSession.get_bind()
-    insp = inspect(engine)
-    return insp.default_schema_name
+    return schemas_registry.get()[1]
 
 
 def set_search_path(*args):
-    DBSession.execute('set search_path to %s' % (', '.join(args)))
+    """set search path of the session connection, statement is skipped
+    if pooled connection already has the same search path, with tenant
+    engines connection of other tenant gets the search path only
+    till the end of transaction
+    """
+    _local.search_path = args
+    connection = DBSession.connection()
+    if connection.info.get('search_path') != args:
+        connection.execute(
+            'set %ssearch_path to %s' % (
+                'local ' if connection.info.get('tenant_search_path') else '',
+                ', '.join(args),
+            )
+        )
+        connection.info['search_path'] = args
+
+
+def _end_search_path(connection, committed):
+    tenant_search_path = connection.info.get('tenant_search_path')
+    if tenant_search_path:
+        # set local search path of other tenant ends with transaction
+        connection.info['search_path'] = tenant_search_path
+    elif not committed:
+        connection.info.pop('search_path', None)
+
+
+@event.listens_for(Engine, 'commit')
+def _commit_search_path(connection):
+    _end_search_path(connection, True)
+
+
+@event.listens_for(Engine, 'rollback')
+def _reset_search_path(connection):
+    # set search path is transactional, so rollback can restore previous
+    _end_search_path(connection, False)
+
+
+@event.listens_for(Engine, 'rollback_savepoint')
+def _reset_savepoint_search_path(connection, *args):
+    connection.info.pop('search_path', None)
+
+
+class TenantEngines(object):
+    """engines with own small pool for every tenant search path
+
+    connections of tenant pool get search path on connect, so
+    set_search_path does not need to issue SET and a connection
+    never serves other tenant outside of transaction. Least recently used idle tenant engines
+    are disposed when there are more than max_tenants of them
+    """
+
+    def __init__(self, engine, pool_size=2, max_overflow=2, max_tenants=20):
+        self.engine = engine
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.max_tenants = max_tenants
+        self._lock = threading.Lock()
+        self._engines = OrderedDict()
+
+    def get(self, search_path):
+        with self._lock:
+            engine = self._engines.pop(search_path, None)
+            if engine is None:
+                engine = self._create_engine(search_path)
+            self._engines[search_path] = engine
+            self._evict()
+        return engine
+
+    def _create_engine(self, search_path):
+        engine = create_engine(
+            self.engine.url,
+            echo=self.engine.echo,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            connect_args={
+                'options': '-c search_path=%s' % ','.join(search_path)
+            },
+        )
+
+        @event.listens_for(engine, 'connect')
+        def _connect(dbapi_connection, connection_record):
+            connection_record.info['search_path'] = search_path
+            connection_record.info['tenant_search_path'] = search_path
+
+        return engine
+
+    def _evict(self):
+        for search_path in list(self._engines):
+            if len(self._engines) <= self.max_tenants:
+                break
+            engine = self._engines[search_path]
+            if engine.pool.checkedout():
+                continue
+            del self._engines[search_path]
+            engine.dispose()
+
+    def __call__(self):
+        search_path = getattr(_local, 'search_path', None)
+        if not search_path:
+            return self.engine
+        return self.get(search_path)
+
+
+def configure_tenant_engines(engine, settings):
+    """route session to tenant engines if tenant_pools.enabled is set
+    """
+    if not asbool(settings.get('tenant_pools.enabled')):
+        RoutingSession.router = None
+        return
+    RoutingSession.router = TenantEngines(
+        engine,
+        pool_size=int(settings.get('tenant_pools.pool_size', 2)),
+        max_overflow=int(settings.get('tenant_pools.max_overflow', 2)),
+        max_tenants=int(settings.get('tenant_pools.max_tenants', 20)),
+    )
 
 
 def get_current_schema():
     return DBSession.execute('select current_schema()').scalar()
 
 
+def get_search_path_schema():
+    """get schema the search path was set to in the current thread
+    falls back to DB when search path was not set yet
+    """
+    search_path = getattr(_local, 'search_path', None)
+    if search_path:
+        return search_path[0]
+    return get_current_schema()
+
+
 def get_all_schema_sequences(schema):
     query = DBSession.execute('''
         select c.relname AS sequencename
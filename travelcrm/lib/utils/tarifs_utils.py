@@ -0,0 +1,115 @@
+# -*coding: utf-8-*-
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from ..utils.common_utils import get_tarifs_timeout
+from ..utils.sql_utils import get_search_path_schema
+
+
+FLUSH_INTERVAL = 60
+DT_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class IPActivityTracker(object):
+    """sliding window of client IPs activity per tenant schema
+
+    IPs of every schema are kept ordered by last activity, so expiration
+    and check of the current IP are O(1). Activity is seeded from
+    and flushed to company settings tarif_ips list, flush is needed
+    only when the set of active IPs changed or flush interval passed
+    """
+
+    def __init__(self, timeout, flush_interval=FLUSH_INTERVAL):
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._ips = {}
+        self._flushed = {}
+
+    def is_loaded(self, schema=None):
+        if schema is None:
+            schema = get_search_path_schema()
+        return schema in self._ips
+
+    def load(self, ips, schema=None):
+        """seed activity of schema from stored list of (ip, last activity)
+        """
+        if schema is None:
+            schema = get_search_path_schema()
+        items = sorted(
+            (
+                time.mktime(
+                    datetime.strptime(last_activity, DT_FORMAT).timetuple()
+                ),
+                ip
+            )
+            for ip, last_activity in ips
+        )
+        with self._lock:
+            if schema in self._ips:
+                return
+            self._ips[schema] = OrderedDict(
+                (ip, last_activity) for last_activity, ip in items
+            )
+            self._flushed[schema] = (
+                frozenset(self._ips[schema]), time.time()
+            )
+
+    def _expire(self, ips, now):
+        while ips:
+            ip, last_activity = next(ips.iteritems())
+            if last_activity + self.timeout > now:
+                break
+            del ips[ip]
+
+    def touch(self, ip, limit, schema=None):
+        """register activity of ip, return False if ip is not active
+        and limit of active ips is exhausted
+        """
+        if schema is None:
+            schema = get_search_path_schema()
+        now = time.time()
+        with self._lock:
+            ips = self._ips.setdefault(schema, OrderedDict())
+            last_activity = ips.pop(ip, None)
+            self._expire(ips, now)
+            if last_activity is None and len(ips) >= limit:
+                return False
+            ips[ip] = now
+            return True
+
+    def pop_changes(self, schema=None):
+        """get list of (ip, last activity) to store in company settings
+        or None if flush is not needed yet
+        """
+        if schema is None:
+            schema = get_search_path_schema()
+        now = time.time()
+        with self._lock:
+            ips = self._ips.get(schema, OrderedDict())
+            self._expire(ips, now)
+            active = frozenset(ips)
+            flushed, flushed_at = self._flushed.get(schema, (None, 0))
+            if active == flushed and flushed_at + self.flush_interval > now:
+                return None
+            self._flushed[schema] = (active, now)
+            return [
+                (ip, datetime.fromtimestamp(last_activity).strftime(DT_FORMAT))
+                for ip, last_activity in ips.iteritems()
+            ]
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_ip_activity_tracker():
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = IPActivityTracker(get_tarifs_timeout())
+    return _tracker
@@ -1,16 +1,42 @@
 # coding: utf-8
 
+from sqlalchemy import event
 from sqlalchemy.orm import (
     make_transient,
     scoped_session,
     sessionmaker,
+    Session,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from zope.sqlalchemy import ZopeTransactionExtension
 
 
+class RoutingSession(Session):
+    """session can take engine from router callable instead of bind,
+    engine is taken once per transaction, so the transaction never
+    spans connections of several engines,
+    see lib.utils.sql_utils.TenantEngines
+    """
+    router = None
+
+    def get_bind(self, mapper=None, clause=None):
+        if self.router is None:
+            return super(RoutingSession, self).get_bind(mapper, clause)
+        bind = self.info.get('routed_bind')
+        if bind is None:
+            bind = self.info['routed_bind'] = self.router()
+        return bind
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _release_routed_bind(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('routed_bind', None)
+
+
 DBSession = scoped_session(
     sessionmaker(
+        class_=RoutingSession,
         extension=ZopeTransactionExtension(),
         autoflush=False,
     ),
@@ -94,5 +120,16 @@ from .upload import Upload
 from .person_category import PersonCategory
 from .campaign import Campaign
 from .dismissal import Dismissal
+from .employee_current_state import EmployeeCurrentState
+from .balance import (
+    SubaccountBalance,
+    SubaccountBalanceSnapshot,
+    AccountBalance,
+    AccountBalanceSnapshot,
+)
+from .cashflow_rollup import CashflowRollup
+from .dashboard_stat import DashboardStat
+from .subaccount_source import SubaccountSource
+from .cache_version import CacheVersion
 from .mail import Mail
 from .tag import Tag
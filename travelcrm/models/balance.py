@@ -0,0 +1,344 @@
+# -*-coding: utf-8-*-
+
+from collections import defaultdict
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Date,
+    Numeric,
+    ForeignKey,
+    text,
+)
+
+from ..models import Base
+from .cashflow import (
+    cashflows_changes_handlers,
+    subaccounts_moves_handlers,
+)
+
+
+class SubaccountBalance(Base):
+    """cumulative balance of subaccount by all cashflows
+    """
+    __tablename__ = 'subaccount_balance'
+
+    subaccount_id = Column(
+        Integer,
+        ForeignKey(
+            'subaccount.id',
+            name="fk_subaccount_id_subaccount_balance",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    balance = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+
+
+class SubaccountBalanceSnapshot(Base):
+    """balance of subaccount by cashflows before the first day of month
+    """
+    __tablename__ = 'subaccount_balance_snapshot'
+
+    subaccount_id = Column(
+        Integer,
+        ForeignKey(
+            'subaccount.id',
+            name="fk_subaccount_id_subaccount_balance_snapshot",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    date = Column(
+        Date,
+        primary_key=True,
+    )
+    balance = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+
+
+class AccountBalance(Base):
+    """cumulative balance of account by all cashflows
+    """
+    __tablename__ = 'account_balance'
+
+    account_id = Column(
+        Integer,
+        ForeignKey(
+            'account.id',
+            name="fk_account_id_account_balance",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    balance = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+
+
+class AccountBalanceSnapshot(Base):
+    """balance of account by cashflows before the first day of month
+    """
+    __tablename__ = 'account_balance_snapshot'
+
+    account_id = Column(
+        Integer,
+        ForeignKey(
+            'account.id',
+            name="fk_account_id_account_balance_snapshot",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    date = Column(
+        Date,
+        primary_key=True,
+    )
+    balance = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+
+
+def month_start(date):
+    return date.replace(day=1)
+
+
+class BalanceLedger(object):
+    """running balances and monthly snapshots of subaccounts or accounts
+
+    balance as of date is the latest snapshot before the date plus
+    sum of cashflows from the snapshot date, so only cashflows
+    of the month are summed
+    """
+
+    def __init__(self, name, flows):
+        self.name = name
+        self.key = '%s_id' % name
+        self.balance_table = '%s_balance' % name
+        self.snapshot_table = '%s_balance_snapshot' % name
+        # signed cashflows sums of owners as (owner_id, date, sum)
+        self.flows = flows
+
+    def _execute(self, connection, sql, **params):
+        return connection.execute(text(sql % self.__dict__), **params)
+
+    def raw_balance(self, connection, owner_id, date_from=None, date_to=None):
+        """sum of owner cashflows between dates
+        """
+        conditions = ['f.owner_id = :owner_id']
+        if date_from:
+            conditions.append('f.date >= :date_from')
+        if date_to:
+            conditions.append('f.date <= :date_to')
+        return self._execute(
+            connection,
+            'select coalesce(sum(f.sum), 0) from (%(flows)s) f '
+            'where ' + ' and '.join(conditions),
+            owner_id=owner_id, date_from=date_from, date_to=date_to
+        ).scalar()
+
+    def balance(self, connection, owner_id, date=None):
+        """balance of owner by cashflows up to date inclusive
+        """
+        if date is None:
+            balance = self._execute(
+                connection,
+                'select balance from %(balance_table)s '
+                'where %(key)s = :owner_id',
+                owner_id=owner_id
+            ).scalar()
+            if balance is not None:
+                return balance
+            return self.raw_balance(connection, owner_id)
+        snapshot = self._execute(
+            connection,
+            'select date, balance from %(snapshot_table)s '
+            'where %(key)s = :owner_id and date <= :date '
+            'order by date desc limit 1',
+            owner_id=owner_id, date=date
+        ).first()
+        if snapshot is None:
+            return self.raw_balance(connection, owner_id, date_to=date)
+        return snapshot.balance + self.raw_balance(
+            connection, owner_id, date_from=snapshot.date, date_to=date
+        )
+
+    def apply(self, connection, owner_id, changes):
+        """apply list of (date, sum) changes of cashflows
+        already written to the cashflow table
+        """
+        updated = self._execute(
+            connection,
+            'update %(balance_table)s set balance = balance + :sum '
+            'where %(key)s = :owner_id',
+            owner_id=owner_id, sum=sum(amount for _, amount in changes)
+        ).rowcount
+        if not updated:
+            self._execute(
+                connection,
+                'insert into %(balance_table)s (%(key)s, balance) '
+                'select :owner_id, coalesce(sum(f.sum), 0) '
+                'from (%(flows)s) f where f.owner_id = :owner_id',
+                owner_id=owner_id
+            )
+        for date, amount in changes:
+            self._execute(
+                connection,
+                'update %(snapshot_table)s set balance = balance + :sum '
+                'where %(key)s = :owner_id and date > :date',
+                owner_id=owner_id, sum=amount, date=date
+            )
+        for date in set(month_start(date) for date, _ in changes):
+            self._execute(
+                connection,
+                'insert into %(snapshot_table)s (%(key)s, date, balance) '
+                'select :owner_id, :date, b.balance - ('
+                '  select coalesce(sum(f.sum), 0) from (%(flows)s) f '
+                '  where f.owner_id = :owner_id and f.date >= :date'
+                ') from %(balance_table)s b where b.%(key)s = :owner_id '
+                'and not exists ('
+                '  select 1 from %(snapshot_table)s s '
+                '  where s.%(key)s = :owner_id and s.date = :date'
+                ')',
+                owner_id=owner_id, date=date
+            )
+
+    def rebuild(self, connection):
+        """rebuild balances and snapshots of all owners from cashflows
+        """
+        self._execute(connection, 'delete from %(snapshot_table)s')
+        self._execute(connection, 'delete from %(balance_table)s')
+        self._execute(
+            connection,
+            'insert into %(balance_table)s (%(key)s, balance) '
+            'select f.owner_id, sum(f.sum) from (%(flows)s) f '
+            'group by f.owner_id'
+        )
+        self._execute(
+            connection,
+            'insert into %(snapshot_table)s (%(key)s, date, balance) '
+            'select m.owner_id, m.date, ('
+            '  select coalesce(sum(f.sum), 0) from (%(flows)s) f '
+            '  where f.owner_id = m.owner_id and f.date < m.date'
+            ') from ('
+            '  select distinct f.owner_id, '
+            "  cast(date_trunc('month', f.date) as date) as date "
+            '  from (%(flows)s) f'
+            ') m'
+        )
+
+    def check(self, connection):
+        """compare stored balances and snapshots with cashflows sums,
+        return list of (owner_id, date, stored, calculated) mismatches,
+        date is None for balances
+        """
+        balances = self._execute(
+            connection,
+            'select coalesce(b.%(key)s, r.owner_id), null, '
+            'b.balance, coalesce(r.balance, 0) '
+            'from %(balance_table)s b full join ('
+            '  select f.owner_id, sum(f.sum) as balance '
+            '  from (%(flows)s) f group by f.owner_id'
+            ') r on r.owner_id = b.%(key)s '
+            'where b.balance is distinct from coalesce(r.balance, 0)'
+        ).fetchall()
+        snapshots = self._execute(
+            connection,
+            'select t.owner_id, t.date, t.stored, t.calculated from ('
+            '  select s.%(key)s as owner_id, s.date, s.balance as stored, ('
+            '    select coalesce(sum(f.sum), 0) from (%(flows)s) f '
+            '    where f.owner_id = s.%(key)s and f.date < s.date'
+            '  ) as calculated from %(snapshot_table)s s'
+            ') t where t.stored <> t.calculated'
+        ).fetchall()
+        return [tuple(row) for row in balances + snapshots]
+
+
+subaccounts_ledger = BalanceLedger(
+    'subaccount',
+    'select c.subaccount_to_id as owner_id, c.date, c.sum '
+    'from cashflow c where c.subaccount_to_id is not null '
+    'union all '
+    'select c.subaccount_from_id, c.date, -c.sum '
+    'from cashflow c where c.subaccount_from_id is not null'
+)
+accounts_ledger = BalanceLedger(
+    'account',
+    'select s.account_id as owner_id, c.date, c.sum '
+    'from cashflow c join subaccount s on s.id = c.subaccount_to_id '
+    'union all '
+    'select s.account_id, c.date, -c.sum '
+    'from cashflow c join subaccount s on s.id = c.subaccount_from_id'
+)
+
+
+def apply_balance_changes(connection, changes, accounts):
+    """maintain ledgers with cashflows changes of the flush
+    """
+    subaccounts_changes = defaultdict(list)
+    for change in changes:
+        if change.subaccount_to_id:
+            subaccounts_changes[change.subaccount_to_id].append(
+                (change.date, change.sum)
+            )
+        if change.subaccount_from_id:
+            subaccounts_changes[change.subaccount_from_id].append(
+                (change.date, -change.sum)
+            )
+    accounts_changes = defaultdict(list)
+    for subaccount_id, subaccount_changes in subaccounts_changes.items():
+        subaccounts_ledger.apply(
+            connection, subaccount_id, subaccount_changes
+        )
+        account_id = accounts.get(subaccount_id)
+        if account_id:
+            accounts_changes[account_id].extend(subaccount_changes)
+    for account_id, account_changes in accounts_changes.items():
+        accounts_ledger.apply(connection, account_id, account_changes)
+
+
+cashflows_changes_handlers.append(apply_balance_changes)
+
+
+def move_subaccount_balances(
+    connection, subaccount_id, old_account_id, new_account_id
+):
+    """move cashflows of subaccount from old account ledger to new one
+    """
+    flows = [
+        (date, amount) for date, amount in connection.execute(
+            text(
+                'select f.date, sum(f.sum) from (%s) f '
+                'where f.owner_id = :subaccount_id group by f.date'
+                % subaccounts_ledger.flows
+            ),
+            subaccount_id=subaccount_id
+        )
+    ]
+    if not flows:
+        return
+    if old_account_id:
+        accounts_ledger.apply(
+            connection, old_account_id,
+            [(date, -amount) for date, amount in flows]
+        )
+    if new_account_id:
+        accounts_ledger.apply(connection, new_account_id, flows)
+
+
+subaccounts_moves_handlers.append(move_subaccount_balances)
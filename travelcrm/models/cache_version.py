@@ -0,0 +1,50 @@
+# -*-coding: utf-8-*-
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    text,
+)
+
+from ..models import (
+    DBSession,
+    Base
+)
+
+
+class CacheVersion(Base):
+    """version of tenant data kept in in-process caches, bumped
+    in transactions changing the data, so every process can check
+    its cached value is current
+    """
+    __tablename__ = 'cache_version'
+
+    name = Column(
+        String(32),
+        primary_key=True,
+    )
+    version = Column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+
+    @classmethod
+    def get_version(cls, name):
+        return (
+            DBSession.query(cls.version).filter(cls.name == name).scalar()
+            or 0
+        )
+
+    @classmethod
+    def bump(cls, connection, name):
+        connection.execute(
+            text(
+                'insert into cache_version (name, version) '
+                'values (:name, 1) '
+                'on conflict (name) do update '
+                'set version = cache_version.version + 1'
+            ),
+            name=name
+        )
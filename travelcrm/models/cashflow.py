@@ -1,5 +1,7 @@
 # -*-coding: utf-8-*-
 
+from collections import namedtuple
+
 from sqlalchemy import (
     Column,
     Integer,
@@ -7,13 +9,19 @@ from sqlalchemy import (
     Numeric,
     CheckConstraint,
     ForeignKey,
+    Index,
+    event,
+    text,
 )
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import relationship, backref, object_session
+from sqlalchemy.orm.attributes import get_history
 
 from ..models import (
     DBSession,
-    Base
+    Base,
+    RoutingSession,
 )
+from .subaccount import Subaccount
 
 
 class Cashflow(Base):
@@ -24,6 +32,16 @@ class Cashflow(Base):
             'subaccount_to_id is not null',
             name='constraint_cashflow_subaccount',
         ),
+        Index(
+            'idx_cashflow_subaccount_from_id_date',
+            'subaccount_from_id',
+            'date',
+        ),
+        Index(
+            'idx_cashflow_subaccount_to_id_date',
+            'subaccount_to_id',
+            'date',
+        ),
     )
 
     id = Column(
@@ -119,3 +137,125 @@ class Cashflow(Base):
         
     def __repr__(self):
         return "%s_%s: %s" % (self.__class__.__name__, self.id, self.sum)
+
+
+# cashflow version added (sum is positive) or removed (sum is negative)
+CashflowChange = namedtuple(
+    'CashflowChange',
+    [
+        'date', 'sum', 'subaccount_from_id', 'subaccount_to_id',
+        'account_item_id',
+    ]
+)
+
+# callables (connection, changes, accounts) called once per flush
+# with list of CashflowChange and {subaccount_id: account_id}
+cashflows_changes_handlers = []
+
+# callables (connection, subaccount_id, old_account_id, new_account_id)
+# called when subaccount is moved to other account, subaccounts are
+# saved before cashflows in flush, so its cashflows of the same flush
+# are not written yet and come to cashflows changes handlers
+subaccounts_moves_handlers = []
+
+
+def _committed_value(target, name):
+    history = get_history(target, name)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, name)
+
+
+def _cashflow_change(target, sign, committed=False):
+    value = _committed_value if committed else getattr
+    return CashflowChange(
+        date=value(target, 'date'),
+        sum=value(target, 'sum') * sign,
+        subaccount_from_id=value(target, 'subaccount_from_id'),
+        subaccount_to_id=value(target, 'subaccount_to_id'),
+        account_item_id=value(target, 'account_item_id'),
+    )
+
+
+def _add_changes(target, changes):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('cashflows_changes', []).extend(changes)
+
+
+def cashflow_insert_event(mapper, connection, target):
+    _add_changes(target, [_cashflow_change(target, 1)])
+
+
+def cashflow_update_event(mapper, connection, target):
+    if not any(
+        get_history(target, name).has_changes()
+        for name in CashflowChange._fields
+    ):
+        return
+    _add_changes(
+        target,
+        [
+            _cashflow_change(target, -1, committed=True),
+            _cashflow_change(target, 1),
+        ]
+    )
+
+
+def cashflow_delete_event(mapper, connection, target):
+    _add_changes(target, [_cashflow_change(target, -1, committed=True)])
+
+
+def apply_flushed_cashflows_changes(session, flush_context):
+    """pass cashflows changes collected during flush to handlers
+    """
+    changes = session.info.pop('cashflows_changes', None)
+    if not changes or not cashflows_changes_handlers:
+        return
+    connection = session.connection()
+    subaccounts_ids = set(
+        subaccount_id
+        for change in changes
+        for subaccount_id in (
+            change.subaccount_from_id, change.subaccount_to_id
+        )
+        if subaccount_id
+    )
+    accounts = dict(
+        connection.execute(
+            text('select id, account_id from subaccount where id = any(:ids)'),
+            ids=list(subaccounts_ids)
+        ).fetchall()
+    )
+    for handler in cashflows_changes_handlers:
+        handler(connection, changes, accounts)
+
+
+def subaccount_account_event(mapper, connection, target):
+    history = get_history(target, 'account_id')
+    if not history.deleted or not history.added:
+        return
+    old_account_id, new_account_id = history.deleted[0], history.added[0]
+    if old_account_id == new_account_id:
+        return
+    for handler in subaccounts_moves_handlers:
+        handler(connection, target.id, old_account_id, new_account_id)
+
+
+event.listen(Cashflow, 'after_insert', cashflow_insert_event)
+event.listen(Cashflow, 'after_update', cashflow_update_event)
+event.listen(Cashflow, 'after_delete', cashflow_delete_event)
+def discard_cashflows_changes(session, previous_transaction):
+    """changes of failed flush or rolled back transaction
+    must not come to the next flush
+    """
+    session.info.pop('cashflows_changes', None)
+
+
+event.listen(Subaccount, 'after_update', subaccount_account_event)
+event.listen(
+    RoutingSession, 'after_flush_postexec', apply_flushed_cashflows_changes
+)
+event.listen(RoutingSession, 'after_soft_rollback', discard_cashflows_changes)
@@ -0,0 +1,196 @@
+# -*-coding: utf-8-*-
+
+from collections import defaultdict
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Date,
+    Numeric,
+    ForeignKey,
+    text,
+)
+
+from ..models import Base
+from .cashflow import (
+    cashflows_changes_handlers,
+    subaccounts_moves_handlers,
+)
+
+
+class CashflowRollup(Base):
+    """daily revenue and expenses of account by account item
+    """
+    __tablename__ = 'cashflow_rollup'
+
+    date = Column(
+        Date,
+        primary_key=True,
+    )
+    account_id = Column(
+        Integer,
+        ForeignKey(
+            'account.id',
+            name="fk_account_id_cashflow_rollup",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    account_item_id = Column(
+        Integer,
+        ForeignKey(
+            'account_item.id',
+            name="fk_account_item_id_cashflow_rollup",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    revenue = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+    expenses = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+
+
+# revenue and expenses of accounts by account items as
+# (date, account_id, account_item_id, revenue, expenses)
+ROLLUP_FLOWS = (
+    'select c.date, s.account_id, c.account_item_id, '
+    'c.sum as revenue, 0 as expenses '
+    'from cashflow c join subaccount s on s.id = c.subaccount_to_id '
+    'where c.account_item_id is not null '
+    'union all '
+    'select c.date, s.account_id, c.account_item_id, 0, c.sum '
+    'from cashflow c join subaccount s on s.id = c.subaccount_from_id '
+    'where c.account_item_id is not null'
+)
+
+
+def _upsert_rollup(connection, deltas):
+    """add {(date, account_id, account_item_id): (revenue, expenses)}
+    deltas to rollup
+    """
+    for (date, account_id, account_item_id), (revenue, expenses) \
+            in deltas.items():
+        if not revenue and not expenses:
+            continue
+        connection.execute(
+            text(
+                'insert into cashflow_rollup '
+                '(date, account_id, account_item_id, revenue, expenses) '
+                'values (:date, :account_id, :account_item_id, '
+                ':revenue, :expenses) '
+                'on conflict (date, account_id, account_item_id) '
+                'do update set '
+                'revenue = cashflow_rollup.revenue + excluded.revenue, '
+                'expenses = cashflow_rollup.expenses + excluded.expenses'
+            ),
+            date=date, account_id=account_id,
+            account_item_id=account_item_id,
+            revenue=revenue, expenses=expenses
+        )
+
+
+def apply_rollup_changes(connection, changes, accounts):
+    """maintain rollup with cashflows changes of the flush
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for change in changes:
+        if not change.account_item_id:
+            continue
+        account_id = accounts.get(change.subaccount_to_id)
+        if account_id:
+            key = (change.date, account_id, change.account_item_id)
+            deltas[key][0] += change.sum
+        account_id = accounts.get(change.subaccount_from_id)
+        if account_id:
+            key = (change.date, account_id, change.account_item_id)
+            deltas[key][1] += change.sum
+    _upsert_rollup(connection, deltas)
+
+
+def rebuild_rollup(connection):
+    """rebuild rollup of all accounts from cashflows
+    """
+    connection.execute(text('delete from cashflow_rollup'))
+    connection.execute(text(
+        'insert into cashflow_rollup '
+        '(date, account_id, account_item_id, revenue, expenses) '
+        'select f.date, f.account_id, f.account_item_id, '
+        'sum(f.revenue), sum(f.expenses) from (%s) f '
+        'group by f.date, f.account_id, f.account_item_id' % ROLLUP_FLOWS
+    ))
+
+
+def check_rollup(connection):
+    """compare rollup with cashflows sums, return list of
+    (date, account_id, account_item_id, stored, calculated) mismatches,
+    stored and calculated are (revenue, expenses)
+    """
+    rows = connection.execute(text(
+        'select coalesce(r.date, f.date), '
+        'coalesce(r.account_id, f.account_id), '
+        'coalesce(r.account_item_id, f.account_item_id), '
+        'r.revenue, r.expenses, '
+        'coalesce(f.revenue, 0), coalesce(f.expenses, 0) '
+        'from cashflow_rollup r full join ('
+        '  select f.date, f.account_id, f.account_item_id, '
+        '  sum(f.revenue) as revenue, sum(f.expenses) as expenses '
+        '  from (%s) f group by f.date, f.account_id, f.account_item_id'
+        ') f on f.date = r.date and f.account_id = r.account_id '
+        'and f.account_item_id = r.account_item_id '
+        'where r.revenue is distinct from coalesce(f.revenue, 0) '
+        'or r.expenses is distinct from coalesce(f.expenses, 0)'
+        % ROLLUP_FLOWS
+    )).fetchall()
+    return [
+        (row[0], row[1], row[2], (row[3], row[4]), (row[5], row[6]))
+        for row in rows
+    ]
+
+
+cashflows_changes_handlers.append(apply_rollup_changes)
+
+
+def move_subaccount_rollup(
+    connection, subaccount_id, old_account_id, new_account_id
+):
+    """move revenue and expenses of subaccount cashflows
+    from old account to new one
+    """
+    deltas = {}
+    for date, account_item_id, revenue, expenses in connection.execute(
+        text(
+            'select f.date, f.account_item_id, '
+            'sum(f.revenue), sum(f.expenses) from ('
+            '  select c.date, c.account_item_id, '
+            '  c.sum as revenue, 0 as expenses '
+            '  from cashflow c where c.subaccount_to_id = :subaccount_id '
+            '  and c.account_item_id is not null '
+            '  union all '
+            '  select c.date, c.account_item_id, 0, c.sum '
+            '  from cashflow c where c.subaccount_from_id = :subaccount_id '
+            '  and c.account_item_id is not null'
+            ') f group by f.date, f.account_item_id'
+        ),
+        subaccount_id=subaccount_id
+    ):
+        if old_account_id:
+            deltas[(date, old_account_id, account_item_id)] = (
+                -revenue, -expenses
+            )
+        if new_account_id:
+            deltas[(date, new_account_id, account_item_id)] = (
+                revenue, expenses
+            )
+    _upsert_rollup(connection, deltas)
+
+
+subaccounts_moves_handlers.append(move_subaccount_rollup)
@@ -0,0 +1,48 @@
+# -*-coding: utf-8-*-
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Date,
+    ForeignKey,
+)
+
+from ..models import Base
+
+
+class DashboardStat(Base):
+    """daily counters of dashboard portlets by structure
+    of the resource maintainer, key is the counter subject
+    as country iso code for countries stats
+    """
+    __tablename__ = 'dashboard_stat'
+
+    kind = Column(
+        String(16),
+        primary_key=True,
+    )
+    date = Column(
+        Date,
+        primary_key=True,
+    )
+    structure_id = Column(
+        Integer,
+        ForeignKey(
+            'structure.id',
+            name="fk_structure_id_dashboard_stat",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    key = Column(
+        String(8),
+        default='',
+        primary_key=True,
+    )
+    quan = Column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
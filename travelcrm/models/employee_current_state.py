@@ -0,0 +1,148 @@
+# -*-coding: utf-8-*-
+
+from datetime import date
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Date,
+    ForeignKey,
+    Index,
+    event,
+    text,
+)
+from sqlalchemy.orm.attributes import get_history
+
+from ..models import (
+    DBSession,
+    Base
+)
+from .appointment import Appointment
+from .dismissal import Dismissal
+from .position import Position
+
+
+class EmployeeCurrentState(Base):
+    """materialized current position, structure and dismissal
+    of employees, maintained on appointments and dismissals changes
+    """
+    __tablename__ = 'employee_current_state'
+    __table_args__ = (
+        Index(
+            'idx_employee_current_state_structure_id',
+            'structure_id',
+        ),
+        Index(
+            'idx_employee_current_state_position_id',
+            'position_id',
+        ),
+    )
+
+    employee_id = Column(
+        Integer,
+        ForeignKey(
+            'employee.id',
+            name="fk_employee_id_employee_current_state",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    position_id = Column(
+        Integer,
+        ForeignKey(
+            'position.id',
+            name="fk_position_id_employee_current_state",
+            ondelete='set null',
+            onupdate='cascade',
+        ),
+    )
+    structure_id = Column(
+        Integer,
+        ForeignKey(
+            'structure.id',
+            name="fk_structure_id_employee_current_state",
+            ondelete='set null',
+            onupdate='cascade',
+        ),
+    )
+    dismissed_at = Column(
+        Date,
+    )
+
+    @classmethod
+    def get(cls, employee_id):
+        if employee_id is None:
+            return None
+        return DBSession.query(cls).get(employee_id)
+
+    def is_dismissed(self, on_date=None):
+        return bool(
+            self.dismissed_at
+            and self.dismissed_at <= (on_date or date.today())
+        )
+
+
+def refresh_employees_current_state(connection, employee_id=None):
+    """rebuild current state rows for employee or for all employees
+    if employee_id is None
+    """
+    delete_condition, insert_condition = (
+        ('where employee_id = :employee_id', 'where e.id = :employee_id')
+        if employee_id else ('', '')
+    )
+    connection.execute(
+        text('delete from employee_current_state ' + delete_condition),
+        employee_id=employee_id
+    )
+    connection.execute(
+        text(
+            'insert into employee_current_state '
+            '(employee_id, position_id, structure_id, dismissed_at) '
+            'select e.id, p.id, p.structure_id, ('
+            '  select max(d.date) from dismissal d '
+            '  where d.employee_id = e.id and d.date > ('
+            '    select max(a.date) from appointment a '
+            '    where a.employee_id = e.id'
+            '  )'
+            ') from employee e '
+            'left join position p on p.id = ('
+            '  select a.position_id from appointment a '
+            '  where a.employee_id = e.id and a.date <= current_date '
+            '  order by a.date desc, a.id desc limit 1'
+            ') ' + insert_condition
+        ),
+        employee_id=employee_id
+    )
+
+
+def employee_state_event(mapper, connection, target):
+    """refresh current state of employee whose appointment
+    or dismissal was changed
+    """
+    history = get_history(target, 'employee_id')
+    employees_ids = set(history.deleted or ()) | {target.employee_id}
+    for employee_id in employees_ids:
+        if employee_id:
+            refresh_employees_current_state(connection, employee_id)
+
+
+def position_structure_event(mapper, connection, target):
+    """follow position moving to another structure
+    """
+    if get_history(target, 'structure_id').has_changes():
+        connection.execute(
+            text(
+                'update employee_current_state '
+                'set structure_id = :structure_id '
+                'where position_id = :id'
+            ),
+            id=target.id, structure_id=target.structure_id
+        )
+
+
+for _cls in (Appointment, Dismissal):
+    event.listen(_cls, 'after_insert', employee_state_event)
+    event.listen(_cls, 'after_update', employee_state_event)
+    event.listen(_cls, 'after_delete', employee_state_event)
+event.listen(Position, 'after_update', position_structure_event)
@@ -5,14 +5,21 @@ from sqlalchemy import (
     Integer,
     Date,
     String,
+    Numeric,
     ForeignKey,
+    event,
+    text,
 )
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import relationship, backref, object_session
+from sqlalchemy.orm.attributes import get_history
 
 from ..models import (
     DBSession,
-    Base
+    Base,
+    RoutingSession,
 )
+from .invoice_item import InvoiceItem
+from .income import Income
 
 
 class Invoice(Base):
@@ -64,6 +71,32 @@ class Invoice(Base):
     descr = Column(
         String(length=255),
     )
+    # totals maintained on invoice items and incomes changes
+    final_price = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+    vat = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+    payments = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+    debt = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
+    payments_percent = Column(
+        Numeric(16, 2),
+        default=0,
+        nullable=False,
+    )
     resource = relationship(
         'Resource',
         backref=backref(
@@ -107,14 +140,85 @@ class Invoice(Base):
             DBSession.query(cls).filter(cls.resource_id == resource_id).first()
         )
 
-    @property
-    def final_price(self):
-        return sum([item.final_price for item in self.invoices_items])
-
     @property
     def discount(self):
         return sum([item.discount for item in self.invoices_items])
 
-    @property
-    def vat(self):
-        return sum([item.vat for item in self.invoices_items])
+
+TOTALS = ('final_price', 'vat', 'payments', 'debt', 'payments_percent')
+
+
+def refresh_invoices_totals(connection, invoices_ids=None):
+    """recalculate stored totals of invoices or of all invoices
+    if invoices_ids is None
+    """
+    if invoices_ids is not None and not invoices_ids:
+        return
+    connection.execute(
+        text(
+            'update invoice set '
+            'final_price = t.final_price, vat = t.vat, '
+            'payments = t.payments, debt = t.final_price - t.payments, '
+            'payments_percent = case when t.final_price > 0 '
+            '  then round(t.payments * 100 / t.final_price, 2) else 0 end '
+            'from ('
+            '  select inv.id, coalesce(('
+            '    select sum(ii.price - ii.discount) from invoice_item ii '
+            '    where ii.invoice_id = inv.id'
+            '  ), 0) as final_price, coalesce(('
+            '    select sum(ii.vat) from invoice_item ii '
+            '    where ii.invoice_id = inv.id'
+            '  ), 0) as vat, coalesce(('
+            '    select sum(i.sum) from income i where i.invoice_id = inv.id'
+            '  ), 0) as payments '
+            '  from invoice inv ' + (
+                'where inv.id = any(:invoices_ids)'
+                if invoices_ids is not None else ''
+            ) +
+            ') t where t.id = invoice.id'
+        ),
+        invoices_ids=list(invoices_ids or ())
+    )
+
+
+def invoice_totals_event(mapper, connection, target):
+    """remember invoices of changed invoice item or income,
+    totals are refreshed once per flush
+    """
+    history = get_history(target, 'invoice_id')
+    invoices_ids = set(history.deleted or ()) | {target.invoice_id}
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('invoices_totals', set()).update(
+            invoice_id for invoice_id in invoices_ids if invoice_id
+        )
+
+
+def refresh_flushed_invoices_totals(session, flush_context):
+    invoices_ids = session.info.pop('invoices_totals', None)
+    if not invoices_ids:
+        return
+    refresh_invoices_totals(session.connection(), invoices_ids)
+    for invoice_id in invoices_ids:
+        invoice = session.identity_map.get(
+            session.identity_key(Invoice, invoice_id)
+        )
+        if invoice is not None:
+            session.expire(invoice, TOTALS)
+
+
+def discard_invoices_totals(session, previous_transaction):
+    """invoices of failed flush or rolled back transaction
+    must not be refreshed by the next flush
+    """
+    session.info.pop('invoices_totals', None)
+
+
+for _cls in (InvoiceItem, Income):
+    event.listen(_cls, 'after_insert', invoice_totals_event)
+    event.listen(_cls, 'after_update', invoice_totals_event)
+    event.listen(_cls, 'after_delete', invoice_totals_event)
+event.listen(
+    RoutingSession, 'after_flush_postexec', refresh_flushed_invoices_totals
+)
+event.listen(RoutingSession, 'after_soft_rollback', discard_invoices_totals)
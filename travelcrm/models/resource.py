@@ -21,11 +21,7 @@ from ..models import (
     DBSession,
     Base
 )
-from ..models.resource_type import ResourceType
-from ..lib.utils.resources_utils import (
-    get_resource_class_module,
-    get_resource_class_name,
-)
+from ..lib.utils.resources_utils import get_resource_type_by_resource_cls
 from ..interfaces import IResourceType
 
 
@@ -91,10 +87,8 @@ class Resource(Base):
     def __init__(self, resource_type_cls, maintainer):
         assert verifyClass(IResourceType, resource_type_cls), \
             type(resource_type_cls)
-        resource_cls_module = get_resource_class_module(resource_type_cls)
-        resource_cls_name = get_resource_class_name(resource_type_cls)
-        self.resource_type = ResourceType.by_resource_name(
-            resource_cls_module, resource_cls_name
+        self.resource_type = get_resource_type_by_resource_cls(
+            resource_type_cls
         )
         self.maintainer = maintainer
 
@@ -5,12 +5,18 @@ from sqlalchemy import (
     Integer,
     String,
     Table,
-    ForeignKey
+    ForeignKey,
+    Index,
+    event,
+    select,
+    text,
     )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import (
     relationship,
     backref
 )
+from sqlalchemy.orm.attributes import get_history
 
 from ..models import (
     DBSession,
@@ -102,6 +108,40 @@ structure_address = Table(
 )
 
 
+structure_closure = Table(
+    'structure_closure',
+    Base.metadata,
+    Column(
+        'ancestor_id',
+        Integer,
+        ForeignKey(
+            'structure.id',
+            ondelete='cascade',
+            onupdate='cascade',
+            name='fk_ancestor_id_structure_closure',
+        ),
+        primary_key=True,
+    ),
+    Column(
+        'descendant_id',
+        Integer,
+        ForeignKey(
+            'structure.id',
+            ondelete='cascade',
+            onupdate='cascade',
+            name='fk_descendant_id_structure_closure',
+        ),
+        primary_key=True,
+    ),
+    Column(
+        'depth',
+        Integer,
+        nullable=False,
+    ),
+    Index('idx_structure_closure_descendant_id', 'descendant_id'),
+)
+
+
 class Structure(Base):
     __tablename__ = 'structure'
 
@@ -143,6 +183,9 @@ class Structure(Base):
         String(length=32),
         nullable=False
     )
+    name_path = Column(
+        ARRAY(String),
+    )
     resource = relationship(
         'Resource',
         backref=backref(
@@ -224,25 +267,103 @@ class Structure(Base):
         return cls.parent_id == parent_id
 
     def get_all_descendants(self):
-        all_structures = DBSession.query(Structure)
-        structures = {}
-
-        for item in all_structures:
-            item_children = structures.setdefault(item.parent_id, [])
-            item_children.append(item)
-            structures[item.parent_id] = item_children
-
-        def recurse_accumulate(item, result):
-            if structures.get(item.id):
-                for item in structures.get(item.id):
-                    result.append(item)
-                    recurse_accumulate(item, result)
-            return result
-
-        if structures.get(self.id):
-            result = []
-            return recurse_accumulate(self, result)
-        return []
+        return (
+            DBSession.query(Structure)
+            .join(
+                structure_closure,
+                structure_closure.c.descendant_id == Structure.id
+            )
+            .filter(
+                structure_closure.c.ancestor_id == self.id,
+                structure_closure.c.depth > 0
+            )
+            .order_by(structure_closure.c.depth, Structure.id)
+            .all()
+        )
 
     def __repr__(self):
         return u"<Structure id=%d>" % self.id
+
+
+def _get_parent_name_path(connection, parent_id):
+    if parent_id is None:
+        return []
+    return connection.execute(
+        select([Structure.name_path]).where(Structure.id == parent_id)
+    ).scalar() or []
+
+
+def name_path_event(mapper, connection, target):
+    """keep materialized name path of structure
+    """
+    target.name_path = (
+        _get_parent_name_path(connection, target.parent_id) + [target.name]
+    )
+
+
+def closure_insert_event(mapper, connection, target):
+    """add structure to its parent ancestors in closure table
+    """
+    connection.execute(
+        text(
+            'insert into structure_closure '
+            '(ancestor_id, descendant_id, depth) '
+            'select ancestor_id, :id, depth + 1 from structure_closure '
+            'where descendant_id = :parent_id '
+            'union all select :id, :id, 0'
+        ),
+        id=target.id, parent_id=target.parent_id
+    )
+
+
+def closure_update_event(mapper, connection, target):
+    """move subtree in closure table if parent was changed
+    and rebuild name paths of descendants
+    """
+    parent_changed = get_history(target, 'parent_id').has_changes()
+    name_changed = get_history(target, 'name').has_changes()
+    if parent_changed:
+        connection.execute(
+            text(
+                'delete from structure_closure '
+                'where descendant_id in ('
+                '  select descendant_id from structure_closure '
+                '  where ancestor_id = :id'
+                ') and ancestor_id not in ('
+                '  select descendant_id from structure_closure '
+                '  where ancestor_id = :id'
+                ')'
+            ),
+            id=target.id
+        )
+        connection.execute(
+            text(
+                'insert into structure_closure '
+                '(ancestor_id, descendant_id, depth) '
+                'select p.ancestor_id, c.descendant_id, p.depth + c.depth + 1 '
+                'from structure_closure p, structure_closure c '
+                'where p.descendant_id = :parent_id and c.ancestor_id = :id'
+            ),
+            id=target.id, parent_id=target.parent_id
+        )
+    if parent_changed or name_changed:
+        connection.execute(
+            text(
+                'update structure set name_path = ('
+                '  select array_agg(a.name order by c.depth desc) '
+                '  from structure_closure c '
+                '  join structure a on a.id = c.ancestor_id '
+                '  where c.descendant_id = structure.id'
+                ') where id in ('
+                '  select descendant_id from structure_closure '
+                '  where ancestor_id = :id and depth > 0'
+                ')'
+            ),
+            id=target.id
+        )
+
+
+event.listen(Structure, 'before_insert', name_path_event)
+event.listen(Structure, 'before_update', name_path_event)
+event.listen(Structure, 'after_insert', closure_insert_event)
+event.listen(Structure, 'after_update', closure_update_event)
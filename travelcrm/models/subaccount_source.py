@@ -0,0 +1,112 @@
+# -*-coding: utf-8-*-
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    Index,
+    event,
+    text,
+)
+from sqlalchemy.orm import relationship, backref
+
+from ..models import (
+    DBSession,
+    Base
+)
+
+
+class SubaccountSource(Base):
+    """resource the subaccount is bound to, kept by subaccounts
+    factories so lookups don't need union of all sources
+    """
+    __tablename__ = 'subaccount_source'
+    __table_args__ = (
+        Index(
+            'idx_subaccount_source_resource_id',
+            'resource_id',
+        ),
+    )
+
+    subaccount_id = Column(
+        Integer,
+        ForeignKey(
+            'subaccount.id',
+            name="fk_subaccount_id_subaccount_source",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        primary_key=True,
+    )
+    resource_id = Column(
+        Integer,
+        ForeignKey(
+            'resource.id',
+            name="fk_resource_id_subaccount_source",
+            ondelete='cascade',
+            onupdate='cascade',
+        ),
+        nullable=False,
+    )
+    resource_type_id = Column(
+        Integer,
+        ForeignKey(
+            'resource_type.id',
+            name="fk_resource_type_id_subaccount_source",
+            ondelete='restrict',
+            onupdate='cascade',
+        ),
+        nullable=False,
+    )
+    source_id = Column(
+        Integer,
+        nullable=False,
+    )
+    title = Column(
+        String,
+    )
+    subaccount = relationship(
+        'Subaccount',
+        backref=backref(
+            'source',
+            uselist=False,
+            cascade="all,delete-orphan",
+        ),
+        uselist=False,
+    )
+
+    @classmethod
+    def get(cls, subaccount_id):
+        if subaccount_id is None:
+            return None
+        return DBSession.query(cls).get(subaccount_id)
+
+    @classmethod
+    def bind(cls, subaccount, source):
+        """bind subaccount to source object of subaccounts factory
+        """
+        subaccount.source = cls(
+            resource_id=source.resource.id,
+            resource_type_id=source.resource.resource_type_id,
+            source_id=source.id,
+            title=source.name,
+        )
+        return subaccount.source
+
+
+def source_title_event(mapper, connection, target):
+    connection.execute(
+        text(
+            'update subaccount_source set title = :title '
+            'where resource_id = :resource_id '
+            'and title is distinct from :title'
+        ),
+        title=target.name, resource_id=target.resource_id
+    )
+
+
+def register_source(cls):
+    """keep titles of subaccounts bound to objects of class
+    """
+    event.listen(cls, 'after_update', source_title_event)
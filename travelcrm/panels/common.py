@@ -2,9 +2,8 @@
 
 from pyramid_layout.panel import panel_config
 
-from ..lib.utils.security_utils import get_auth_employee
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.utils.common_utils import get_company_name
-from ..lib.bl.employees import get_employee_position, get_employee_structure
 from ..lib.bl.structures import get_structure_name_path
 
 
@@ -30,12 +29,10 @@ def footer(context, request):
     renderer='travelcrm:templates/panels/common#employee_info.mako'
 )
 def employee_info(context, request):
-    employee = get_auth_employee(request)
-    position = get_employee_position(employee)
-    structure = get_employee_structure(employee)
-    path = get_structure_name_path(structure)
+    identity = get_auth_identity(request)
+    path = get_structure_name_path(identity.structure)
     return {
-        'employee': employee,
-        'position': position,
+        'employee': identity.employee,
+        'position': identity.position,
         'structure_path': path
     }
@@ -15,9 +15,8 @@ from ..lib.utils.resources_utils import (
     get_resource_settings,
     ResourceClassNotFound,
 )
-from ..lib.utils.security_utils import get_auth_employee
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.utils.common_utils import translate as _
-from ..lib.bl.employees import get_employee_permisions
 
 from ..models.resource import Resource
 
@@ -59,9 +58,9 @@ class SecuredBase(object):
 
     @staticmethod
     def get_permisions(obj, request):
-        employee = get_auth_employee(request)
-        if employee:
-            employee_permisions = get_employee_permisions(employee, obj)
+        identity = get_auth_identity(request)
+        if identity.employee:
+            employee_permisions = identity.get_permisions(obj)
             if employee_permisions:
                 return employee_permisions.permisions
 
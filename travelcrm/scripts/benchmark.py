@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from pyramid.paster import (
+    bootstrap,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+from babel.dates import (
+    format_date as fd,
+    format_datetime as fdt,
+    get_date_format as gdf,
+    get_time_format as gtf,
+    get_datetime_format as gdtf,
+)
+from babel.numbers import format_decimal as fdc
+from pytz import timezone
+from sqlalchemy import types
+from sqlalchemy.util import KeyedTuple
+
+from ..lib.utils.companies_utils import get_company_context
+from ..lib.utils.common_utils import (
+    format_date,
+    format_datetime,
+    format_decimal,
+    get_locale_name,
+    get_timezone,
+    translate as _,
+)
+from ..lib.utils.sql_utils import set_search_path
+from ..lib.qb import RowSerializer, query_row_serialize_format
+from ..lib.qb.invoices import InvoicesQueryBuilder
+from ..lib.qb.orders import OrdersQueryBuilder
+from ..lib.qb.persons import PersonsQueryBuilder
+
+
+BENCHMARKS = OrderedDict()
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> schema=<company schema> '
+          '[repeat=10] [bench=<name>]\n'
+          '(example: "%s development.ini schema=c_2")' % (cmd, cmd))
+    print('benchmarks: %s' % ', '.join(BENCHMARKS))
+    sys.exit(1)
+
+
+def benchmark(name):
+    def wrapper(func):
+        BENCHMARKS[name] = func
+        return func
+    return wrapper
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def report(name, timings):
+    print('%-50s best %.4fs avg %.4fs' % ((name,) + timings))
+
+
+@benchmark('list_count')
+def list_count_benchmark(repeat):
+    """list page with total count, separate count query vs window count
+    """
+    for qb_cls in (
+        InvoicesQueryBuilder, OrdersQueryBuilder, PersonsQueryBuilder
+    ):
+        for count_mode in ('query', 'window'):
+            def _list():
+                qb = qb_cls(None)
+                qb._count_mode = count_mode
+                qb.sort_query('id', 'desc')
+                qb.page_query(50, 1)
+                qb.get_count()
+                qb.get_serialized()
+            report(
+                '%s %s' % (qb_cls.__name__, count_mode),
+                measure(_list, repeat)
+            )
+
+
+@benchmark('qb_build')
+def qb_build_benchmark(repeat):
+    """query builder construction, full build vs cached plan
+    """
+    for qb_cls in (
+        InvoicesQueryBuilder, OrdersQueryBuilder, PersonsQueryBuilder
+    ):
+        for plan_cache in (False, True):
+            def _build():
+                qb_cls._plan_cache = plan_cache
+                qb_cls(None).get_query().statement.compile()
+            report(
+                '%s plan_cache=%s' % (qb_cls.__name__, plan_cache),
+                measure(_build, repeat)
+            )
+        del qb_cls._plan_cache
+
+
+@benchmark('serialize')
+def serialize_benchmark(repeat):
+    """serialization of 500 grid rows, row-wise vs compiled per column
+    """
+    columns = [
+        {'name': 'id', 'type': types.Integer()},
+        {'name': 'name', 'type': types.String()},
+        {'name': 'date', 'type': types.Date()},
+        {'name': 'modifydt', 'type': types.DateTime()},
+        {'name': 'price', 'type': types.Numeric()},
+        {'name': 'payments', 'type': types.Numeric()},
+    ]
+    keys = [column['name'] for column in columns]
+    rows = [
+        KeyedTuple([
+            i, u'name %d' % i, date(2015, 1, 1 + i % 28),
+            datetime(2015, 1, 1 + i % 28, i % 24, i % 60),
+            Decimal(i) / 3, Decimal(i) / 7
+        ], keys)
+        for i in range(500)
+    ]
+    report(
+        'query_row_serialize_format',
+        measure(
+            lambda: [query_row_serialize_format(row) for row in rows], repeat
+        )
+    )
+    report(
+        'RowSerializer',
+        measure(lambda: list(RowSerializer(columns).serialize(rows)), repeat)
+    )
+
+
+@benchmark('format_grid')
+def format_grid_benchmark(repeat):
+    """format grid of dates, datetimes and decimals with translated
+    header, patterns resolved per value vs cached formatter
+    """
+    values = [
+        (
+            date(2015, 1, 1 + i % 28),
+            datetime(2015, 1, 1 + i % 28, i % 24, i % 60),
+            Decimal(i) / 3
+        )
+        for i in range(500)
+    ]
+
+    def _uncached():
+        locale = get_locale_name()
+        date_format = gdf(format='short', locale=locale).pattern
+        time_format = gtf(format='short', locale=locale).pattern
+        for date_value, datetime_value, decimal_value in values:
+            _(u'Date')
+            fd(
+                date_value,
+                format=gdf(format='short', locale=locale).pattern,
+                locale=locale
+            )
+            fdt(
+                datetime_value,
+                format=gdtf(format='short', locale=locale).format(
+                    time_format, date_format
+                ),
+                locale=locale, tzinfo=timezone(get_timezone())
+            )
+            fdc(decimal_value.quantize(Decimal('.01')), locale=locale)
+
+    def _cached():
+        for date_value, datetime_value, decimal_value in values:
+            _(u'Date')
+            format_date(date_value)
+            format_datetime(datetime_value)
+            format_decimal(decimal_value)
+
+    report('format grid uncached', measure(_uncached, repeat))
+    report('format grid formatter', measure(_cached, repeat))
+
+
+def main(argv=sys.argv):
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+    options = parse_vars(argv[2:])
+    if 'schema' not in options:
+        usage(argv)
+    setup_logging(config_uri)
+    env = bootstrap(config_uri)
+    try:
+        set_search_path(options['schema'])
+        env['request'].company_context = get_company_context()
+        repeat = int(options.get('repeat', 10))
+        for name, func in BENCHMARKS.items():
+            if options.get('bench', name) == name:
+                func(repeat)
+    finally:
+        env['closer']()
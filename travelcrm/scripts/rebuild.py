@@ -0,0 +1,111 @@
+import os
+import sys
+from collections import OrderedDict
+
+import transaction
+from pyramid.paster import (
+    bootstrap,
+    setup_logging,
+)
+
+from pyramid.scripts.common import parse_vars
+
+from ..lib.bl.invoices import rebuild_invoices_totals
+from ..lib.bl.dashboard_stats import rebuild_dashboard_stats
+from ..lib.bl.subaccounts import rebuild_subaccounts_sources
+from ..lib.bl.cashflows import (
+    rebuild_balances,
+    check_balances,
+    rebuild_cashflows_rollup,
+    check_cashflows_rollup,
+)
+from ..lib.utils.sql_utils import set_search_path
+
+
+REBUILDERS = OrderedDict()
+CHECKERS = {}
+
+
+def usage(argv):
+    cmd = os.path.basename(argv[0])
+    print('usage: %s <config_uri> schema=<company schema>[,<schema>...] '
+          '[target=<name>] [check=1]\n'
+          '(example: "%s development.ini schema=c_2")' % (cmd, cmd))
+    print('targets: %s' % ', '.join(REBUILDERS))
+    sys.exit(1)
+
+
+def rebuilder(name, checker=None):
+    def wrapper(func):
+        REBUILDERS[name] = func
+        if checker:
+            CHECKERS[name] = checker
+        return func
+    return wrapper
+
+
+@rebuilder('invoices_totals')
+def invoices_totals_rebuilder():
+    """stored invoices final price, vat, payments, debt and payments percent
+    """
+    rebuild_invoices_totals()
+
+
+@rebuilder('balances', checker=check_balances)
+def balances_rebuilder():
+    """accounts and subaccounts running balances and monthly snapshots
+    """
+    rebuild_balances()
+
+
+@rebuilder('cashflows_rollup', checker=check_cashflows_rollup)
+def cashflows_rollup_rebuilder():
+    """daily revenue and expenses of accounts by account items
+    """
+    rebuild_cashflows_rollup()
+
+
+@rebuilder('dashboard_stats')
+def dashboard_stats_rebuilder():
+    """daily orders, leads and countries counters of dashboard portlets
+    """
+    rebuild_dashboard_stats()
+
+
+@rebuilder('subaccounts_sources')
+def subaccounts_sources_rebuilder():
+    """resources subaccounts are bound to
+    """
+    rebuild_subaccounts_sources()
+
+
+def main(argv=sys.argv):
+    if len(argv) < 2:
+        usage(argv)
+    config_uri = argv[1]
+    options = parse_vars(argv[2:])
+    if 'schema' not in options:
+        usage(argv)
+    target = options.get('target')
+    check = options.get('check')
+    if target is not None and target not in REBUILDERS:
+        usage(argv)
+    setup_logging(config_uri)
+    env = bootstrap(config_uri)
+    try:
+        for schema in options['schema'].split(','):
+            with transaction.manager:
+                set_search_path(schema)
+                for name, func in REBUILDERS.items():
+                    if target not in (None, name):
+                        continue
+                    if not check:
+                        print('%s: rebuild %s' % (schema, name))
+                        func()
+                    elif name in CHECKERS:
+                        for mismatch in CHECKERS[name]():
+                            print('%s: %s mismatch %s' % (
+                                schema, name, mismatch
+                            ))
+    finally:
+        env['closer']()
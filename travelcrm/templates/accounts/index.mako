@@ -18,7 +18,7 @@
     <table class="easyui-datagrid"
         id="${_id}"
         data-options="
-            url:'${request.resource_url(_context, 'list')}',border:false,
+            url:'${request.resource_url(_context, 'list', query={'with_balance': 1})}',border:false,
             pagination:true,fit:true,pageSize:50,singleSelect:true,
             rownumbers:true,sortName:'id',sortOrder:'desc',
             pageList:[50,100,500],idField:'_id',checkOnSelect:false,
@@ -38,6 +38,7 @@
             <th data-options="field:'name',sortable:true,width:200">${_(u"name")}</th>
             <th data-options="field:'account_type',sortable:true,width:100,formatter:function(value){return value.title;}">${_(u"account type")}</th>
             <th data-options="field:'currency',sortable:true,width:80">${_(u"currency")}</th>
+            <th data-options="field:'balance',sortable:true,width:100">${_(u"balance")}</th>
             <th data-options="field:'status',sortable:false,width:60,formatter:function(value, row){return status_formatter(value);}">${_(u"status")}</th>
             <th data-options="field:'subscriber',sortable:false,width:20,styler:datagrid_resource_cell_styler,formatter:subscriber_cell_formatter"><span class="fa fa-thumb-tack"></span></th>
             <th data-options="field:'modifydt',sortable:true,width:120,styler:datagrid_resource_cell_styler"><strong>${_(u"updated")}</strong></th>
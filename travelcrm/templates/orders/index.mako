@@ -54,6 +54,7 @@
             <th data-options="field:'deal_date',sortable:true,width:80">${_(u"deal date")}</th>
             <th data-options="field:'customer',sortable:true,width:200">${_(u"customer")}</th>
             <th data-options="field:'advsource',sortable:true,width:180">${_(u"advertise")}</th>
+            <th data-options="field:'final_price',sortable:false,width:80">${_(u"price")} ${h.common.get_base_currency()}</th>
             <th data-options="field:'status',sortable:false,width:60,formatter:function(value, row){return status_formatter(value);}">${_(u"status")}</th>
             <th data-options="field:'subscriber',sortable:false,width:20,styler:datagrid_resource_cell_styler,formatter:subscriber_cell_formatter"><span class="fa fa-thumb-tack"></span></th>
             <th data-options="field:'modifydt',sortable:true,width:120,styler:datagrid_resource_cell_styler"><strong>${_(u"updated")}</strong></th>
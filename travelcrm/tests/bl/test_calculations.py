@@ -0,0 +1,59 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+
+from mock import MagicMock, patch
+
+from ...tests import BaseTestCase
+from ...lib.bl.calculations import get_contracts_commissions
+
+
+class StubRulesIndex(object):
+
+    def __init__(self, contracts, commissions):
+        self.contracts = contracts
+        self.commissions = commissions
+
+    def get_contract_id(self, supplier_id, service_id, date):
+        return self.contracts.get((supplier_id, service_id))
+
+    def get_commission_id(self, contract_id, service_id):
+        return self.commissions.get((contract_id, service_id))
+
+
+class TestGetContractsCommissions(BaseTestCase):
+
+    def setUp(self):
+        patcher = patch('travelcrm.lib.bl.calculations.get_rules_index')
+        self.addCleanup(patcher.stop)
+        self.get_rules_index = patcher.start()
+        patcher = patch('travelcrm.lib.bl.calculations.DBSession')
+        self.addCleanup(patcher.stop)
+        self.query = patcher.start().query
+
+    def test_no_contracts(self):
+        self.get_rules_index.return_value = StubRulesIndex({}, {})
+        self.assertEqual(
+            {}, get_contracts_commissions([(1, 2)], date(2015, 1, 5))
+        )
+        self.assertFalse(self.query.called)
+
+    def test_commissions_loaded_once(self):
+        self.get_rules_index.return_value = StubRulesIndex(
+            {(1, 2): 100, (1, 3): 100, (5, 2): 101},
+            {(100, 2): 7, (100, 3): 8, (101, 2): 9},
+        )
+        commissions = dict((id, MagicMock(id=id)) for id in (7, 8, 9))
+        self.query.return_value.filter.return_value = commissions.values()
+        terms = get_contracts_commissions(
+            [(1, 2), (1, 3), (5, 2), (6, 2)], date(2015, 1, 5)
+        )
+        self.assertEqual(
+            {
+                (1, 2): (100, commissions[7]),
+                (1, 3): (100, commissions[8]),
+                (5, 2): (101, commissions[9]),
+            },
+            terms
+        )
+        self.assertEqual(1, self.query.call_count)
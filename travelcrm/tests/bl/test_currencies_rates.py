@@ -0,0 +1,58 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+from decimal import Decimal
+
+from mock import patch
+
+from ...tests import BaseTestCase
+from ...lib.utils.cache_utils import EffectiveDatedIndex
+from ...lib.bl.currencies_rates import currency_exchange_many
+
+
+class TestCurrencyExchangeMany(BaseTestCase):
+
+    def setUp(self):
+        patcher = patch(
+            'travelcrm.lib.bl.currencies_rates.currencies_rates_indexes'
+        )
+        self.addCleanup(patcher.stop)
+        _indexes = patcher.start()
+        _indexes.get.return_value = EffectiveDatedIndex([
+            ((1, None), date(2015, 1, 1), Decimal('2')),
+            ((2, None), date(2015, 1, 1), Decimal('4')),
+            ((2, None), date(2015, 2, 1), Decimal('5')),
+            ((2, 7), date(2015, 1, 1), Decimal('3')),
+        ])
+
+    def test_same_currency(self):
+        self.assertEqual(
+            [Decimal('10')],
+            currency_exchange_many(
+                [Decimal('10')], [2], 2, [None], [date(2015, 1, 5)]
+            )
+        )
+
+    def test_base_currency(self):
+        self.assertEqual(
+            [Decimal('40'), Decimal('50'), Decimal('30'), Decimal('10')],
+            currency_exchange_many(
+                [Decimal('10')] * 4,
+                [2, 2, 2, 3],
+                None,
+                [None, None, 7, None],
+                [date(2015, 1, 5), date(2015, 2, 5)] * 2
+            )
+        )
+
+    def test_cross_currency(self):
+        self.assertEqual(
+            [Decimal('20'), Decimal('25')],
+            currency_exchange_many(
+                [Decimal('10')] * 2,
+                [2, 2],
+                1,
+                [None, None],
+                [date(2015, 1, 5), date(2015, 2, 5)]
+            )
+        )
@@ -0,0 +1,127 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+
+import transaction
+from mock import MagicMock, patch
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ...tests import BaseTestCase
+from ...models.order import Order
+from ...models.lead import Lead
+from ...models.appointment import Appointment
+from ...models.position import Position
+from ...models.resource import Resource
+from ...lib.bl.dashboard_stats import (
+    schedule_dashboard_stats_refresh,
+    schedule_employees_stats_refresh,
+    stats_object_event,
+    stats_maintainer_event,
+    stats_appointment_event,
+    stats_position_event,
+)
+
+
+def _committed(obj, **values):
+    for name, value in values.items():
+        set_committed_value(obj, name, value)
+    return obj
+
+
+class DashboardStatsTestCase(BaseTestCase):
+
+    def setUp(self):
+        patcher = patch('travelcrm.lib.bl.dashboard_stats.DBSession')
+        self.addCleanup(patcher.stop)
+        self.session = patcher.start()
+        self.session.return_value = MagicMock(info={})
+        self.addCleanup(transaction.abort)
+        self.connection = MagicMock()
+        self.connection.execute.return_value = [(date(2015, 3, 1),)]
+
+    def scheduled(self):
+        scheduled = self.session.return_value.info.get('dashboard_stats')
+        return scheduled[1] if scheduled else {}
+
+
+class TestSchedule(DashboardStatsTestCase):
+
+    @patch('travelcrm.lib.bl.dashboard_stats.refresh_dashboard_stats')
+    def test_refreshed_before_commit(self, _refresh):
+        schedule_dashboard_stats_refresh('orders', [date(2015, 1, 1)])
+        schedule_dashboard_stats_refresh(
+            'orders', [date(2015, 1, 2), None]
+        )
+        schedule_dashboard_stats_refresh('leads', [date(2015, 1, 1)])
+        self.assertFalse(_refresh.called)
+        transaction.commit()
+        self.assertEqual(2, _refresh.call_count)
+        _refresh.assert_any_call(
+            'orders', set([date(2015, 1, 1), date(2015, 1, 2)])
+        )
+        _refresh.assert_any_call('leads', set([date(2015, 1, 1)]))
+
+    @patch('travelcrm.lib.bl.dashboard_stats.refresh_dashboard_stats')
+    def test_not_refreshed_on_abort(self, _refresh):
+        schedule_dashboard_stats_refresh('orders', [date(2015, 1, 1)])
+        transaction.abort()
+        transaction.commit()
+        self.assertFalse(_refresh.called)
+
+
+class TestEvents(DashboardStatsTestCase):
+
+    def test_order_dates(self):
+        order = _committed(Order(), deal_date=date(2015, 1, 1))
+        order.deal_date = date(2015, 2, 1)
+        stats_object_event(None, self.connection, order)
+        dates = set([date(2015, 1, 1), date(2015, 2, 1)])
+        self.assertEqual(
+            {'orders': dates, 'countries': dates}, self.scheduled()
+        )
+
+    def test_lead_dates(self):
+        lead = _committed(Lead(), lead_date=date(2015, 1, 1))
+        stats_object_event(None, self.connection, lead)
+        self.assertEqual(
+            {'leads': set([date(2015, 1, 1)])}, self.scheduled()
+        )
+
+    def test_maintainer(self):
+        resource = Resource.__new__(Resource)
+        Resource._sa_class_manager.setup_instance(resource)
+        _committed(resource, id=5, maintainer_id=1)
+        stats_maintainer_event(None, self.connection, resource)
+        self.assertFalse(self.connection.execute.called)
+        resource.maintainer_id = 2
+        stats_maintainer_event(None, self.connection, resource)
+        # dates of orders and leads of the resource
+        self.assertEqual(2, self.connection.execute.call_count)
+        dates = set([date(2015, 3, 1)])
+        self.assertEqual(
+            {'orders': dates, 'countries': dates, 'leads': dates},
+            self.scheduled()
+        )
+
+    def test_appointment(self):
+        appointment = _committed(Appointment(), employee_id=1)
+        appointment.employee_id = 2
+        stats_appointment_event(None, self.connection, appointment)
+        self.assertEqual(2, self.connection.execute.call_count)
+        self.assertEqual(set([date(2015, 3, 1)]), self.scheduled()['leads'])
+
+    def test_position(self):
+        position = _committed(Position(), id=7, structure_id=1)
+        stats_position_event(None, self.connection, position)
+        self.assertFalse(self.connection.execute.called)
+        position.structure_id = 2
+        stats_position_event(None, self.connection, position)
+        self.assertEqual(2, self.connection.execute.call_count)
+
+    def test_employees(self):
+        self.session.connection.return_value = self.connection
+        schedule_employees_stats_refresh([1])
+        self.assertEqual(2, self.connection.execute.call_count)
+        self.assertEqual(
+            set([date(2015, 3, 1)]), self.scheduled()['orders']
+        )
@@ -0,0 +1,71 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+from decimal import Decimal
+
+from mock import MagicMock, patch
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ...tests import BaseTestCase
+from ...models.income import Income
+from ...lib.bl.incomes import make_payment
+
+
+class TestMakePayment(BaseTestCase):
+
+    def setUp(self):
+        for name in (
+            'get_subaccount_by_source_resource_id', 'get_company_subaccount',
+        ):
+            patcher = patch('travelcrm.lib.bl.incomes.%s' % name)
+            self.addCleanup(patcher.stop)
+            patcher.start()
+        patcher = patch(
+            'travelcrm.lib.bl.incomes.Cashflow', side_effect=lambda **kw: kw
+        )
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        patcher = patch('travelcrm.lib.bl.incomes.Invoice')
+        self.addCleanup(patcher.stop)
+        # final price 100 is paid by other income 50 and edited income 50
+        self.invoice = patcher.start().get.return_value = MagicMock(
+            id=1, debt=Decimal('0'), vat=None
+        )
+
+    def income(self, **values):
+        income = Income()
+        for name, value in values.items():
+            set_committed_value(income, name, value)
+        return income
+
+    def test_new(self):
+        self.invoice.debt = Decimal('50')
+        income = Income(
+            invoice_id=1, sum=Decimal('80'), date=date(2015, 1, 5)
+        )
+        cashflows = make_payment(None, income)
+        self.assertEqual(Decimal('50'), cashflows[1]['sum'])
+
+    def test_edit(self):
+        income = self.income(
+            id=2, invoice_id=1, sum=Decimal('50'), date=date(2015, 1, 5)
+        )
+        income.sum = Decimal('80')
+        cashflows = make_payment(None, income)
+        self.assertEqual(Decimal('80'), cashflows[0]['sum'])
+        self.assertEqual(Decimal('50'), cashflows[1]['sum'])
+
+    def test_edit_moved_to_other_invoice(self):
+        self.invoice.debt = Decimal('20')
+        income = self.income(
+            id=2, invoice_id=3, sum=Decimal('50'), date=date(2015, 1, 5)
+        )
+        income.invoice_id = 1
+        cashflows = make_payment(None, income)
+        self.assertEqual(Decimal('20'), cashflows[1]['sum'])
+
+    def test_paid(self):
+        income = Income(
+            invoice_id=1, sum=Decimal('80'), date=date(2015, 1, 5)
+        )
+        self.assertEqual(1, len(make_payment(None, income)))
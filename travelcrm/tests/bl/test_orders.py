@@ -0,0 +1,76 @@
+#-*-coding: utf-8-*-
+
+from collections import namedtuple
+from datetime import date
+
+from mock import patch
+
+from ...tests import BaseTestCase
+from ...lib.bl.orders import OrderItemPrice, get_orders_prices
+
+
+Row = namedtuple(
+    'Row',
+    [
+        'id', 'order_id', 'currency_id', 'supplier_id',
+        'price', 'discount', 'deal_date',
+    ]
+)
+
+
+def _exchange(amounts, currencies_ids, currency_id, suppliers_ids, dates):
+    # every item currency costs twice as target one
+    return [amount * 2 for amount in amounts]
+
+
+class TestGetOrdersPrices(BaseTestCase):
+
+    def setUp(self):
+        patcher = patch('travelcrm.lib.bl.orders.DBSession')
+        self.addCleanup(patcher.stop)
+        self.query = patcher.start().query.return_value
+        patcher = patch(
+            'travelcrm.lib.bl.orders.currency_exchange_many',
+            side_effect=_exchange
+        )
+        self.addCleanup(patcher.stop)
+        self.exchange = patcher.start()
+
+    def set_rows(self, rows):
+        (
+            self.query.join.return_value.filter.return_value
+            .order_by.return_value.all.return_value
+        ) = rows
+
+    def test_empty(self):
+        self.assertEqual({}, get_orders_prices([]))
+        self.assertFalse(self.query.called)
+
+    def test_aggregation(self):
+        deal_date = date(2015, 1, 5)
+        self.set_rows([
+            Row(1, 10, 2, 5, 100, 10, deal_date),
+            Row(2, 10, 2, 5, 50, 0, deal_date),
+            Row(3, 11, 3, 6, 20, 5, deal_date),
+        ])
+        prices = get_orders_prices([10, 11, 12], currency_id=1)
+        self.assertEqual((300, 20, 280), prices[10][1:4])
+        self.assertEqual(
+            [
+                OrderItemPrice(1, 200, 20, 180),
+                OrderItemPrice(2, 100, 0, 100),
+            ],
+            prices[10].items
+        )
+        self.assertEqual((40, 10, 30), prices[11][1:4])
+        self.assertEqual((0, 0, 0, []), prices[12][1:])
+        self.exchange.assert_any_call(
+            [100, 50, 20], [2, 2, 3], 1, [5, 5, 6], [deal_date] * 3
+        )
+
+    def test_date(self):
+        self.set_rows([Row(1, 10, 2, 5, 100, 10, date(2015, 1, 5))])
+        get_orders_prices([10], date=date(2015, 2, 1))
+        self.exchange.assert_any_call(
+            [100], [2], None, [5], [date(2015, 2, 1)]
+        )
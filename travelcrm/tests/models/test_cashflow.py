@@ -0,0 +1,105 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+from decimal import Decimal
+
+from mock import MagicMock, patch
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ...tests import BaseTestCase
+from ...models import RoutingSession
+from ...models.cashflow import (
+    Cashflow,
+    CashflowChange,
+    _cashflow_change,
+    cashflow_update_event,
+    cashflow_delete_event,
+    subaccount_account_event,
+)
+from ...models.subaccount import Subaccount
+
+
+def _committed(obj, **values):
+    for name, value in values.items():
+        set_committed_value(obj, name, value)
+    return obj
+
+
+class TestCashflowChanges(BaseTestCase):
+
+    def setUp(self):
+        self.session = Session()
+        self.cashflow = _committed(
+            Cashflow(),
+            id=1,
+            date=date(2015, 1, 5),
+            sum=Decimal('100'),
+            subaccount_from_id=1,
+            subaccount_to_id=2,
+            account_item_id=3,
+        )
+        self.session.add(self.cashflow)
+
+    def changes(self):
+        return self.session.info.get('cashflows_changes', [])
+
+    def test_change(self):
+        self.cashflow.sum = Decimal('80')
+        self.assertEqual(
+            CashflowChange(date(2015, 1, 5), Decimal('80'), 1, 2, 3),
+            _cashflow_change(self.cashflow, 1)
+        )
+        self.assertEqual(
+            CashflowChange(date(2015, 1, 5), Decimal('-100'), 1, 2, 3),
+            _cashflow_change(self.cashflow, -1, committed=True)
+        )
+
+    def test_update(self):
+        self.cashflow.subaccount_to_id = 4
+        self.cashflow.date = date(2015, 2, 1)
+        cashflow_update_event(None, None, self.cashflow)
+        self.assertEqual(
+            [
+                CashflowChange(date(2015, 1, 5), Decimal('-100'), 1, 2, 3),
+                CashflowChange(date(2015, 2, 1), Decimal('100'), 1, 4, 3),
+            ],
+            self.changes()
+        )
+
+    def test_update_unchanged(self):
+        cashflow_update_event(None, None, self.cashflow)
+        self.assertEqual([], self.changes())
+
+    def test_delete(self):
+        cashflow_delete_event(None, None, self.cashflow)
+        self.assertEqual(
+            [CashflowChange(date(2015, 1, 5), Decimal('-100'), 1, 2, 3)],
+            self.changes()
+        )
+
+
+class TestDiscardCashflowsChanges(BaseTestCase):
+
+    def test_rollback(self):
+        session = RoutingSession()
+        session.info['cashflows_changes'] = [
+            CashflowChange(date(2015, 1, 5), Decimal('100'), None, 1, None)
+        ]
+        session.rollback()
+        self.assertNotIn('cashflows_changes', session.info)
+
+
+class TestSubaccountAccountEvent(BaseTestCase):
+
+    def test_moved(self):
+        handler = MagicMock()
+        subaccount = _committed(Subaccount(), id=5, account_id=1)
+        with patch(
+            'travelcrm.models.cashflow.subaccounts_moves_handlers', [handler]
+        ):
+            subaccount_account_event(None, 'connection', subaccount)
+            self.assertFalse(handler.called)
+            subaccount.account_id = 2
+            subaccount_account_event(None, 'connection', subaccount)
+        handler.assert_called_once_with('connection', 5, 1, 2)
@@ -0,0 +1,70 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+
+from mock import MagicMock
+
+from ...tests import BaseTestCase
+from ...models.cashflow import CashflowChange
+from ...models.cashflow_rollup import apply_rollup_changes
+
+
+class TestApplyRollupChanges(BaseTestCase):
+
+    def deltas(self, changes, accounts):
+        connection = MagicMock()
+        apply_rollup_changes(connection, changes, accounts)
+        return dict(
+            (
+                (kwargs['date'], kwargs['account_id'],
+                 kwargs['account_item_id']),
+                (kwargs['revenue'], kwargs['expenses'])
+            )
+            for _, kwargs in connection.execute.call_args_list
+        )
+
+    def test_deltas(self):
+        day = date(2015, 1, 5)
+        self.assertEqual(
+            {
+                (day, 10, 3): (100, 0),
+                (day, 20, 3): (30, 100),
+                (day, 20, 4): (0, 5),
+            },
+            self.deltas(
+                [
+                    CashflowChange(day, 100, 2, 1, 3),
+                    CashflowChange(day, 30, None, 2, 3),
+                    CashflowChange(day, 5, 2, None, 4),
+                    CashflowChange(day, 7, None, 1, None),
+                ],
+                {1: 10, 2: 20}
+            )
+        )
+
+    def test_update_in_place(self):
+        # update of cashflow sum is removal of old and adding of new
+        day = date(2015, 1, 5)
+        self.assertEqual(
+            {(day, 10, 3): (-20, 0)},
+            self.deltas(
+                [
+                    CashflowChange(day, -100, None, 1, 3),
+                    CashflowChange(day, 80, None, 1, 3),
+                ],
+                {1: 10}
+            )
+        )
+
+    def test_zero_deltas_skipped(self):
+        day = date(2015, 1, 5)
+        self.assertEqual(
+            {},
+            self.deltas(
+                [
+                    CashflowChange(day, -100, None, 1, 3),
+                    CashflowChange(day, 100, None, 1, 3),
+                ],
+                {1: 10}
+            )
+        )
@@ -0,0 +1,47 @@
+#-*-coding: utf-8-*-
+
+from mock import MagicMock, patch
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ...tests import BaseTestCase
+from ...models import RoutingSession
+from ...models.income import Income
+from ...models.invoice_item import InvoiceItem
+from ...models.invoice import (
+    invoice_totals_event,
+    refresh_flushed_invoices_totals,
+)
+
+
+class TestInvoiceTotalsEvent(BaseTestCase):
+
+    def test_collected(self):
+        session = Session()
+        income = Income()
+        set_committed_value(income, 'invoice_id', 1)
+        income.invoice_id = 2
+        item = InvoiceItem(invoice_id=3)
+        session.add_all([income, item])
+        invoice_totals_event(None, None, income)
+        invoice_totals_event(None, None, item)
+        self.assertEqual(
+            set([1, 2, 3]), session.info['invoices_totals']
+        )
+
+    @patch('travelcrm.models.invoice.refresh_invoices_totals')
+    def test_refreshed_once_per_flush(self, _refresh):
+        session = MagicMock(info={'invoices_totals': set([1, 2])})
+        session.identity_map.get.return_value = None
+        refresh_flushed_invoices_totals(session, None)
+        _refresh.assert_called_once_with(
+            session.connection.return_value, set([1, 2])
+        )
+        refresh_flushed_invoices_totals(session, None)
+        self.assertEqual(1, _refresh.call_count)
+
+    def test_discarded_on_rollback(self):
+        session = RoutingSession()
+        session.info['invoices_totals'] = set([1])
+        session.rollback()
+        self.assertNotIn('invoices_totals', session.info)
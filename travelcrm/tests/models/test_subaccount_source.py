@@ -0,0 +1,50 @@
+#-*-coding: utf-8-*-
+
+from mock import MagicMock, patch
+
+from ...tests import BaseTestCase
+from ...models.subaccount import Subaccount
+from ...models.subaccount_source import (
+    SubaccountSource,
+    register_source,
+    source_title_event,
+)
+
+
+class TestSubaccountSource(BaseTestCase):
+
+    def test_bind(self):
+        subaccount = Subaccount()
+        source = MagicMock(id=3)
+        source.name = u'Person'
+        source.resource.id = 10
+        source.resource.resource_type_id = 2
+        subaccount_source = SubaccountSource.bind(subaccount, source)
+        self.assertIs(subaccount_source, subaccount.source)
+        self.assertEqual(
+            (10, 2, 3, u'Person'),
+            (
+                subaccount_source.resource_id,
+                subaccount_source.resource_type_id,
+                subaccount_source.source_id,
+                subaccount_source.title,
+            )
+        )
+
+    def test_title_event(self):
+        connection = MagicMock()
+        source = MagicMock(resource_id=10)
+        source.name = u'Renamed'
+        source_title_event(None, connection, source)
+        _, kwargs = connection.execute.call_args
+        self.assertEqual(
+            {'title': u'Renamed', 'resource_id': 10}, kwargs
+        )
+
+    @patch('travelcrm.models.subaccount_source.event')
+    def test_register_source(self, _event):
+        cls = object()
+        register_source(cls)
+        _event.listen.assert_called_once_with(
+            cls, 'after_update', source_title_event
+        )
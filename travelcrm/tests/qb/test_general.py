@@ -0,0 +1,163 @@
+#-*-coding: utf-8-*-
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from mock import patch
+from sqlalchemy import Column, Integer, String, create_engine, event, types
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.util import KeyedTuple
+
+from ...tests import BaseTestCase
+from ...lib.qb import (
+    FieldsPlan,
+    GeneralQueryBuilder,
+    RowSerializer,
+    query_builders_plans,
+    query_row_serialize_format,
+)
+
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'item'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class ItemsQueryBuilder(GeneralQueryBuilder):
+
+    def __init__(self, session, count_mode):
+        self._count_mode = count_mode
+        self._fields = {
+            'id': Item.id,
+            'name': Item.name,
+        }
+        self.query = session.query(Item)
+        self.build_query()
+
+
+class TestGeneralQueryBuilder(BaseTestCase):
+
+    def setUp(self):
+        super(TestGeneralQueryBuilder, self).setUp()
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add_all(
+            [Item(id=i, name='item%d' % i) for i in range(1, 26)]
+        )
+        self.session.commit()
+        self.statements = []
+        event.listen(
+            self.engine, 'before_cursor_execute',
+            lambda *args: self.statements.append(args[2])
+        )
+
+    def _qb(self, count_mode, page):
+        qb = ItemsQueryBuilder(self.session, count_mode)
+        qb.sort_query('id', 'asc')
+        qb.page_query(10, page)
+        return qb
+
+    def test_window_count_single_query(self):
+        qb = self._qb('window', 2)
+        self.assertEqual(25, qb.get_count())
+        rows = qb.get_serialized()
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual(self._qb('query', 2).get_serialized(), rows)
+        self.assertEqual({'id': 11, 'name': 'item11'}, rows[0])
+
+    def test_window_count_out_of_range(self):
+        qb = self._qb('window', 4)
+        self.assertEqual(25, qb.get_count())
+        self.assertEqual([], qb.get_serialized())
+
+    def test_seek_pages(self):
+        for item in self.session.query(Item).filter(Item.id > 20):
+            item.name = 'item20'
+        self.session.commit()
+        ids, cursor = [], None
+        for _ in range(3):
+            qb = ItemsQueryBuilder(self.session, 'window')
+            qb.seek_query('name', 'desc', 10, cursor)
+            self.assertEqual(25, qb.get_count())
+            ids.extend(row['id'] for row in qb.get_serialized())
+            cursor = qb.get_cursor()
+        expected = (
+            self.session.query(Item.id)
+            .order_by(Item.name.desc(), Item.id.desc())
+        )
+        self.assertEqual([row.id for row in expected], ids)
+
+
+class TestQueryBuildersPlans(BaseTestCase):
+
+    def setUp(self):
+        super(TestQueryBuildersPlans, self).setUp()
+        query_builders_plans.clear()
+        self.patcher = patch(
+            'travelcrm.lib.utils.cache_utils.get_search_path_schema',
+            return_value='c1'
+        )
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        query_builders_plans.clear()
+        super(TestQueryBuildersPlans, self).tearDown()
+
+    def test_fields_plan_immutable(self):
+        plan = FieldsPlan({'id': Item.id})
+        with self.assertRaises(TypeError):
+            plan['name'] = Item.name
+        self.assertEqual(['id', 'name'], sorted(plan.merge({'name': 1})))
+        self.assertEqual(['id'], list(plan))
+
+    def test_plan_reused(self):
+        from ...lib.qb.orders import OrdersQueryBuilder
+        qb = OrdersQueryBuilder(None)
+        with patch.object(OrdersQueryBuilder, 'build_query') as _build_query:
+            planned = OrdersQueryBuilder(None)
+            self.assertFalse(_build_query.called)
+        self.assertEqual(str(qb.query), str(planned.query))
+        planned.update_fields({'name': Item.name})
+        self.assertNotIn('name', qb.get_fields())
+        self.assertNotIn('name', GeneralQueryBuilder._fields)
+
+
+class TestRowSerializer(BaseTestCase):
+
+    @patch(
+        'travelcrm.lib.utils.common_utils.get_timezone', return_value='UTC'
+    )
+    @patch(
+        'travelcrm.lib.utils.common_utils.get_locale_name', return_value='en'
+    )
+    def test_same_as_row_format(self, _get_locale_name, _get_timezone):
+        columns = [
+            {'name': 'id', 'type': types.Integer()},
+            {'name': 'date', 'type': types.Date()},
+            {'name': 'modifydt', 'type': types.DateTime()},
+            {'name': 'sum', 'type': types.Numeric()},
+            {'name': 'state', 'type': types.NullType()},
+            {'name': 'title', 'type': types.String()},
+        ]
+        keys = [column['name'] for column in columns]
+        rows = [
+            KeyedTuple(
+                [1, date(2015, 1, 2), datetime(2015, 1, 2, 10, 30),
+                 Decimal('10.5'), 'open', 'first'],
+                keys
+            ),
+            KeyedTuple([2, None, None, None, None, None], keys),
+        ]
+        serializers = {'title': lambda value, row: row.id}
+        self.assertEqual(
+            [query_row_serialize_format(row, serializers) for row in rows],
+            list(RowSerializer(columns, serializers).serialize(rows))
+        )
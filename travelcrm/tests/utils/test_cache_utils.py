@@ -0,0 +1,100 @@
+#-*-coding: utf-8-*-
+
+from datetime import date
+
+import transaction
+from mock import MagicMock, patch
+
+from ...tests import BaseTestCase
+from ...lib.utils.cache_utils import SchemaCache, EffectiveDatedIndex
+
+
+class TestSchemaCache(BaseTestCase):
+
+    def test_loaded_once_per_schema(self):
+        loader = MagicMock(side_effect=lambda: object())
+        cache = SchemaCache(loader)
+        value = cache.get('c1')
+        self.assertIs(value, cache.get('c1'))
+        self.assertIsNot(value, cache.get('c2'))
+        self.assertEqual(2, loader.call_count)
+
+    def test_invalidate(self):
+        loader = MagicMock(side_effect=lambda: object())
+        cache = SchemaCache(loader)
+        c1, c2 = cache.get('c1'), cache.get('c2')
+        cache.invalidate('c1')
+        self.assertIsNot(c1, cache.get('c1'))
+        self.assertIs(c2, cache.get('c2'))
+        cache.clear()
+        self.assertIsNot(c2, cache.get('c2'))
+
+    @patch('travelcrm.lib.utils.cache_utils.time')
+    def test_ttl(self, _time):
+        _time.time.return_value = 100
+        cache = SchemaCache(lambda: object(), ttl=10)
+        value = cache.get('c1')
+        _time.time.return_value = 105
+        self.assertIs(value, cache.get('c1'))
+        _time.time.return_value = 111
+        self.assertIsNot(value, cache.get('c1'))
+
+    def test_invalidated_while_loading(self):
+        def loader():
+            cache.invalidate('c1')
+            return object()
+        cache = SchemaCache(loader)
+        self.assertIsNot(cache.get('c1'), cache.get('c1'))
+
+    @patch('travelcrm.lib.utils.cache_utils.CacheVersion')
+    def test_version(self, _version):
+        _version.get_version.return_value = 1
+        cache = SchemaCache(lambda: object(), name='test')
+        value = cache.get('c1')
+        _version.get_version.return_value = 2
+        # version is checked once per transaction
+        self.assertIs(value, cache.get('c1'))
+        transaction.abort()
+        self.assertIsNot(value, cache.get('c1'))
+        self.assertEqual(2, _version.get_version.call_count)
+        transaction.abort()
+
+    @patch('travelcrm.lib.utils.cache_utils.CacheVersion')
+    def test_changed(self, _version):
+        cache = SchemaCache(lambda: object(), name='test')
+        connection = MagicMock()
+        cache.changed(connection, 'c1')
+        cache.changed(connection, 'c1')
+        _version.bump.assert_called_once_with(connection, 'test')
+        transaction.abort()
+
+    @patch('travelcrm.lib.utils.cache_utils.CacheVersion')
+    def test_not_cached_when_changed(self, _version):
+        _version.get_version.return_value = 1
+        cache = SchemaCache(lambda: object(), name='test')
+        value = cache.get('c1')
+        cache.changed(MagicMock(), 'c1')
+        uncommitted = cache.get('c1')
+        self.assertIsNot(value, uncommitted)
+        self.assertIsNot(uncommitted, cache.get('c1'))
+        transaction.abort()
+        self.assertIs(value, cache.get('c1'))
+        transaction.abort()
+
+
+class TestEffectiveDatedIndex(BaseTestCase):
+
+    def test_as_of_date(self):
+        index = EffectiveDatedIndex([
+            ('a', date(2015, 1, 1), 1),
+            ('b', date(2015, 1, 1), 10),
+            ('a', date(2015, 2, 1), 2),
+            ('a', date(2015, 2, 1), 3),
+        ])
+        self.assertIsNone(index.get('a', date(2014, 12, 31)))
+        self.assertEqual(0, index.get('a', date(2014, 12, 31), default=0))
+        self.assertEqual(1, index.get('a', date(2015, 1, 31)))
+        # the last of values with the same date wins
+        self.assertEqual(3, index.get('a', date(2015, 2, 1)))
+        self.assertEqual(10, index.get('b', date(2016, 1, 1)))
+        self.assertIsNone(index.get('c', date(2016, 1, 1)))
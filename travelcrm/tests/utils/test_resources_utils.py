@@ -0,0 +1,70 @@
+#-*-coding: utf-8-*-
+
+from mock import MagicMock, patch
+
+from ...tests import BaseTestCase
+from ...interfaces import IPortlet, ISubaccountFactory
+from ...lib.utils.resources_utils import (
+    ResourcesTypesRegistry,
+    get_resource_class_interfaces,
+)
+
+
+def _resource_type(id, name, resource):
+    rt = MagicMock()
+    rt.id = id
+    rt.name = name
+    rt.module, rt.resource = resource.rsplit('.', 1)
+    return rt
+
+
+class TestResourcesTypesRegistry(BaseTestCase):
+
+    def setUp(self):
+        super(TestResourcesTypesRegistry, self).setUp()
+        self.registry = ResourcesTypesRegistry([
+            _resource_type(
+                1, 'persons', 'travelcrm.resources.persons.PersonsResource'
+            ),
+            _resource_type(
+                2, 'orders_stats',
+                'travelcrm.resources.orders_stats.OrdersStatsResource'
+            ),
+            _resource_type(
+                3, 'broken', 'travelcrm.resources.persons.NotExists'
+            ),
+        ])
+
+    def test_lookups(self):
+        from ...resources.persons import PersonsResource
+        self.assertEqual(1, self.registry.by_name('persons').id)
+        self.assertEqual(
+            2,
+            self.registry.by_resource_name(
+                'travelcrm.resources.orders_stats', 'OrdersStatsResource'
+            ).id
+        )
+        self.assertIsNone(self.registry.by_name('unknown'))
+        self.assertIs(PersonsResource, self.registry.get_class('persons'))
+
+    def test_by_interface(self):
+        self.assertEqual(
+            ['orders_stats'],
+            [rt.name for rt in self.registry.by_interface(IPortlet)]
+        )
+        self.assertEqual(
+            ['persons'],
+            [rt.name for rt in self.registry.by_interface(ISubaccountFactory)]
+        )
+
+    def test_by_interface_indexed(self):
+        from ...resources.persons import PersonsResource
+        from ...resources.orders_stats import OrdersStatsResource
+        get_resource_class_interfaces(PersonsResource)
+        get_resource_class_interfaces(OrdersStatsResource)
+        with patch(
+            'travelcrm.lib.utils.resources_utils.verifyClass'
+        ) as _verify_class:
+            self.registry.by_interface(IPortlet)
+            self.registry.by_interface(ISubaccountFactory)
+            self.assertFalse(_verify_class.called)
@@ -0,0 +1,41 @@
+#-*-coding: utf-8-*-
+
+from mock import patch, MagicMock
+
+from pyramid.testing import DummyRequest, DummyResource
+
+from ...tests import BaseTestCase
+from ...lib.utils.security_utils import (
+    AuthIdentity,
+    get_auth_identity,
+)
+
+
+class TestSecurityUtils(BaseTestCase):
+
+    def test_get_auth_identity_memoized(self):
+        request = DummyRequest()
+        identity = get_auth_identity(request)
+        self.assertIsInstance(identity, AuthIdentity)
+        self.assertIs(identity, get_auth_identity(request))
+
+    @patch('travelcrm.lib.utils.security_utils.get_position_permisions')
+    @patch('travelcrm.lib.utils.security_utils.get_employee_position')
+    @patch('travelcrm.lib.utils.security_utils.User')
+    def test_identity_queries_once(
+        self, _user, _get_employee_position, _get_position_permisions
+    ):
+        _user.get.return_value = MagicMock()
+        _get_employee_position.return_value = MagicMock()
+        _get_position_permisions.return_value = 'permisions'
+        identity = AuthIdentity(DummyRequest())
+        for _ in range(3):
+            self.assertEqual(
+                'permisions', identity.get_permisions(DummyResource())
+            )
+            self.assertEqual(
+                'permisions', identity.get_permisions(DummyResource)
+            )
+        self.assertEqual(1, _user.get.call_count)
+        self.assertEqual(1, _get_employee_position.call_count)
+        self.assertEqual(1, _get_position_permisions.call_count)
@@ -0,0 +1,94 @@
+#-*-coding: utf-8-*-
+
+from mock import MagicMock, patch
+
+from ...tests import BaseTestCase
+from ...models import RoutingSession
+from ...lib.utils.sql_utils import (
+    SchemasRegistry,
+    TenantEngines,
+    set_search_path,
+    _commit_search_path,
+    _reset_search_path,
+)
+
+
+class TestSchemasRegistry(BaseTestCase):
+
+    @patch('travelcrm.lib.utils.sql_utils.DBSession')
+    @patch('travelcrm.lib.utils.sql_utils.inspect')
+    def test_cached(self, _inspect, _session):
+        _inspect.return_value.get_schema_names.return_value = ['public', 'c1']
+        _inspect.return_value.default_schema_name = 'public'
+        registry = SchemasRegistry()
+        schemas, default_schema, _ = registry.get()
+        self.assertIn('c1', schemas)
+        self.assertEqual('public', default_schema)
+        registry.get()
+        self.assertEqual(1, _inspect.call_count)
+        registry.invalidate()
+        registry.get()
+        self.assertEqual(2, _inspect.call_count)
+
+
+class TestSetSearchPath(BaseTestCase):
+
+    @patch('travelcrm.lib.utils.sql_utils.DBSession')
+    def test_skip_same_path(self, _session):
+        connection = MagicMock(info={})
+        _session.connection.return_value = connection
+        set_search_path('c1')
+        set_search_path('c1')
+        self.assertEqual(1, connection.execute.call_count)
+        set_search_path('c2')
+        self.assertEqual(2, connection.execute.call_count)
+        _reset_search_path(connection)
+        set_search_path('c2')
+        self.assertEqual(3, connection.execute.call_count)
+
+    @patch('travelcrm.lib.utils.sql_utils.DBSession')
+    def test_tenant_connection(self, _session):
+        connection = MagicMock(
+            info={'search_path': ('c1',), 'tenant_search_path': ('c1',)}
+        )
+        _session.connection.return_value = connection
+        set_search_path('c1')
+        self.assertFalse(connection.execute.called)
+        set_search_path('c2')
+        connection.execute.assert_called_once_with(
+            'set local search_path to c2'
+        )
+        _commit_search_path(connection)
+        self.assertEqual(('c1',), connection.info['search_path'])
+
+
+class TestRoutingSession(BaseTestCase):
+
+    def test_bind_pinned_to_transaction(self):
+        session = RoutingSession()
+        session.router = MagicMock(side_effect=lambda: MagicMock())
+        bind = session.get_bind()
+        self.assertIs(bind, session.get_bind())
+        self.assertEqual(1, session.router.call_count)
+        session.commit()
+        self.assertIsNot(bind, session.get_bind())
+
+
+class TestTenantEngines(BaseTestCase):
+
+    @patch('travelcrm.lib.utils.sql_utils.event')
+    @patch('travelcrm.lib.utils.sql_utils.create_engine')
+    def test_lru_eviction(self, _create_engine, _event):
+        _create_engine.side_effect = lambda *args, **kwargs: MagicMock()
+        engines = TenantEngines(MagicMock(), max_tenants=2)
+        c1 = engines.get(('c1',))
+        self.assertIs(c1, engines.get(('c1',)))
+        c2 = engines.get(('c2',))
+        c1.pool.checkedout.return_value = 0
+        c2.pool.checkedout.return_value = 1
+        engines.get(('c1',))
+        engines.get(('c3',))
+        # c2 is least recently used but busy, so idle c1 is disposed
+        self.assertTrue(c1.dispose.called)
+        self.assertFalse(c2.dispose.called)
+        self.assertIsNot(c1, engines.get(('c1',)))
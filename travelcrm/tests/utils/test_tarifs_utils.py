@@ -0,0 +1,57 @@
+#-*-coding: utf-8-*-
+
+from datetime import datetime, timedelta
+
+from mock import patch
+
+from ...tests import BaseTestCase
+from ...lib.utils.tarifs_utils import IPActivityTracker, DT_FORMAT
+
+
+class TestIPActivityTracker(BaseTestCase):
+
+    def setUp(self):
+        super(TestIPActivityTracker, self).setUp()
+        self.tracker = IPActivityTracker(timeout=300, flush_interval=60)
+
+    def test_limit(self):
+        self.assertTrue(self.tracker.touch('10.0.0.1', 2, schema='c1'))
+        self.assertTrue(self.tracker.touch('10.0.0.2', 2, schema='c1'))
+        self.assertFalse(self.tracker.touch('10.0.0.3', 2, schema='c1'))
+        # active ip is always allowed
+        self.assertTrue(self.tracker.touch('10.0.0.1', 2, schema='c1'))
+        # schemas are tracked separately
+        self.assertTrue(self.tracker.touch('10.0.0.3', 2, schema='c2'))
+
+    def test_expire(self):
+        with patch('travelcrm.lib.utils.tarifs_utils.time') as _time:
+            _time.time.return_value = 1000
+            self.tracker.touch('10.0.0.1', 1, schema='c1')
+            _time.time.return_value = 1299
+            self.assertFalse(self.tracker.touch('10.0.0.2', 1, schema='c1'))
+            _time.time.return_value = 1300
+            self.assertTrue(self.tracker.touch('10.0.0.2', 1, schema='c1'))
+
+    def test_load(self):
+        now = datetime.now()
+        self.tracker.load(
+            [
+                ('10.0.0.1', now.strftime(DT_FORMAT)),
+                ('10.0.0.2', (now - timedelta(hours=1)).strftime(DT_FORMAT)),
+            ],
+            schema='c1'
+        )
+        self.assertTrue(self.tracker.is_loaded(schema='c1'))
+        self.assertFalse(self.tracker.touch('10.0.0.3', 1, schema='c1'))
+        self.assertEqual(
+            ['10.0.0.1'],
+            [ip for ip, _ in self.tracker.pop_changes(schema='c1')]
+        )
+
+    def test_pop_changes(self):
+        self.tracker.touch('10.0.0.1', 2, schema='c1')
+        self.assertEqual(1, len(self.tracker.pop_changes(schema='c1')))
+        self.tracker.touch('10.0.0.1', 2, schema='c1')
+        self.assertIsNone(self.tracker.pop_changes(schema='c1'))
+        self.tracker.touch('10.0.0.2', 2, schema='c1')
+        self.assertEqual(2, len(self.tracker.pop_changes(schema='c1')))
@@ -1,11 +1,22 @@
 #-*-coding: utf-8-*-
 
-from datetime import date
+from datetime import date, datetime
 
+from babel.dates import format_date, format_datetime
 from mock import patch
+from pyramid import testing
+from pytz import timezone
 
 from ...tests import BaseTestCase
-from ...lib.utils.common_utils import parse_date
+from ...lib.utils.companies_utils import CompanyContext
+from ...lib.utils.common_utils import (
+    parse_date,
+    get_formatter,
+    get_locale_name,
+    get_timezone,
+    get_base_currency,
+    _get_localizer_for_locale_name,
+)
 
 
 class TestCommonUtils(BaseTestCase):
@@ -33,3 +44,51 @@ class TestCommonUtils(BaseTestCase):
         ]
         for _s, d in s:
             self.assertEqual(d, parse_date(_s))
+
+    @patch('travelcrm.lib.utils.common_utils.get_timezone')
+    @patch('travelcrm.lib.utils.common_utils.get_locale_name')
+    def test_formatter(self, _get_locale_name, _get_timezone):
+        _get_locale_name.return_value = 'en'
+        _get_timezone.return_value = 'Europe/Kiev'
+        formatter = get_formatter()
+        self.assertIs(formatter, get_formatter())
+        self.assertEqual(
+            format_date(date(2016, 2, 1), locale='en', format='short'),
+            formatter.format_date(date(2016, 2, 1))
+        )
+        self.assertEqual(
+            format_datetime(
+                datetime(2016, 2, 1, 10, 30), locale='en',
+                format=formatter.datetime_format,
+                tzinfo=timezone('Europe/Kiev')
+            ),
+            formatter.format_datetime(datetime(2016, 2, 1, 10, 30))
+        )
+        self.assertEqual(u'1,234.57', formatter.format_decimal('1234.567'))
+        _get_locale_name.return_value = 'ru'
+        self.assertIsNot(formatter, get_formatter())
+
+    def test_localizer_cached(self):
+        testing.setUp()
+        try:
+            localizer = _get_localizer_for_locale_name('en')
+            self.assertIs(localizer, _get_localizer_for_locale_name('en'))
+            self.assertIsNot(localizer, _get_localizer_for_locale_name('ru'))
+        finally:
+            testing.tearDown()
+
+    def test_company_context(self):
+        request = testing.DummyRequest()
+        testing.setUp(request=request)
+        try:
+            self.assertIsNone(get_locale_name())
+            request.company_context = CompanyContext(
+                name=u'test', base_currency='UAH', locale_name='ru',
+                timezone='Europe/Kiev', tarif_code=None, tarif_limit=None,
+                tarif_expired=None,
+            )
+            self.assertEqual('ru', get_locale_name())
+            self.assertEqual('Europe/Kiev', get_timezone())
+            self.assertEqual('UAH', get_base_currency())
+        finally:
+            testing.tearDown()
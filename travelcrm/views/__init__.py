@@ -5,16 +5,16 @@ from pyramid.view import (
     forbidden_view_config
 )
 
-from ..models.user import User
-from ..models.resource_type import ResourceType
 from ..models.resource import Resource
-from ..lib.bl.employees import get_employee_position, get_employee_permisions
+from ..models.structure import Structure
 from ..lib.bl.structures import get_structure_name_path 
 from ..lib.utils.resources_utils import (
     get_resource_class, 
+    get_resource_type_by_name,
     get_resource_type_by_resource
 )
 from ..lib.utils.common_utils import translate as _
+from ..lib.utils.security_utils import get_auth_identity
 
 
 class BaseView(object):
@@ -75,10 +75,7 @@ def system_resource_forbidden(context, request):
     renderer='travelcrm:templates/system#system_navigation.mako'
 )
 def system_navigation(context, request):
-    user_id = request.authenticated_userid
-    user = User.get(user_id)
-    employee = user.employee
-    employee_position = get_employee_position(employee)
+    employee_position = get_auth_identity(request).position
 
     _navigations = employee_position.navigations
     navigation = {}
@@ -110,12 +107,10 @@ def system_context_info(context, request):
     renderer='json'
 )
 def _system_context_info(context, request):
-    user_id = request.authenticated_userid
-    user = User.get(user_id)
-    employee = user.employee
-    rt = ResourceType.by_name(request.params.get('rt'))
+    rt = get_resource_type_by_name(request.params.get('rt'))
     rt_cls = get_resource_class(request.params.get('rt'))
-    permisions = get_employee_permisions(employee, rt_cls)
+    permisions = get_auth_identity(request).get_permisions(rt_cls)
+    structure = Structure.get(permisions.structure_id)
     common_group_title = _(u'Common')
     permisions_group_title = _(u'Permissions')
     rows = []
@@ -137,8 +132,8 @@ def _system_context_info(context, request):
     rows.append({
         'name': _(u'Scope'),
         'value': (
-            '&rarr;'.join(get_structure_name_path(permisions.structure)) 
-            if permisions.structure else _(u'All')
+            '&rarr;'.join(get_structure_name_path(structure)) 
+            if structure else _(u'All')
         ),
         'group': permisions_group_title
     })    
@@ -96,9 +96,7 @@ class CalculationsView(BaseView):
     def _autoload(self):
         form = CalculationAutoloadForm(self.request)
         if form.validate():
-            calculations = form.submit()
-            DBSession.add_all(calculations)
-        DBSession.flush()
+            form.submit()
         return {
             'success_message': _(u'Saved'),
         }
@@ -9,8 +9,7 @@ from pyramid.httpexceptions import HTTPFound
 from . import BaseView
 from ..models.company import Company
 from ..models.resource import Resource
-from ..lib.utils.security_utils import get_auth_employee
-from ..lib.bl.employees import get_employee_structure
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.helpers.fields import companies_combogrid_field
 from ..lib.utils.common_utils import translate as _
 from ..forms.companies import (
@@ -73,8 +72,7 @@ class CompaniesView(BaseView):
         permission='edit'
     )
     def edit(self):
-        employee = get_auth_employee(self.request)
-        structure = get_employee_structure(employee)
+        structure = get_auth_identity(self.request).structure
         return {
             'item': structure.company, 
             'title': self._get_title(_(u'Edit')),
@@ -87,8 +85,7 @@ class CompaniesView(BaseView):
         permission='edit'
     )
     def _edit(self):
-        employee = get_auth_employee(self.request)
-        structure = get_employee_structure(employee)
+        structure = get_auth_identity(self.request).structure
         form = CompanyForm(self.request)
         if form.validate():
             form.submit(structure.company)
@@ -21,8 +21,7 @@ from ..forms.invoices import (
     InvoiceSettingsForm,
 )
 from ..lib.utils.resources_utils import get_resource_type_by_resource
-from ..lib.utils.security_utils import get_auth_employee
-from ..lib.bl.employees import get_employee_structure
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.events.resources import (
     ResourceCreated,
     ResourceChanged,
@@ -280,8 +279,9 @@ class InvoicesView(BaseView):
     )
     def print_invoice(self):
         invoice = Invoice.get(self.request.params.get('id'))
-        employee = get_auth_employee(self.request)
-        structure = get_employee_structure(employee)
+        identity = get_auth_identity(self.request)
+        employee = identity.employee
+        structure = identity.structure
         return {
             'invoice': invoice,
             'employee': employee,
@@ -45,7 +45,8 @@ class NotificationsView(BaseView):
         qb = form.submit()
         return {
             'total': qb.get_count(),
-            'rows': qb.get_serialized()
+            'rows': qb.get_serialized(),
+            'cursor': qb.get_cursor(),
         }
 
     @view_config(
@@ -12,16 +12,17 @@ from ..models import DBSession
 from ..models.order import Order
 from ..models.lead import Lead
 from ..lib.bl.subscriptions import subscribe_resource
+from ..lib.bl.orders import get_orders_prices
 from ..lib.utils.common_utils import translate as _
+from ..lib.utils.common_utils import serialize
 from ..forms.orders import (
     OrderForm, 
     OrderSearchForm,
     OrderAssignForm,
     OrderSettingsForm,
 )
-from ..lib.utils.security_utils import get_auth_employee
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.utils.resources_utils import get_resource_type_by_resource
-from ..lib.bl.employees import get_employee_structure
 from ..lib.events.resources import (
     ResourceCreated,
     ResourceChanged,
@@ -58,9 +59,16 @@ class OrdersView(BaseView):
         form = OrderSearchForm(self.request, self.context)
         form.validate()
         qb = form.submit()
+        rows = qb.get_serialized()
+        orders_prices = get_orders_prices([row['id'] for row in rows])
+        for row in rows:
+            row['final_price'] = serialize(
+                orders_prices[row['id']].final_price
+            )
         return {
             'total': qb.get_count(),
-            'rows': qb.get_serialized()
+            'rows': rows,
+            'cursor': qb.get_cursor(),
         }
 
     @view_config(
@@ -309,8 +317,9 @@ class OrdersView(BaseView):
     )
     def print_invoice(self):
         order = Order.get(self.request.params.get('id'))
-        employee = get_auth_employee(self.request)
-        structure = get_employee_structure(employee)
+        identity = get_auth_identity(self.request)
+        employee = identity.employee
+        structure = identity.structure
         return {
             'order': order,
             'employee': employee,
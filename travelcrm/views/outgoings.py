@@ -10,7 +10,7 @@ from ..models import DBSession
 from ..models.outgoing import Outgoing
 from ..lib.bl.employees import get_employee_structure
 from ..lib.bl.subscriptions import subscribe_resource
-from ..lib.utils.security_utils import get_auth_employee
+from ..lib.utils.security_utils import get_auth_identity
 from ..lib.utils.common_utils import translate as _
 
 from ..forms.outgoings import (
@@ -88,8 +88,7 @@ class OutgoingsView(BaseView):
         permission='add'
     )
     def add(self):
-        auth_employee = get_auth_employee(self.request)
-        structure = get_employee_structure(auth_employee)
+        structure = get_auth_identity(self.request).structure
         return {
             'title': self._get_title(_(u'Add')),
             'structure_id': structure.id
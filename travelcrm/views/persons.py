@@ -57,7 +57,8 @@ class PersonsView(BaseView):
         qb = form.submit()
         return {
             'total': qb.get_count(),
-            'rows': qb.get_serialized()
+            'rows': qb.get_serialized(),
+            'cursor': qb.get_cursor(),
         }
 
     @view_config(